@@ -1,8 +1,10 @@
 """
 Factory pattern pour créer l'application Flask
 """
+import os
+import time
+
 from flask import Flask, redirect, url_for
-from flask_migrate import Migrate
 
 try:
     from flask_login import LoginManager  # type: ignore
@@ -11,10 +13,9 @@ except Exception:  # pragma: no cover
     LoginManager = None  # type: ignore
     _LOGIN_AVAILABLE = False
 # Import de la base de données depuis les modèles pour éviter les imports circulaires
-from app.models import User, db
+from app.models import db
 from config import config  # type: ignore
 
-migrate = Migrate()
 
 def create_app(config_name: str = 'default') -> Flask:
     """
@@ -26,7 +27,11 @@ def create_app(config_name: str = 'default') -> Flask:
     Returns:
         Flask: Instance de l'application Flask configurée
     """
+    debut = time.perf_counter()
     app = Flask(__name__)
+    # Durées de démarrage (ms) par étape, lues par `flask startup-profile`
+    durees: dict[str, float] = {}
+    app.extensions['startup_timings'] = durees
     
     # Chargement de la configuration
     app.config.from_object(config[config_name])  # type: ignore
@@ -39,7 +44,33 @@ def create_app(config_name: str = 'default') -> Flask:
     
     # Initialisation des extensions avec l'app
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Flask-Migrate importe alembic (~300 ms) : chargé seulement pour la CLI (`flask db ...`)
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Requêtes SQL, temps base et appels IA par requête HTTP (log + Server-Timing)
+    from app.utils.instrumentation import Instrumentation
+    Instrumentation.installer(app)
+    # Métriques Prometheus (/metrics), agrégées entre workers via METRICS_DIR
+    from app.utils.metrics import Metriques
+    Metriques.installer(app)
+    # Profilage cProfile à la demande (?_profil=1, administrateur seulement), après l'instrumentation
+    from app.utils.profilage import Profilage
+    Profilage.installer(app)
+
+    # Alimentation automatique de la série temporelle des scores (table cotation_score)
+    from app.services.historique_scores_service import HistoriqueScoresService
+    HistoriqueScoresService.installer()
+    # Cumuls d'activité mensuels (table monthly_activity_rollup)
+    from app.services.activite_service import ActiviteService
+    ActiviteService.installer()
+    # Carte d'ownership par requête (invalidée quand patients/séances/grilles changent)
+    from app.services import ownership
+    ownership.installer()
+    # Cache des résultats analytiques (invalidé au commit des patients/séances/cotations)
+    from app.utils.cache import CacheAnalytics
+    CacheAnalytics.configurer(app)
 
     # Auth réelle : LoginManager + User loader
     if _LOGIN_AVAILABLE and LoginManager:  # type: ignore
@@ -48,10 +79,14 @@ def create_app(config_name: str = 'default') -> Flask:
         login_manager.login_view = 'auth.login'  # type: ignore[attr-defined]
         login_manager.init_app(app)  # type: ignore[attr-defined]
 
+        # Principal mis en cache dans la session signée : pas de lecture de `users` à chaque requête
+        from app.services.session_principal import SessionPrincipal
+        SessionPrincipal.installer(app)
+
         @login_manager.user_loader  # type: ignore[attr-defined]
         def load_user(user_id: str):  # type: ignore
             try:
-                return User.query.get(int(user_id))  # type: ignore
+                return SessionPrincipal.charger(user_id)
             except Exception:
                 return None  # type: ignore
     else:
@@ -60,6 +95,7 @@ def create_app(config_name: str = 'default') -> Flask:
     # Enregistrement des blueprints (routes) avec robustesse
     from importlib import import_module
     def safe_register(import_path: str, attr: str, url_prefix: str | None = None) -> bool:
+        debut_import = time.perf_counter()
         try:
             module = import_module(import_path)
             bp = getattr(module, attr)
@@ -67,14 +103,13 @@ def create_app(config_name: str = 'default') -> Flask:
                 app.register_blueprint(bp, url_prefix=url_prefix)
             else:
                 app.register_blueprint(bp)
-            app.logger.info(f"Blueprint '{import_path}.{attr}' chargé avec succès.")
+            app.logger.debug("Blueprint '%s.%s' chargé.", import_path, attr)
             return True
-        except Exception as e:  # noqa
-            import traceback
-            tb = traceback.format_exc()
-            app.logger.error(f"Blueprint '{import_path}.{attr}' non chargé: {e}\nTraceback:\n{tb}")
-            print(f"[SAFE_REGISTER] ERREUR: Blueprint '{import_path}.{attr}' non chargé: {e}\nTraceback:\n{tb}")
+        except Exception:
+            app.logger.exception("Blueprint '%s.%s' non chargé", import_path, attr)
             return False
+        finally:
+            durees[f'blueprint:{import_path}'] = round((time.perf_counter() - debut_import) * 1000, 1)
 
     safe_register('app.routes.main', 'main')
     safe_register('app.routes.auth', 'auth')
@@ -107,6 +142,10 @@ def create_app(config_name: str = 'default') -> Flask:
             'has_cotation': cotation_ok
         }
 
+    # Commandes CLI d'exploitation
+    from app.cli import register_cli
+    register_cli(app)
+
     # Commande CLI utilitaire pour debug
     try:
         @app.cli.command('list-endpoints')  # type: ignore
@@ -116,11 +155,21 @@ def create_app(config_name: str = 'default') -> Flask:
     except Exception:
         pass
     
-    # Création des tables si elles n'existent pas
-    with app.app_context():
-        try:
-            db.create_all()
-        except Exception as e:
-            print(f"Warning: Could not create tables: {e}")
-    
+    # Création du schéma : étape explicite (`flask init-db`), sauf si AUTO_CREATE_SCHEMA
+    # (développement, tests) ; la production ne touche plus la base au démarrage.
+    if app.config.get('AUTO_CREATE_SCHEMA'):
+        debut_schema = time.perf_counter()
+        with app.app_context():
+            try:
+                db.create_all()
+                from app.services.recherche_patients_service import RecherchePatientsService
+                from app.services.recherche_seances_service import RechercheSeancesService
+                with db.engine.begin() as connection:
+                    RechercheSeancesService.installer_index(connection)
+                    RecherchePatientsService.installer_index(connection)
+            except Exception:
+                app.logger.exception("Création automatique du schéma impossible")
+        durees['create_all'] = round((time.perf_counter() - debut_schema) * 1000, 1)
+
+    durees['total'] = round((time.perf_counter() - debut) * 1000, 1)
     return app
@@ -0,0 +1,132 @@
+"""Commandes CLI d'exploitation (flask <commande>)."""
+from __future__ import annotations
+
+import click
+from flask import Flask
+
+
+def register_cli(app: Flask) -> None:
+    """Enregistre les commandes d'exploitation sur l'application."""
+
+    @app.cli.command('scores-backfill')  # type: ignore
+    @click.option('--taille-lot', default=1000, show_default=True, help='Nombre de cotations traitées par transaction.')
+    def scores_backfill(taille_lot: int):  # type: ignore
+        """Reconstruit la table de faits cotation_score depuis les cotations existantes."""
+        from app.services.historique_scores_service import HistoriqueScoresService
+        total = HistoriqueScoresService.backfill(taille_lot)
+        click.echo(f"{total} scores indicateur enregistrés.")
+
+    @app.cli.command('cohortes-rebuild')  # type: ignore
+    @click.option('--user-id', type=int, default=None, help='Limiter à un thérapeute.')
+    @click.option('--depuis', default=None, help='Premier mois à recalculer (AAAA-MM).')
+    def cohortes_rebuild(user_id: int | None, depuis: str | None):  # type: ignore
+        """Recalcule la table matérialisée cohorte_statistique."""
+        from app.services.cohorte_service import CohorteService
+        total = CohorteService.reconstruire(user_id, depuis)
+        click.echo(f"{total} lignes de cohorte enregistrées.")
+
+    @app.cli.command('rollups-rebuild')  # type: ignore
+    @click.option('--user-id', type=int, default=None, help='Limiter à un thérapeute.')
+    def rollups_rebuild(user_id: int | None):  # type: ignore
+        """Reconstruit la table monthly_activity_rollup depuis les séances et cotations."""
+        from app.services.activite_service import ActiviteService
+        total = ActiviteService.reconstruire(user_id)
+        click.echo(f"{total} cumuls mensuels enregistrés.")
+
+    @app.cli.command('check-index-usage')  # type: ignore
+    @click.option('--verbose', is_flag=True, help='Afficher le plan de chaque requête.')
+    def check_index_usage(verbose: bool):  # type: ignore
+        """Vérifie (EXPLAIN) que les requêtes critiques utilisent un index ; code retour 1 sinon."""
+        from app.utils.plans import verifier_plans
+        resultats = verifier_plans()
+        for resultat in resultats:
+            statut = 'OK ' if resultat['ok'] else 'KO '
+            click.echo(f"[{statut}] {resultat['requete']} {', '.join(map(str, resultat['balayages']))}".rstrip())
+            if verbose:
+                click.echo(f"      {resultat['plan']}")
+        echecs = [r for r in resultats if not r['ok']]
+        if echecs:
+            click.echo(f"{len(echecs)} requête(s) critique(s) sans recherche dans un index.", err=True)
+            raise SystemExit(1)
+
+    @app.cli.command('init-db')  # type: ignore
+    def init_db():  # type: ignore
+        """Crée les tables manquantes (à lancer au déploiement, remplace create_all au démarrage)."""
+        from app.models import db
+        from app.services.recherche_patients_service import RecherchePatientsService
+        from app.services.recherche_seances_service import RechercheSeancesService
+        db.create_all()
+        with db.engine.begin() as connection:
+            RechercheSeancesService.installer_index(connection)
+            RecherchePatientsService.installer_index(connection)
+        from app.services.sante_service import SanteService
+        for probleme in SanteService.schema(db.engine)['issues']:
+            click.echo(f"⚠️ {probleme}")
+        click.echo("Schéma créé / vérifié.")
+
+    @app.cli.command('startup-profile')  # type: ignore
+    @click.option('--config', 'config_name', default=None, help='Configuration à profiler (défaut : FLASK_CONFIG).')
+    @click.option('--top', default=15, show_default=True, help="Nombre d'imports les plus coûteux affichés.")
+    def startup_profile(config_name: str | None, top: int):  # type: ignore
+        """Mesure un démarrage à froid de worker dans un processus neuf (étapes de create_app + imports)."""
+        import json
+        import os
+        import subprocess
+        import sys
+        import time
+
+        config_name = config_name or os.environ.get('FLASK_CONFIG', 'default')
+        code = (
+            "import json, time; t = time.perf_counter(); from app import create_app; "
+            f"a = create_app({config_name!r}); "
+            "print(json.dumps({'create_app_ms': a.extensions['startup_timings'], "
+            "'process_ms': round((time.perf_counter() - t) * 1000, 1)}))"
+        )
+        debut = time.perf_counter()
+        environnement = {k: v for k, v in os.environ.items() if k != 'FLASK_RUN_FROM_CLI'}
+        resultat = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=False,
+            cwd=os.path.dirname(app.root_path), env=environnement
+        )
+        mur_ms = (time.perf_counter() - debut) * 1000
+        if resultat.returncode != 0:
+            click.echo(resultat.stderr[-2000:], err=True)
+            raise SystemExit(resultat.returncode)
+
+        # Lignes "import time: self [us] | cumulative | package"
+        imports: list[tuple[int, str]] = []
+        for ligne in resultat.stderr.splitlines():
+            if not ligne.startswith('import time:') or 'cumulative' in ligne:
+                continue
+            _, cumul, paquet = (partie.strip() for partie in ligne[len('import time:'):].split('|'))
+            imports.append((int(cumul), paquet))
+        mesures = json.loads(resultat.stdout.strip().splitlines()[-1])
+
+        click.echo(f"Démarrage à froid ({config_name}) : {mur_ms:.0f} ms processus complet, "
+                   f"{mesures['process_ms']:.0f} ms import + create_app")
+        for etape, duree in mesures['create_app_ms'].items():
+            click.echo(f"  {etape:45s} {duree:8.1f} ms")
+        click.echo("Imports les plus coûteux (cumulé) :")
+        for cumul, paquet in sorted(imports, reverse=True)[:top]:
+            click.echo(f"  {paquet:45s} {cumul / 1000:8.1f} ms")
+
+    @app.cli.command('grilles-catalogue')  # type: ignore
+    def grilles_catalogue():  # type: ignore
+        """Précompile le catalogue des grilles standard (artefact chargé au premier accès)."""
+        from app.services.catalogue_grilles import CatalogueGrilles
+        chemin = CatalogueGrilles.compiler()
+        click.echo(f"Catalogue écrit : {chemin}")
+
+    @app.cli.command('grilles-sync')  # type: ignore
+    @click.option('--dry-run', is_flag=True, help="Affiche le plan sans rien écrire.")
+    def grilles_sync(dry_run: bool):  # type: ignore
+        """Synchronise le catalogue JSON des grilles standard avec la base (différentiel, une transaction)."""
+        import time
+
+        from app.services.import_grilles_service import ImportGrillesService
+        debut = time.perf_counter()
+        plan = ImportGrillesService.synchroniser(dry_run=dry_run)
+        for ligne in ImportGrillesService.resume(plan):
+            click.echo(ligne)
+        etat = "plan seul (dry-run)" if dry_run else "appliqué"
+        click.echo(f"Synchronisation {etat} en {(time.perf_counter() - debut) * 1000:.0f} ms")
@@ -36,6 +36,16 @@ class User(TimestampMixin, UserMixin, db.Model):
     def __repr__(self):  # type: ignore
         return f"<User {self.email}>"
 
+class RevocationPrincipal(db.Model):
+    """Dernière révocation des principaux de session d'un utilisateur (désactivation).
+
+    Partagée par tous les processus : chaque worker la relit périodiquement
+    (PRINCIPAL_REVOCATIONS_INTERVALLE) au lieu de relire `users` à chaque requête.
+    """
+    __tablename__ = 'principal_revocation'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    revoque_le = db.Column(db.DateTime, nullable=False, index=True)  # UTC
+
 class Patient(TimestampMixin, db.Model):
     """Modèle pour les patients"""
     __tablename__ = 'patients'
@@ -62,6 +72,11 @@ class Patient(TimestampMixin, db.Model):
     # Relations
     seances = db.relationship('Seance', backref='patient', lazy=True, cascade='all, delete-orphan')
 
+    # Liste des patients actifs d'un thérapeute
+    __table_args__ = (
+        db.Index('ix_patients_user_actif', 'user_id', 'actif'),
+    )
+
     def __init__(
         self,
         nom: str,
@@ -141,6 +156,11 @@ class Seance(TimestampMixin, db.Model):
     score_engagement = db.Column(db.Integer)  # 1-10
     score_expression = db.Column(db.Integer)  # 1-10
     score_interaction = db.Column(db.Integer)  # 1-10
+
+    # Séances d'un patient sur une plage de dates
+    __table_args__ = (
+        db.Index('ix_seances_patient_date', 'patient_id', 'date_seance'),
+    )
     
     def __repr__(self):
         return f'<Seance {self.date_seance} - Patient {self.patient_id}>'
@@ -4,8 +4,13 @@ import json
 from datetime import datetime, timezone
 from typing import Any, Dict
 
+from sqlalchemy.dialects.postgresql import JSONB
+
 from . import TimestampMixin, db
 
+# Document JSON natif : JSONB sous PostgreSQL (indexable GIN), JSON sous SQLite.
+JSONDocument = db.JSON().with_variant(JSONB(), 'postgresql')
+
 
 # Nouveau modèle pour la table 'grille'
 class Grille(db.Model):
@@ -101,7 +106,7 @@ class GrilleEvaluation(TimestampMixin, db.Model):
     user = db.relationship('User', backref='grilles')
     
     # Configuration JSON de la grille
-    domaines_config = db.Column(db.Text, nullable=False)  # JSON des domaines et indicateurs
+    domaines_config = db.Column(JSONDocument, nullable=False)  # Domaines et indicateurs (liste de dicts)
     
     # Statut
     active = db.Column(db.Boolean, default=True)
@@ -162,8 +167,8 @@ class CotationSeance(TimestampMixin, db.Model):
     type_cotation = db.Column(db.String(20), nullable=False, default='globale')
     domaine_id = db.Column(db.Integer, db.ForeignKey('domaine.id'), nullable=True)
     
-    # Scores par domaine (JSON)
-    scores_detailles = db.Column(db.Text, nullable=False)  # JSON des scores par indicateur
+    # Scores par indicateur (document JSON natif, clé "<Domaine>_<Indicateur>")
+    scores_detailles = db.Column(JSONDocument, nullable=False, default=dict)
     
     # Score global calculé
     score_global = db.Column(db.Float)
@@ -172,22 +177,139 @@ class CotationSeance(TimestampMixin, db.Model):
     
     # Observations
     observations_cotation = db.Column(db.Text)
+
+    # Accès par séance + grille, patient + grille, cotations récentes ;
+    # index GIN (PostgreSQL uniquement) pour filtrer par indicateur (opérateurs ?, @>)
+    __table_args__ = (
+        db.Index('ix_cotation_seance_seance_grille', 'seance_id', 'grille_id'),
+        db.Index('ix_cotation_seance_patient_grille', 'patient_id', 'grille_id'),
+        db.Index('ix_cotation_seance_date_creation', 'date_creation'),
+        db.Index('ix_cotation_seance_scores_gin', 'scores_detailles', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
     def __repr__(self):
         return f'<CotationSeance seance_id={self.seance_id} score={self.score_global}>'
     
     @property
-    def scores(self):
-        """Retourne les scores décodés depuis JSON"""
-        try:
-            return json.loads(self.scores_detailles)  # type: ignore
-        except Exception:
-            return {}
+    def scores(self) -> Dict[str, Any]:
+        """Retourne les scores (dict). Tolère les anciennes lignes encodées en texte JSON."""
+        valeur = self.scores_detailles
+        if isinstance(valeur, str):
+            try:
+                return json.loads(valeur)
+            except Exception:
+                return {}
+        return valeur if isinstance(valeur, dict) else {}
     
     @scores.setter
     def scores(self, value: Dict[str, Any]) -> None:  # mapping indicateur -> valeur
-        """Encode les scores en JSON"""
-        self.scores_detailles = json.dumps(value)
+        """Affecte les scores (stockés nativement en JSON)."""
+        self.scores_detailles = dict(value)
+
+class CotationScore(db.Model):
+    """Fait normalisé : valeur d'un indicateur pour une cotation (série temporelle patient).
+
+    Table en ajout seul alimentée à l'enregistrement des cotations : les lignes ne sont
+    jamais modifiées, une cotation ré-enregistrée remplace l'ensemble de ses faits.
+    """
+    __tablename__ = 'cotation_score'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cotation_id = db.Column(db.Integer, db.ForeignKey('cotation_seance.id', ondelete='CASCADE'), nullable=False, index=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id', ondelete='CASCADE'), nullable=False)
+    grille_id = db.Column(db.Integer, db.ForeignKey('grille_evaluation.id'), nullable=False)
+    grille_version = db.Column(db.Integer)  # version_num active au moment de la cotation
+    indicateur = db.Column(db.String(255), nullable=False)  # clé "<Domaine>_<Indicateur>"
+    valeur = db.Column(db.Float, nullable=False)
+    date_seance = db.Column(db.DateTime, nullable=False)
+
+    # Requête type : un patient, un indicateur, une plage de dates
+    __table_args__ = (
+        db.Index('ix_cotation_score_patient_indicateur_date', 'patient_id', 'indicateur', 'date_seance'),
+    )
+
+    def __repr__(self):  # type: ignore
+        return f'<CotationScore cotation_id={self.cotation_id} {self.indicateur}={self.valeur}>'
+
+
+class CohorteStatistique(db.Model):
+    """Agrégat mensuel matérialisé d'une cohorte (pathologie × grille × mois d'inclusion).
+
+    Recalculé par `CohorteService.reconstruire` : la page de synthèse lit ces lignes
+    au lieu de reparcourir l'historique des cotations.
+    """
+    __tablename__ = 'cohorte_statistique'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    mois = db.Column(db.String(7), nullable=False)  # mois des cotations, "AAAA-MM"
+    pathologie = db.Column(db.String(200), nullable=False, default='')  # '' = non renseignée
+    grille_id = db.Column(db.Integer, db.ForeignKey('grille_evaluation.id', ondelete='CASCADE'), nullable=False)
+    cohorte_mois = db.Column(db.String(7), nullable=False)  # mois d'inclusion du patient, "AAAA-MM"
+
+    nb_patients = db.Column(db.Integer, nullable=False, default=0)
+    nb_cotations = db.Column(db.Integer, nullable=False, default=0)
+    moyenne = db.Column(db.Float)
+    p25 = db.Column(db.Float)
+    mediane = db.Column(db.Float)
+    p75 = db.Column(db.Float)
+    p90 = db.Column(db.Float)
+    progression_moyenne = db.Column(db.Float)  # points de % depuis la première cotation du patient
+    nb_objectifs_atteints = db.Column(db.Integer, nullable=False, default=0)
+    delai_objectif_moyen_jours = db.Column(db.Float)
+    date_calcul = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'mois', 'pathologie', 'grille_id', 'cohorte_mois', name='uq_cohorte_statistique'),
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'mois': self.mois,
+            'pathologie': self.pathologie or None,
+            'grille_id': self.grille_id,
+            'cohorte_mois': self.cohorte_mois,
+            'nb_patients': self.nb_patients,
+            'nb_cotations': self.nb_cotations,
+            'moyenne': self.moyenne,
+            'p25': self.p25,
+            'mediane': self.mediane,
+            'p75': self.p75,
+            'p90': self.p90,
+            'progression_moyenne': self.progression_moyenne,
+            'nb_objectifs_atteints': self.nb_objectifs_atteints,
+            'delai_objectif_moyen_jours': self.delai_objectif_moyen_jours
+        }
+
+    def __repr__(self):  # type: ignore
+        return f'<CohorteStatistique {self.mois} grille={self.grille_id} pathologie={self.pathologie!r}>'
+
+
+class ActiviteMensuelle(db.Model):
+    """Cumul d'activité par thérapeute et par mois (séances, cotations, usage des grilles).
+
+    Maintenu à l'écriture par `ActiviteService` (écouteur de flush) et reconstructible
+    par `flask rollups-rebuild` : les rapports mensuels/annuels lisent ces lignes.
+    """
+    __tablename__ = 'monthly_activity_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    mois = db.Column(db.String(7), nullable=False)  # "AAAA-MM"
+    nb_seances = db.Column(db.Integer, nullable=False, default=0)
+    nb_cotations = db.Column(db.Integer, nullable=False, default=0)
+    nb_patients_vus = db.Column(db.Integer, nullable=False, default=0)
+    somme_pourcentages = db.Column(db.Float, nullable=False, default=0.0)
+    # {"<grille_id>": {"nb": utilisations, "somme": somme des pourcentages}}
+    grilles = db.Column(JSONDocument, nullable=False, default=dict)
+    date_calcul = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'mois', name='uq_monthly_activity_rollup_user_mois'),
+    )
+
+    def __repr__(self):  # type: ignore
+        return f'<ActiviteMensuelle user_id={self.user_id} {self.mois} seances={self.nb_seances}>'
 
 class ObjectifTherapeutique(TimestampMixin, db.Model):
     """Objectifs thérapeutiques personnalisés par patient.
@@ -213,6 +335,11 @@ class ObjectifTherapeutique(TimestampMixin, db.Model):
     
     # Description
     description = db.Column(db.Text)
+
+    # Objectifs d'un patient pour une grille
+    __table_args__ = (
+        db.Index('ix_objectif_therapeutique_patient_grille', 'patient_id', 'grille_id', 'actif'),
+    )
     
     def __repr__(self):
         return f'<ObjectifTherapeutique patient_id={self.patient_id} domaine={self.domaine_cible}>'
@@ -228,7 +355,7 @@ class GrilleVersion(TimestampMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     grille_id = db.Column(db.Integer, db.ForeignKey('grille_evaluation.id'), nullable=False, index=True)
     version_num = db.Column(db.Integer, nullable=False)
-    domaines_config = db.Column(db.Text, nullable=False)
+    domaines_config = db.Column(JSONDocument, nullable=False)
     active = db.Column(db.Boolean, default=True, nullable=False)
     # NOTE: La relation vers CotationSeance a été retirée car il n'existe plus
     # de clé étrangère grille_version_id dans la table cotation_seance.
@@ -260,7 +387,11 @@ class PatientGrille(TimestampMixin, db.Model):
     commentaires = db.Column(db.Text)
     
     # Contrainte d'unicité
-    __table_args__ = (db.UniqueConstraint('patient_id', 'grille_id', name='_patient_grille_uc'),)
+    # L'unicité (patient_id, grille_id) sert aussi d'index par patient ; index inverse par grille
+    __table_args__ = (
+        db.UniqueConstraint('patient_id', 'grille_id', name='_patient_grille_uc'),
+        db.Index('ix_patient_grille_grille', 'grille_id'),
+    )
     
     # Relations
     patient = db.relationship('Patient', backref='grilles_assignees')
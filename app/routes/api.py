@@ -4,10 +4,14 @@ API REST pour l'application Synchronie
 from flask import Blueprint, jsonify, request
 from datetime import datetime, timezone
 from dateutil import parser as date_parser  # type: ignore
+from flask_login import current_user  # type: ignore
 
 from app.services.patient_service import PatientService
+from app.services.recherche_patients_service import RecherchePatientsService
 from app.services.report_service import ReportService
 from app.models import RapportPatient, Patient, db  # type: ignore
+from app.utils.http_cache import cache_conditionnel
+from sqlalchemy import func
 
 api = Blueprint('api', __name__)
 
@@ -118,7 +122,7 @@ def update_patient(patient_id):
 
 @api.route('/patients/search', methods=['GET'])
 def search_patients():
-    """Recherche des patients"""
+    """Recherche prédictive des patients (top-k par similarité, paramètres q et limit)"""
     try:
         query = request.args.get('q', '').strip()
         if not query:
@@ -127,12 +131,18 @@ def search_patients():
                 'message': 'Paramètre de recherche requis'
             }), 400
         
-        patients = PatientService.search_patients(query)
-        return jsonify({
+        user_id = getattr(current_user, 'id', None)
+        # Projection issue de la requête de recherche : pas de Patient.to_dict (séances chargées une à une)
+        resultats = RecherchePatientsService.suggestions(user_id, query, request.args.get('limit', 10, type=int))
+        reponse = jsonify({
             'success': True,
-            'data': [patient.to_dict() for patient in patients],
-            'count': len(patients)
+            'data': resultats,
+            'count': len(resultats)
         })
+        # Frappes répétées (retour arrière, anti-rebond) servies par le cache du navigateur
+        reponse.headers['Cache-Control'] = 'private, max-age=15'
+        reponse.headers['Vary'] = 'Cookie'
+        return reponse
         
     except Exception as e:
         return jsonify({
@@ -167,7 +177,14 @@ def generate_patient_report(patient_id: int):
     except Exception as e:
         return jsonify({'success': False, 'message': f'Erreur serveur: {e}'}), 500
 
+def _version_rapports(patient_id: int):
+    """Nombre et dernière modification des rapports du patient (ETag de la liste)."""
+    return tuple(db.session.query(
+        func.count(RapportPatient.id), func.max(RapportPatient.date_modification)
+    ).filter(RapportPatient.patient_id == patient_id).one())
+
 @api.route('/patients/<int:patient_id>/rapports', methods=['GET'])
+@cache_conditionnel(_version_rapports)
 def list_patient_reports(patient_id: int):
     """Liste les rapports d'un patient (plus récents d'abord)."""
     try:
@@ -97,3 +97,16 @@ def create_user():  # type: ignore
     db.session.add(user)
     db.session.commit()
     print('Utilisateur créé.')
+
+@auth.cli.command('deactivate-user')  # type: ignore
+def deactivate_user():  # type: ignore
+    """Désactiver un utilisateur (sessions refusées par les workers sous PRINCIPAL_REVOCATIONS_INTERVALLE s)."""
+    from app.services.session_principal import SessionPrincipal
+    email = input('Email: ').strip().lower()
+    user = User.query.filter_by(email=email).first()  # type: ignore
+    if not user:
+        print('Utilisateur introuvable')
+        return
+    SessionPrincipal.desactiver(user)
+    db.session.commit()
+    print('Utilisateur désactivé.')
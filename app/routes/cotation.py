@@ -2,7 +2,6 @@
 Utilitaires d'accès utilisateur pour factoriser la vérification d'ownership.
 """
 import json
-import os
 
 from flask import (
     Blueprint,
@@ -24,7 +23,9 @@ from app.models.cotation import (
     GrilleEvaluation,
 )
 from app.services.analytics_service import AnalyticsService
+from app.services.catalogue_grilles import CatalogueGrilles
 from app.services.cotation_service import CotationService
+from app.services.ownership import owns_patient
 
  # Blueprint definition must come before any route decorators
 cotation_bp = Blueprint('cotation', __name__, url_prefix='/cotation')
@@ -39,7 +40,7 @@ def grille_detail(grille_id):
 
 def user_owns_patient(patient):
     """Vérifie que le patient appartient à l'utilisateur courant."""
-    return patient.user_id == current_user.id
+    return patient is not None and owns_patient(patient.id)
 
 def user_owns_grille(grille):
     """Vérifie que la grille appartient à l'utilisateur courant."""
@@ -61,30 +62,8 @@ def analyses_overview():  # type: ignore[no-untyped-def]
     return render_template('analyses/overview.html')
 
 def charger_grilles_standards():
-    """Charge toutes les grilles JSON du dossier grilles_standard et les retourne sous forme de liste."""
-    grilles = []
-    dossier = os.path.join(os.path.dirname(__file__), '../../data/grilles_standard')
-    for nom_fichier in os.listdir(dossier):
-        if nom_fichier.endswith('.json'):
-            chemin = os.path.join(dossier, nom_fichier)
-            try:
-                with open(chemin, encoding='utf-8') as f:
-                    data = json.load(f)
-                grilles.append({
-                    'nom': data.get('nom', nom_fichier.replace('.json','').upper()),
-                    'description': data.get('description', ''),
-                    'domaines': data.get('domaines', []),
-                    'reference_scientifique': data.get('reference_scientifique', nom_fichier.replace('.json','').upper()),
-                    'versions': [data],
-                    'id': f"std-{nom_fichier}",
-                    # 'publique': True
-                })
-            except Exception as e:
-                import traceback
-                print(f"[GRILLES STANDARD] Erreur chargement {nom_fichier}: {e}")
-                traceback.print_exc()
-    print(f"[GRILLES STANDARD] {len(grilles)} grilles chargées: {[g['nom'] for g in grilles]}")
-    return grilles
+    """Liste des grilles JSON du dossier grilles_standard (catalogue mémoïsé, relu si les fichiers changent)."""
+    return [dict(grille) for grille in CatalogueGrilles.charger().grilles]
 
 @cotation_bp.route('/grilles')
 @login_required
@@ -355,7 +334,7 @@ def sauvegarder_cotation(seance_id):
         ).first()
         
         if cotation_existante:
-            cotation_existante.scores_detailles = json.dumps(scores)
+            cotation_existante.scores_detailles = dict(scores)
             cotation_existante.observations_cotation = observations
             grille = GrilleEvaluation.query.get(grille_id)
             if not grille:
@@ -531,7 +510,7 @@ def creer_cotation_complete():
     cotation.therapeute_id = data.get('therapeute_id', current_user.id)
     cotation.type_cotation = data.get('type_cotation', 'globale')
     cotation.domaine_id = data.get('domaine_id')
-    cotation.scores_detailles = json.dumps(data.get('scores_detailles', {}))
+    cotation.scores_detailles = data.get('scores_detailles') or {}
     cotation.score_global = data.get('score_global')
     cotation.score_max_possible = data.get('score_max_possible')
     cotation.pourcentage_reussite = data.get('pourcentage_reussite')
@@ -1,13 +1,23 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for
-from flask_login import current_user
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
 
 from app.models.cotation import Domaine, GrilleEvaluation, Indicateur
+from app.services.cotation_service import CotationService
+from app.utils.http_cache import cache_conditionnel
 
 from .analytics import analytics_bp
+from .grilles import catalogue_bp
 from .seances import seances_bp
 
 cotation_bp = Blueprint('cotation', __name__, url_prefix='/cotation')
 
+@cotation_bp.route('/analyses')
+@login_required
+def analyses_overview():
+    """Page d'analyse (vue globale)."""
+    return render_template('analyses/overview.html')
+
+
 @cotation_bp.route('/grilles', methods=['GET'])
 def grilles():
     """Affiche le catalogue des grilles d'évaluation."""
@@ -27,6 +37,43 @@ def grille_detail(grille_id):
     return render_template('cotation/grille_detail.html', grille=grille)
 
 
+def _version_grille(grille_id: int):
+    return CotationService.version_grille(grille_id)
+
+
+@cotation_bp.route('/grille/<int:grille_id>/preview')
+@login_required
+@cache_conditionnel(_version_grille)
+def preview_grille(grille_id: int):
+    """API : Aperçu d'une grille avec tous ses domaines et indicateurs."""
+    grille = GrilleEvaluation.query.get_or_404(grille_id)
+    domaines = grille.domaines
+    return jsonify({
+        'id': grille.id,
+        'nom': grille.nom,
+        'description': grille.description,
+        'domaines': domaines,
+        'couleur_theme': domaines[0].get('couleur', '#3498db') if domaines else '#3498db'
+    })
+
+
+@cotation_bp.route('/grille/<int:grille_id>/domaines')
+@login_required
+@cache_conditionnel(_version_grille)
+def api_grille_domaines(grille_id: int):
+    """API : Domaines et indicateurs d'une grille (identifiants générés si absents)."""
+    grille = GrilleEvaluation.query.get_or_404(grille_id)
+    domaines_data = []
+    for d_idx, domaine in enumerate(grille.domaines or []):
+        dom_id = domaine.get('id') or f"d{d_idx+1}"
+        indicateurs_data = [
+            {**indicateur, 'id': indicateur.get('id') or f"{dom_id}_i{i_idx+1}"}
+            for i_idx, indicateur in enumerate(domaine.get('indicateurs', []))
+        ]
+        domaines_data.append({**domaine, 'id': dom_id, 'indicateurs': indicateurs_data})
+    return jsonify({'domaines': domaines_data})
+
+
 # Route création de grille personnalisée
 @cotation_bp.route('/grilles/creer-grille-personalisee', methods=['GET', 'POST'], endpoint='creer_grille_personalisee')
 def creer_grille_personalisee():
@@ -103,3 +150,4 @@ def admin_grilles():
 
 cotation_bp.register_blueprint(seances_bp)
 cotation_bp.register_blueprint(analytics_bp)
+cotation_bp.register_blueprint(catalogue_bp)
@@ -1,18 +1,214 @@
 """
 Routes pour les analyses et statistiques liées à la cotation thérapeutique.
 """
+from datetime import datetime
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_login import current_user, login_required
 
 from app.services.analytics_service import AnalyticsService
+from app.services.cohorte_service import CohorteService
+from app.services.historique_scores_service import HistoriqueScoresService
+from app.services.ownership import owns_patient
+from app.services.tendance_service import TendanceService
+from app.utils.cache import CacheAnalytics
+from app.utils.http_cache import cache_conditionnel
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 
 
+def _version(*args, **kwargs):
+    """Version des données de l'utilisateur : les lectures répétées (sondage du tableau de bord) répondent 304."""
+    return AnalyticsService.version_donnees(current_user.id)
+
+
+def _en_cache(espace: str, calcul):
+    """Résultat mémoïsé côté serveur par utilisateur et paramètres de la requête (invalidé au commit)."""
+    parametres = (tuple(sorted((request.view_args or {}).items())), tuple(sorted(request.args.items(multi=True))))
+    return CacheAnalytics.memoiser(espace, current_user.id, parametres, calcul)
+
+
+@analytics_bp.route('/overview')
+@login_required
+@cache_conditionnel(_version)
+def overview():
+    """API : Tous les panneaux de la page d'analyses en une réponse (panneaux en échec listés dans `erreurs`)."""
+    seuil = request.args.get('seuil', 40.0, type=float)
+    return jsonify(_en_cache('overview', lambda: AnalyticsService.vue_ensemble(current_user.id, seuil_score=seuil)))
+
+
+@analytics_bp.route('/dashboard')
+@login_required
+@cache_conditionnel(_version)
+def dashboard():
+    """API : Statistiques globales de l'utilisateur."""
+    stats = _en_cache('dashboard', lambda: AnalyticsService.statistiques_globales(current_user.id))
+    return jsonify({**stats, 'score_moyen': stats['score_moyen_30j']})
+
+
+@analytics_bp.route('/couverture')
+@login_required
+@cache_conditionnel(_version)
+def couverture():
+    """API : Part des séances cotées sur la période (30 jours par défaut)."""
+    jours = request.args.get('jours', 30, type=int)
+    taux = _en_cache('couverture', lambda: AnalyticsService.taux_couverture_cotation(current_user.id, jours))
+    return jsonify({'taux_couverture': taux, 'jours': jours})
+
+
 @analytics_bp.route('/scores-grilles')
 @login_required
+@cache_conditionnel(_version)
 def scores_grilles():
     """API : Scores moyens par grille (Top 8)."""
-    data = AnalyticsService.scores_moyens_par_grille(current_user.id, 8)
+    data = _en_cache('scores-grilles', lambda: AnalyticsService.scores_moyens_par_grille(current_user.id, 8))
     return jsonify({'items': data})
+
+
+@analytics_bp.route('/indicateur')
+@login_required
+@cache_conditionnel(_version)
+def moyenne_indicateur():
+    """API : Moyenne mensuelle d'un indicateur (agrégation SQL sur les scores JSON)."""
+    indicateur = request.args.get('indicateur', '').strip()
+    if not indicateur:
+        return jsonify({'error': 'Paramètre indicateur requis'}), 400
+    data = _en_cache('indicateur', lambda: AnalyticsService.moyenne_indicateur_par_mois(
+        current_user.id,
+        indicateur,
+        grille_id=request.args.get('grille_id', type=int),
+        patient_id=request.args.get('patient_id', type=int)
+    ))
+    return jsonify({'indicateur': indicateur, 'items': data})
+
+
+@analytics_bp.route('/patient/<int:patient_id>/indicateurs')
+@login_required
+@cache_conditionnel(_version)
+def evolution_indicateurs(patient_id: int):
+    """API : Séries par indicateur d'un patient (table de faits cotation_score)."""
+    if not owns_patient(patient_id):
+        return jsonify({'error': 'Patient non trouvé'}), 404
+    series = _en_cache('indicateurs-patient', lambda: HistoriqueScoresService.evolution_indicateurs(
+        patient_id,
+        grille_id=request.args.get('grille_id', type=int),
+        indicateurs=request.args.getlist('indicateur') or None
+    ))
+    return jsonify({'patient_id': patient_id, 'series': series})
+
+
+def _date_param(nom: str) -> datetime | None:
+    """Lit un paramètre de requête au format ISO (AAAA-MM-JJ), None si absent ou invalide."""
+    valeur = request.args.get(nom, '').strip()
+    if not valeur:
+        return None
+    try:
+        return datetime.fromisoformat(valeur)
+    except ValueError:
+        return None
+
+
+@analytics_bp.route('/activite-hebdo')
+@login_required
+@cache_conditionnel(_version)
+def activite_hebdo():
+    """API : Activité hebdomadaire (8 dernières semaines)."""
+    return jsonify(_en_cache('activite-hebdo', lambda: AnalyticsService.activite_hebdomadaire(current_user.id, 8)))
+
+
+@analytics_bp.route('/patients-risque')
+@login_required
+@cache_conditionnel(_version)
+def patients_risque():
+    """API : Patients nécessitant une attention particulière (filtrés par utilisateur)."""
+    seuil = request.args.get('seuil', 40.0, type=float)
+    patients = _en_cache('patients-risque', lambda: AnalyticsService.patients_a_risque(current_user.id, seuil))
+    return jsonify({'patients_risque': patients, 'seuil_utilise': seuil})
+
+
+@analytics_bp.route('/patient/<int:patient_id>/grille/<int:grille_id>/evolution')
+@login_required
+@cache_conditionnel(_version)
+def evolution_detaillee(patient_id: int, grille_id: int):
+    """API : Évolution détaillée d'un patient pour une grille."""
+    if not owns_patient(patient_id):
+        return jsonify({'error': 'Patient non trouvé'}), 404
+    return jsonify(_en_cache(
+        'evolution-detaillee', lambda: AnalyticsService.evolution_patient_detaillee(patient_id, grille_id)
+    ))
+
+
+@analytics_bp.route('/tendances')
+@login_required
+@cache_conditionnel(_version)
+def tendances():
+    """API : Pente, variance et tendance par patient (plusieurs patients en une requête).
+
+    Paramètres : patient_id (répétable, défaut = tous), grille_id, indicateur, debut, fin.
+    """
+    patient_ids = TendanceService.patients_utilisateur(current_user.id, request.args.getlist('patient_id', type=int))
+    resultats = _en_cache('tendances', lambda: TendanceService.tendances_patients(
+        patient_ids,
+        grille_id=request.args.get('grille_id', type=int),
+        indicateur=request.args.get('indicateur', '').strip() or None,
+        debut=_date_param('debut'),
+        fin=_date_param('fin')
+    ))
+    return jsonify({'items': [{'patient_id': pid, **stats} for pid, stats in resultats.items()]})
+
+
+@analytics_bp.route('/patient/<int:patient_id>/serie')
+@login_required
+@cache_conditionnel(_version)
+def serie_patient(patient_id: int):
+    """API : Série chronologique d'un patient avec moyenne mobile et régression."""
+    if not owns_patient(patient_id):
+        return jsonify({'error': 'Patient non trouvé'}), 404
+    grille_id = request.args.get('grille_id', type=int)
+    indicateur = request.args.get('indicateur', '').strip() or None
+    debut, fin = _date_param('debut'), _date_param('fin')
+    points, stats = _en_cache('serie-patient', lambda: (
+        TendanceService.serie_patient(
+            patient_id, grille_id=grille_id, indicateur=indicateur, debut=debut, fin=fin,
+            fenetre=request.args.get('fenetre', 3, type=int)
+        ),
+        TendanceService.tendances_patients([patient_id], grille_id, indicateur, debut, fin).get(patient_id)
+    ))
+    return jsonify({'patient_id': patient_id, 'points': points, 'statistiques': stats})
+
+
+@analytics_bp.route('/cohortes')
+@login_required
+@cache_conditionnel(_version)
+def cohortes():
+    """API : Statistiques mensuelles par cohorte (pathologie × grille × mois d'inclusion), matérialisées."""
+    def calcul():
+        CohorteService.rafraichir_si_perime(current_user.id)
+        return CohorteService.cohortes(
+            current_user.id,
+            mois_debut=request.args.get('debut') or None,
+            mois_fin=request.args.get('fin') or None,
+            pathologie=request.args.get('pathologie'),
+            grille_id=request.args.get('grille_id', type=int)
+        )
+    return jsonify({'items': _en_cache('cohortes', calcul)})
+
+
+@analytics_bp.route('/rapport-mensuel/<int:annee>/<int:mois>')
+@login_required
+@cache_conditionnel(_version)
+def rapport_mensuel(annee: int, mois: int):
+    """API : Rapport d'activité mensuel (cumuls pré-agrégés)."""
+    if not (1 <= mois <= 12) or not (2000 <= annee <= 2100):
+        return jsonify({'error': 'Période invalide'}), 400
+    return jsonify(_en_cache('rapport-mensuel', lambda: AnalyticsService.rapport_activite_mensuel(current_user.id, annee, mois)))
+
+
+@analytics_bp.route('/rapport-annuel/<int:annee>')
+@login_required
+@cache_conditionnel(_version)
+def rapport_annuel(annee: int):
+    """API : Rapport d'activité annuel (cumuls pré-agrégés)."""
+    if not (2000 <= annee <= 2100):
+        return jsonify({'error': 'Période invalide'}), 400
+    return jsonify(_en_cache('rapport-annuel', lambda: AnalyticsService.rapport_activite_annuel(current_user.id, annee)))
@@ -0,0 +1,27 @@
+"""
+Routes du catalogue des grilles (standard et prédéfinies), servies depuis la mémoire.
+"""
+
+from flask import Blueprint, Response
+from flask_login import login_required
+
+from app.services.catalogue_grilles import CatalogueGrilles
+from app.utils.http_cache import cache_conditionnel
+
+catalogue_bp = Blueprint('catalogue', __name__, url_prefix='/grilles')
+
+
+@catalogue_bp.route('/standard')
+@login_required
+@cache_conditionnel(lambda: CatalogueGrilles.charger().etag)
+def grilles_standard():
+    """API : Catalogue des grilles standard (data/grilles_standard)."""
+    return Response(CatalogueGrilles.charger().json, mimetype='application/json')
+
+
+@catalogue_bp.route('/predefinies')
+@login_required
+@cache_conditionnel(lambda: CatalogueGrilles.predefinies()[1])
+def grilles_predefinies():
+    """API : Grilles prédéfinies disponibles à la création."""
+    return Response(CatalogueGrilles.predefinies()[0], mimetype='application/json')
@@ -1,68 +1,82 @@
 """
 Routes principales de l'application
 """
-from flask import Blueprint, jsonify, redirect, render_template, url_for
+import hmac
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    url_for,
+)
 from flask_login import current_user, login_required  # type: ignore
-from sqlalchemy import text
 
 from app.models import db
 from app.services.patient_service import PatientService
+from app.services.sante_service import SanteService
 from app.services.seance_service import SeanceService
+from app.utils.metrics import Metriques
+from app.utils.profilage import EN_TETE, PARAMETRE, Profilage, est_admin
+from app.utils.sql import statistiques_pool
 
 main = Blueprint('main', __name__)
 
 @main.route('/api/health')
+@main.route('/api/health/live')
 def health_check():
-    """Endpoint de santé pour Render"""
-    return jsonify({'status': 'healthy', 'service': 'synchronie'}), 200
+    """Vivacité (sonde Render) : le processus répond, sans accès à la base."""
+    return jsonify({'status': 'healthy', 'service': 'synchronie', 'pool': statistiques_pool()}), 200
+
+@main.route('/api/health/ready')
+def health_ready():  # type: ignore[no-untyped-def]
+    """Disponibilité : SELECT 1 borné par HEALTH_READY_TIMEOUT_MS (503 si la base ne répond pas)."""
+    sonde = SanteService.sonder(db.engine, current_app.config.get('HEALTH_READY_TIMEOUT_MS', 2000))
+    return jsonify({'status': 'ready' if sonde['pret'] else 'unavailable', **sonde}), 200 if sonde['pret'] else 503
+
+@main.route('/metrics')
+def metrics():  # type: ignore[no-untyped-def]
+    """Métriques Prometheus (tous les workers si METRICS_DIR) ; jeton Bearer si METRICS_TOKEN.
+
+    Sans jeton, la route n'existe que si METRICS_PUBLIC (désactivé en production).
+    """
+    jeton = current_app.config.get('METRICS_TOKEN')
+    if not jeton and not current_app.config.get('METRICS_PUBLIC', False):
+        abort(404)
+    if jeton and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {jeton}'):
+        return Response('Non autorisé\n', status=401, mimetype='text/plain')
+    return Response(Metriques.exposer(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @main.route('/api/health/db')
 def health_db():  # type: ignore[no-untyped-def]
-    """Vérifie schéma minimal DB: colonnes essentielles présentes."""
-    issues: list[str] = []
-    details: dict[str, dict] = {}
-    tables = {
-    'grille_evaluation': {'required': {'id','nom','type_grille','domaines_config','active','date_creation','date_modification'}},
-        'patients': {'required': {'id','nom','prenom','actif','date_creation','date_modification'}},
-        'seances': {'required': {'id','patient_id','date_seance','date_creation','date_modification'}}
-    }
+    """Schéma minimal (vérifié une fois par processus), volumes estimés et disponibilité de la base."""
+    sonde = SanteService.sonder(db.engine, current_app.config.get('HEALTH_READY_TIMEOUT_MS', 2000))
+    if not sonde['pret']:
+        return jsonify({'status': 'error', 'error': sonde['erreur']}), 503
     try:
-        for table, meta in tables.items():
-            result = db.session.execute(text("""
-                SELECT column_name FROM information_schema.columns WHERE table_name=:t
-            """), {'t': table})
-            cols = {r[0] for r in result}
-            required = meta['required']
-            missing = required - cols
-            if missing:
-                issues.append(f"{table}: colonnes manquantes {sorted(missing)}")
-            # Compter lignes (résilient si table vide)
-            try:
-                count = db.session.execute(text(f'SELECT COUNT(*) FROM {table}')).scalar()  # type: ignore
-            except Exception as ce:  # pragma: no cover
-                count = None
-                issues.append(f"{table}: count échec ({ce})")
-            details[table] = {
-                'missing': sorted(missing),
-                'count': count
-            }
-        # Vérification cohérence: domaines_config non NULL
-        try:
-            bad = db.session.execute(text("SELECT COUNT(*) FROM grille_evaluation WHERE domaines_config IS NULL"))
-            bad_count = bad.scalar()  # type: ignore
-            if bad_count:
-                issues.append(f"grille_evaluation: {bad_count} lignes domaines_config NULL")
-                details['grille_evaluation']['bad_domaines_config_null'] = bad_count
-        except Exception:
-            pass
-        status = 'ok'
-        http_code = 200
-        if issues:
-            status = 'degraded'
-            http_code = 206
-        return jsonify({'status': status, 'issues': issues, 'details': details}), http_code
+        schema = SanteService.schema(db.engine, rafraichir=request.args.get('rafraichir') == '1')
+        estimations = SanteService.estimations_lignes(db.engine)
     except Exception as e:  # pragma: no cover
         return jsonify({'status': 'error', 'error': str(e)}), 500
+    details = {
+        table: {**detail, 'count': estimations.get(table), 'count_estime': True}
+        for table, detail in schema['details'].items()
+    }
+    issues = schema['issues']
+    return jsonify({
+        'status': 'degraded' if issues else 'ok',
+        'issues': issues,
+        'details': details,
+        'schema_verifie_le': schema['verifie_le'],
+        'db_ms': sonde['db_ms'],
+        'pool': statistiques_pool()
+    }), 206 if issues else 200
 
 @main.route('/')
 def index():
@@ -143,3 +157,41 @@ def dashboard():
             recent_patients=[],
             recent_patients_url=url_for('patients.list_patients'),
         )
+
+@main.route('/admin/profils')
+@login_required  # type: ignore
+def profils():
+    """Profils de requêtes récents (administrateur)."""
+    if not est_admin(current_user):
+        flash("Accès réservé à l'administrateur.", "danger")
+        return redirect(url_for('main.dashboard'))
+    return render_template(
+        'admin/profils.html',
+        profils=Profilage.lister(),
+        actif=current_app.config.get('PROFILAGE', True),
+        parametre=PARAMETRE,
+        en_tete=EN_TETE,
+    )
+
+@main.route('/admin/profils/<identifiant>')
+@login_required  # type: ignore
+def profil_detail(identifiant: str):  # type: ignore[no-untyped-def]
+    """Rapport pstats d'un profil (tri : cumulative, tottime ou ncalls)."""
+    if not est_admin(current_user):
+        abort(403)
+    profil = Profilage.detail(identifiant, tri=request.args.get('tri', 'cumulative'))
+    if profil is None:
+        abort(404)
+    return render_template('admin/profil_detail.html', profil=profil, tri=request.args.get('tri', 'cumulative'))
+
+@main.route('/admin/profils/<identifiant>.prof')
+@login_required  # type: ignore
+def profil_telecharger(identifiant: str):  # type: ignore[no-untyped-def]
+    """Fichier pstats brut (snakeviz, `python -m pstats`)."""
+    if not est_admin(current_user):
+        abort(403)
+    chemin = Profilage.chemin_stats(identifiant)
+    if chemin is None:
+        abort(404)
+    return send_file(chemin, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'synchronie-{identifiant}.prof')
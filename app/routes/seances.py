@@ -1,11 +1,12 @@
 """
 Routes pour la gestion des séances
 """
-from flask import Blueprint, flash, redirect, render_template, request, url_for
-from flask_login import login_required  # type: ignore
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required  # type: ignore
 
 from app.models import db
 from app.services.patient_service import PatientService
+from app.services.recherche_seances_service import RechercheSeancesService
 from app.services.seance_service import SeanceService
 
 seances = Blueprint('seances', __name__)
@@ -17,6 +18,22 @@ def list_seances():
     seances_list = SeanceService.get_all_seances()
     return render_template('seances/list.html', seances=seances_list)
 
+@seances.route('/recherche')
+@login_required  # type: ignore
+def recherche_seances():
+    """API : recherche plein texte (observations, transcriptions, synthèses IA), classée et paginée.
+
+    Paramètres : q, patient_id (optionnel), page, par_page (max 50).
+    """
+    resultat = RechercheSeancesService.rechercher(
+        current_user.id,  # type: ignore[attr-defined]
+        request.args.get('q', ''),
+        patient_id=request.args.get('patient_id', type=int),
+        page=request.args.get('page', 1, type=int),
+        par_page=request.args.get('par_page', 20, type=int),
+    )
+    return jsonify(resultat)
+
 @seances.route('/patient/<int:patient_id>')
 @login_required  # type: ignore
 def list_seances_patient(patient_id):
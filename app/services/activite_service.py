@@ -0,0 +1,181 @@
+"""Cumuls d'activité mensuels (table monthly_activity_rollup).
+
+Les lignes (thérapeute, mois) touchées par un flush sont recalculées dans la même
+transaction par un écouteur `after_flush` ; `reconstruire` refait la table entière.
+Les rapports mensuels et annuels deviennent des lectures de lignes pré-agrégées.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import Patient, Seance, db
+from app.models.cotation import ActiviteMensuelle, CotationSeance
+from app.utils.sql import tronquer_mois, upsert
+
+
+def bornes_mois(mois: str) -> tuple[datetime, datetime]:
+    """Intervalle [début, fin[ d'un mois "AAAA-MM"."""
+    annee, numero = (int(partie) for partie in mois.split('-'))
+    debut = datetime(annee, numero, 1)
+    fin = datetime(annee + 1, 1, 1) if numero == 12 else datetime(annee, numero + 1, 1)
+    return debut, fin
+
+
+class ActiviteService:
+    """Maintenance et lecture des cumuls d'activité mensuels."""
+
+    @staticmethod
+    def agreger(connection: Connection, user_id: int | None = None,
+                debut: datetime | None = None, fin: datetime | None = None) -> dict[tuple[int, str], dict[str, Any]]:
+        """Calcule les cumuls par (thérapeute, mois) en deux requêtes groupées."""
+        seances = Seance.__table__
+        patients = Patient.__table__
+        cotations = CotationSeance.__table__
+        mois_seance = tronquer_mois(seances.c.date_seance)
+
+        def filtrer(requete):
+            if user_id is not None:
+                requete = requete.where(patients.c.user_id == user_id)
+            if debut is not None:
+                requete = requete.where(seances.c.date_seance >= debut)
+            if fin is not None:
+                requete = requete.where(seances.c.date_seance < fin)
+            return requete
+
+        maintenant = datetime.now(timezone.utc)
+        cumuls: dict[tuple[int, str], dict[str, Any]] = {}
+        requete_seances = filtrer(
+            select(patients.c.user_id, mois_seance, func.count(seances.c.id), func.count(seances.c.patient_id.distinct()))
+            .select_from(seances.join(patients, seances.c.patient_id == patients.c.id))
+        ).group_by(patients.c.user_id, mois_seance)
+        for proprietaire, mois, nb_seances, nb_patients in connection.execute(requete_seances):
+            cumuls[(proprietaire, mois)] = {
+                'user_id': proprietaire, 'mois': mois, 'nb_seances': nb_seances, 'nb_patients_vus': nb_patients,
+                'nb_cotations': 0, 'somme_pourcentages': 0.0, 'grilles': {}, 'date_calcul': maintenant
+            }
+
+        requete_cotations = filtrer(
+            select(
+                patients.c.user_id, mois_seance, cotations.c.grille_id,
+                func.count(cotations.c.id), func.coalesce(func.sum(cotations.c.pourcentage_reussite), 0.0)
+            ).select_from(
+                cotations.join(seances, cotations.c.seance_id == seances.c.id)
+                .join(patients, seances.c.patient_id == patients.c.id)
+            )
+        ).group_by(patients.c.user_id, mois_seance, cotations.c.grille_id)
+        for proprietaire, mois, grille_id, nb, somme in connection.execute(requete_cotations):
+            ligne = cumuls.get((proprietaire, mois))
+            if ligne is None:  # cotation sans séance comptée (ne devrait pas arriver)
+                continue
+            ligne['nb_cotations'] += nb
+            ligne['somme_pourcentages'] += float(somme)
+            ligne['grilles'][str(grille_id)] = {'nb': nb, 'somme': float(somme)}
+        return cumuls
+
+    @staticmethod
+    def recalculer(connection: Connection, paires: set[tuple[int, str]]) -> None:
+        """Recalcule les lignes (thérapeute, mois) données ; supprime celles devenues vides."""
+        par_utilisateur: dict[int, set[str]] = {}
+        for user_id, mois in paires:
+            par_utilisateur.setdefault(user_id, set()).add(mois)
+        table = ActiviteMensuelle.__table__
+        for user_id, mois_touches in par_utilisateur.items():
+            debut = bornes_mois(min(mois_touches))[0]
+            fin = bornes_mois(max(mois_touches))[1]
+            cumuls = ActiviteService.agreger(connection, user_id, debut, fin)
+            lignes = [ligne for (_, mois), ligne in cumuls.items() if mois in mois_touches]
+            vides = mois_touches - {ligne['mois'] for ligne in lignes}
+            if vides:
+                connection.execute(delete(table).where(table.c.user_id == user_id, table.c.mois.in_(vides)))
+            upsert(connection, table, lignes, ['user_id', 'mois'])
+
+    @staticmethod
+    def reconstruire(user_id: int | None = None) -> int:
+        """Reconstruit la table de cumuls (une transaction).
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        connection = db.session.connection()
+        lignes = list(ActiviteService.agreger(connection, user_id).values())
+        purge = delete(ActiviteMensuelle.__table__)
+        if user_id is not None:
+            purge = purge.where(ActiviteMensuelle.__table__.c.user_id == user_id)
+        connection.execute(purge)
+        if lignes:
+            connection.execute(ActiviteMensuelle.__table__.insert(), lignes)
+        db.session.commit()
+        return len(lignes)
+
+    @staticmethod
+    def cumuls(user_id: int, mois_debut: str, mois_fin: str) -> list[ActiviteMensuelle]:
+        """Lignes de cumul d'un thérapeute entre deux mois inclus (lecture par index unique)."""
+        return ActiviteMensuelle.query.filter(
+            ActiviteMensuelle.user_id == user_id,
+            ActiviteMensuelle.mois >= mois_debut,
+            ActiviteMensuelle.mois <= mois_fin
+        ).order_by(ActiviteMensuelle.mois).all()
+
+    # ------------------- Écouteur de session ------------------- #
+    @staticmethod
+    def installer() -> None:
+        """Branche la mise à jour des cumuls sur les flush de session (idempotent)."""
+        if not event.contains(Session, 'after_flush', _apres_flush):
+            event.listen(Session, 'after_flush', _apres_flush)
+
+
+def _valeurs(obj: Any, attribut: str) -> list[Any]:
+    """Valeur courante et éventuelle valeur précédente d'un attribut (historique du flush)."""
+    historique = inspect(obj).attrs[attribut].history
+    return [v for v in (*historique.added, *historique.unchanged, *historique.deleted) if v is not None]
+
+
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    """Recalcule les mois touchés par les séances/cotations créées, modifiées ou supprimées."""
+    touches: set[tuple[int, datetime]] = set()  # (patient_id, date_seance)
+    seances_a_lire: set[int] = set()
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Seance):
+            if obj in session.dirty and not (
+                inspect(obj).attrs.date_seance.history.has_changes() or inspect(obj).attrs.patient_id.history.has_changes()
+            ):
+                continue
+            for patient_id in _valeurs(obj, 'patient_id'):
+                for date_seance in _valeurs(obj, 'date_seance'):
+                    touches.add((patient_id, date_seance))
+        elif isinstance(obj, CotationSeance):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            seances_a_lire.update(_valeurs(obj, 'seance_id'))
+
+    if not (touches or seances_a_lire):
+        return
+    connection = session.connection()
+    if seances_a_lire:
+        seances = Seance.__table__
+        touches.update(connection.execute(
+            select(seances.c.patient_id, seances.c.date_seance).where(seances.c.id.in_(seances_a_lire))
+        ).all())
+    if not touches:
+        return
+
+    patients = Patient.__table__
+    proprietaires = dict(connection.execute(
+        select(patients.c.id, patients.c.user_id).where(patients.c.id.in_({patient_id for patient_id, _ in touches}))
+    ).all())
+    for obj in session.deleted:  # patient supprimé dans ce même flush
+        if isinstance(obj, Patient) and obj.id is not None:
+            proprietaires.setdefault(obj.id, obj.user_id)
+
+    paires = {
+        (proprietaires[patient_id], date_seance.strftime('%Y-%m'))
+        for patient_id, date_seance in touches if patient_id in proprietaires
+    }
+    if paires:
+        ActiviteService.recalculer(connection, paires)
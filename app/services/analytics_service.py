@@ -1,58 +1,281 @@
 """Service d'analytics et reporting pour la cotation thérapeutique."""
 from __future__ import annotations
 
+import logging
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import desc, func
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    String,
+    case,
+    cast,
+    desc,
+    func,
+    literal_column,
+    null,
+    select,
+    type_coerce,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Patient, Seance, db
-from app.models.cotation import CotationSeance, GrilleEvaluation
+from app.models.cotation import ActiviteMensuelle, CotationSeance, GrilleEvaluation, ObjectifTherapeutique
+from app.services.activite_service import ActiviteService
+from app.services.tendance_service import TendanceService
+from app.utils.sql import est_postgres, tronquer_mois
+
+logger = logging.getLogger(__name__)
+
+PANNEAUX = ('statistiques', 'couverture', 'activite_hebdo', 'scores_grilles', 'patients_risque')
 
 
 class AnalyticsService:
     """Service pour l'analyse et le reporting des données de cotation."""
 
     @staticmethod
-    def statistiques_globales(user_id: int) -> dict[str, Any]:
-        """Statistiques globales pour un musicothérapeute."""
-        # Compter patients actifs
-        nb_patients = Patient.query.filter_by(
-            user_id=user_id,
-            actif=True
-        ).count()
-
-        # Compter séances ce mois
-        debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        nb_seances_mois = db.session.query(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut_mois
-        ).count()
+    def version_donnees(user_id: int) -> tuple[Any, ...]:
+        """Version des données analytiques d'un utilisateur (une requête, pour les ETag).
+
+        Nombre de lignes et dernière modification des patients, séances, cotations,
+        objectifs et grilles de l'utilisateur (noms et grilles actives sont servis) :
+        toute création, modification ou suppression change la version.
+        La date du jour en fait partie (fenêtres glissantes « 30 derniers jours »).
+        """
+        colonnes = []
+        for modele in (Patient, Seance, CotationSeance, ObjectifTherapeutique):
+            for agregat in (func.count(modele.id), func.max(modele.date_modification)):
+                requete = select(agregat).where(Patient.user_id == user_id)
+                if modele is not Patient:
+                    requete = requete.select_from(modele).join(Patient, modele.patient_id == Patient.id)
+                colonnes.append(requete.scalar_subquery())
+        for agregat in (func.count(GrilleEvaluation.id), func.max(GrilleEvaluation.date_modification)):
+            colonnes.append(select(agregat).where(GrilleEvaluation.user_id == user_id).scalar_subquery())
+        return (datetime.now().date().isoformat(), *db.session.execute(select(*colonnes)).one())
 
-        # Compter cotations totales
-        nb_cotations = db.session.query(CotationSeance).join(Seance).join(Patient).filter(
-            Patient.user_id == user_id
-        ).count()
+    @staticmethod
+    def vue_ensemble(user_id: int, semaines: int = 8, seuil_score: float = 40.0,
+                     jours_couverture: int = 30) -> dict[str, Any]:
+        """Tous les panneaux de la page d'analyses en un aller-retour base.
+
+        Une requête UNION ALL sur des CTE partagées (séances et cotations de l'utilisateur)
+        alimente statistiques, couverture, activité hebdomadaire, scores par grille et
+        patients à risque. Si elle échoue, chaque panneau est recalculé séparément ; un
+        panneau en échec vaut None et figure dans `erreurs`, les autres restent servis.
+        """
+        resultat: dict[str, Any] = {'erreurs': {}}
+        maintenant = datetime.now()
+        debut_semaine = (maintenant - timedelta(days=maintenant.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        bornes = [debut_semaine - timedelta(weeks=semaines - 1 - i) for i in range(semaines + 1)]
+
+        lignes: dict[str, list[Any]] | None = None
+        try:
+            with db.session.begin_nested():
+                requete = AnalyticsService._requete_vue_ensemble(user_id, maintenant, bornes, seuil_score, jours_couverture)
+                lignes = {panneau: [] for panneau in ('stat', 'semaine', 'grille', 'risque')}
+                for ligne in db.session.execute(requete).all():
+                    lignes[ligne.panneau].append(ligne)
+        except SQLAlchemyError:
+            logger.exception("Requête combinée de la vue d'ensemble en échec, calcul par panneau")
+            lignes = None
+
+        if lignes is not None:
+            stats = {ligne.libelle: ligne for ligne in lignes['stat']}
+            calculs: dict[str, Callable[[], Any]] = {
+                'statistiques': lambda: {
+                    'nb_patients': int(stats['patients'].n1 or 0),
+                    'nb_seances_mois': int(stats['seances'].n1 or 0),
+                    'nb_cotations': int(stats['cotations'].n1 or 0),
+                    'nb_grilles': int(stats['grilles'].n1 or 0),
+                    'score_moyen_30j': round(float(stats['cotations'].v1 or 0), 1),
+                },
+                'couverture': lambda: {'taux_couverture': AnalyticsService._taux(
+                    stats['cotations'].n2 or 0, stats['seances'].n2 or 0
+                )},
+                'activite_hebdo': lambda: AnalyticsService._activite_depuis_lignes(bornes, lignes['semaine']),
+                'scores_grilles': lambda: [
+                    {'grille': ligne.libelle, 'utilisations': int(ligne.n1 or 0), 'score_moyen': round(float(ligne.v1 or 0.0), 1)}
+                    for ligne in sorted(lignes['grille'], key=lambda ligne: -(ligne.n1 or 0))[:8]
+                ],
+                'patients_risque': lambda: [
+                    AnalyticsService._patient_risque(ligne.cle, ligne.libelle, ligne.libelle2, float(ligne.v1),
+                                                     int(ligne.n1), ligne.v2, ligne.instant)
+                    for ligne in sorted(lignes['risque'], key=lambda ligne: ligne.cle)
+                ],
+            }
+        else:
+            calculs = {
+                'statistiques': lambda: AnalyticsService.statistiques_globales(user_id),
+                'couverture': lambda: {'taux_couverture': AnalyticsService.taux_couverture_cotation(user_id, jours_couverture)},
+                'activite_hebdo': lambda: AnalyticsService.activite_hebdomadaire(user_id, semaines),
+                'scores_grilles': lambda: AnalyticsService.scores_moyens_par_grille(user_id, 8),
+                'patients_risque': lambda: AnalyticsService.patients_a_risque(user_id, seuil_score),
+            }
 
-        # Compter grilles personnalisées
-        nb_grilles = GrilleEvaluation.query.filter_by(
-            user_id=user_id,
-            active=True
-        ).count()
+        for panneau in PANNEAUX:
+            try:
+                if lignes is None:
+                    with db.session.begin_nested():
+                        resultat[panneau] = calculs[panneau]()
+                else:
+                    resultat[panneau] = calculs[panneau]()
+            except Exception:
+                logger.exception("Panneau %s de la vue d'ensemble indisponible", panneau)
+                resultat[panneau] = None
+                resultat['erreurs'][panneau] = 'indisponible'
+        return resultat
 
-        # Score moyen global (30 derniers jours)
+    @staticmethod
+    def _requete_vue_ensemble(user_id: int, maintenant: datetime, bornes: list[datetime],
+                              seuil_score: float, jours_couverture: int) -> Any:
+        """UNION ALL étiqueté (panneau, cle, libelle, libelle2, n1, n2, v1, v2, instant)."""
+        debut_mois = maintenant.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        il_y_a_30j = maintenant - timedelta(days=30)
+        debut_couverture = maintenant - timedelta(days=jours_couverture)
+
+        seances = select(Seance.id, Seance.patient_id, Seance.date_seance).join(
+            Patient, Seance.patient_id == Patient.id
+        ).where(Patient.user_id == user_id).cte('seances_utilisateur')
+        cotations = select(
+            CotationSeance.id, CotationSeance.seance_id, CotationSeance.grille_id,
+            CotationSeance.pourcentage_reussite, CotationSeance.date_creation,
+            seances.c.patient_id, seances.c.date_seance
+        ).join(seances, CotationSeance.seance_id == seances.c.id).cte('cotations_utilisateur')
+
+        def ligne(panneau: str, cle: Any = None, libelle: Any = None, libelle2: Any = None, n1: Any = None,
+                  n2: Any = None, v1: Any = None, v2: Any = None, instant: Any = None) -> list[Any]:
+            # NULL typés par CAST ; valeurs simplement typées (un CAST AS DATETIME SQLite les convertirait)
+            colonnes = {'cle': (cle, Integer), 'libelle': (libelle, String), 'libelle2': (libelle2, String),
+                        'n1': (n1, Integer), 'n2': (n2, Integer), 'v1': (v1, Float), 'v2': (v2, Float),
+                        'instant': (instant, DateTime)}
+            return [literal_column(f"'{panneau}'", String).label('panneau')] + [
+                (cast(null(), type_) if valeur is None else type_coerce(valeur, type_)).label(nom)
+                for nom, (valeur, type_) in colonnes.items()
+            ]
+
+        branches = [
+            select(*ligne('stat', libelle=literal_column("'patients'"), n1=func.count(Patient.id))).where(
+                Patient.user_id == user_id, Patient.actif.is_(True)
+            ),
+            select(*ligne('stat', libelle=literal_column("'grilles'"), n1=func.count(GrilleEvaluation.id))).where(
+                GrilleEvaluation.user_id == user_id, GrilleEvaluation.active.is_(True)
+            ),
+            select(*ligne(
+                'stat', libelle=literal_column("'seances'"),
+                n1=func.count(seances.c.id).filter(seances.c.date_seance >= debut_mois),
+                n2=func.count(seances.c.id).filter(seances.c.date_seance >= debut_couverture),
+            )).select_from(seances),
+            select(*ligne(
+                'stat', libelle=literal_column("'cotations'"),
+                n1=func.count(cotations.c.id),
+                n2=func.count(func.distinct(cotations.c.seance_id)).filter(cotations.c.date_seance >= debut_couverture),
+                v1=func.avg(cotations.c.pourcentage_reussite).filter(cotations.c.date_seance >= il_y_a_30j),
+            )).select_from(cotations),
+        ]
+
+        # Activité : numéro de semaine calculé en SQL à partir des bornes (portable)
+        semaine = case(
+            *[(seances.c.date_seance >= borne, i) for i, borne in reversed(list(enumerate(bornes[:-1])))],
+            else_=None
+        )
+        branches.append(
+            select(*ligne('semaine', cle=semaine, n1=func.count(seances.c.id))).where(
+                seances.c.date_seance >= bornes[0], seances.c.date_seance < bornes[-1]
+            ).group_by(semaine)
+        )
+
+        branches.append(
+            select(*ligne(
+                'grille', cle=GrilleEvaluation.id, libelle=GrilleEvaluation.nom,
+                n1=func.count(cotations.c.id), v1=func.avg(cotations.c.pourcentage_reussite)
+            )).join(GrilleEvaluation, GrilleEvaluation.id == cotations.c.grille_id).group_by(
+                GrilleEvaluation.id, GrilleEvaluation.nom
+            )
+        )
+
+        # Risque : trois cotations les plus récentes (30 jours) par patient, moyenne sous le seuil
+        rang = func.row_number().over(
+            partition_by=cotations.c.patient_id, order_by=cotations.c.date_creation.desc()
+        ).label('rang')
+        recentes = select(cotations.c.patient_id, cotations.c.pourcentage_reussite, cotations.c.date_creation, rang).where(
+            cotations.c.date_creation >= il_y_a_30j
+        ).subquery('recentes')
+        moyenne = func.avg(recentes.c.pourcentage_reussite)
+        branches.append(
+            select(*ligne(
+                'risque', cle=Patient.id, libelle=Patient.nom, libelle2=Patient.prenom,
+                n1=func.count(recentes.c.pourcentage_reussite), v1=moyenne,
+                v2=func.max(case((recentes.c.rang == 1, recentes.c.pourcentage_reussite))),
+                instant=func.max(case((recentes.c.rang == 1, recentes.c.date_creation))),
+            )).join(Patient, Patient.id == recentes.c.patient_id).where(recentes.c.rang <= 3).group_by(
+                Patient.id, Patient.nom, Patient.prenom
+            ).having(func.count(recentes.c.pourcentage_reussite) > 0, moyenne < seuil_score)
+        )
+        return union_all(*branches)
+
+    @staticmethod
+    def _taux(cotees: int, total: int) -> float:
+        return round((cotees / total) * 100, 1) if total > 0 else 0.0
+
+    @staticmethod
+    def _activite_depuis_lignes(bornes: list[datetime], lignes: list[Any]) -> dict[str, Any]:
+        comptes = {ligne.cle: int(ligne.n1 or 0) for ligne in lignes}
+        return {
+            'labels': [f"S{(debut.isocalendar().week):02d}" for debut in bornes[:-1]],
+            'values': [comptes.get(i, 0) for i in range(len(bornes) - 1)],
+        }
+
+    @staticmethod
+    def _patient_risque(patient_id: int, nom: str, prenom: str, score_moyen: float, nb: int,
+                        dernier_score: float | None, derniere_date: datetime | None) -> dict[str, Any]:
+        return {
+            'patient_id': patient_id,
+            'nom': nom,
+            'prenom': prenom,
+            'score_moyen': round(score_moyen, 1),
+            'nb_cotations': nb,
+            'niveau_risque': 'élevé' if score_moyen < 30 else 'modéré',
+            'derniere_cotation': {
+                'score_total': dernier_score,
+                'date': derniere_date.strftime('%d/%m/%Y') if derniere_date else None
+            }
+        }
+
+    @staticmethod
+    def statistiques_globales(user_id: int) -> dict[str, Any]:
+        """Statistiques globales pour un musicothérapeute (une seule requête agrégée)."""
+        debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         il_y_a_30j = datetime.now() - timedelta(days=30)
-        score_moyen = db.session.query(func.avg(CotationSeance.pourcentage_reussite)).join(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= il_y_a_30j
-        ).scalar() or 0
+
+        nb_grilles = select(func.count(GrilleEvaluation.id)).where(
+            GrilleEvaluation.user_id == user_id,
+            GrilleEvaluation.active.is_(True)
+        ).scalar_subquery()
+        ligne = db.session.execute(
+            select(
+                func.count(func.distinct(Patient.id)).filter(Patient.actif.is_(True)).label('nb_patients'),
+                func.count(func.distinct(Seance.id)).filter(Seance.date_seance >= debut_mois).label('nb_seances_mois'),
+                func.count(CotationSeance.id).label('nb_cotations'),
+                nb_grilles.label('nb_grilles'),
+                func.avg(CotationSeance.pourcentage_reussite).filter(Seance.date_seance >= il_y_a_30j).label('score_moyen'),
+            ).select_from(Patient).outerjoin(
+                Seance, Seance.patient_id == Patient.id
+            ).outerjoin(
+                CotationSeance, CotationSeance.seance_id == Seance.id
+            ).where(Patient.user_id == user_id)
+        ).one()
 
         return {
-            'nb_patients': nb_patients,
-            'nb_seances_mois': nb_seances_mois,
-            'nb_cotations': nb_cotations,
-            'nb_grilles': nb_grilles,
-            'score_moyen_30j': round(score_moyen, 1)
+            'nb_patients': ligne.nb_patients or 0,
+            'nb_seances_mois': ligne.nb_seances_mois or 0,
+            'nb_cotations': ligne.nb_cotations or 0,
+            'nb_grilles': ligne.nb_grilles or 0,
+            'score_moyen_30j': round(float(ligne.score_moyen or 0), 1)
         }
 
     @staticmethod
@@ -70,7 +293,8 @@ class AnalyticsService:
         ).filter(
             Seance.patient_id == patient_id,
             CotationSeance.grille_id == grille_id
-        ).order_by(Seance.date_seance.asc()).limit(limite).all()
+        ).order_by(Seance.date_seance.desc()).limit(limite).all()
+        cotations.reverse()  # les N plus récentes, en ordre chronologique
 
         if not cotations:
             return {
@@ -93,27 +317,24 @@ class AnalyticsService:
                 'seance_id': seance.id
             })
 
-        # Calculer la tendance (régression linéaire simple)
-        tendance = None
-        progression = 0
-        if len(donnees) >= 2:
-            premier_score = donnees[0]['pourcentage']
-            dernier_score = donnees[-1]['pourcentage']
-            progression = dernier_score - premier_score
-            
-            if progression > 5:
-                tendance = 'amelioration'
-            elif progression < -5:
-                tendance = 'deterioration'
-            else:
-                tendance = 'stable'
+        # Tendance par moindres carrés sur la fenêtre (et non premier/dernier point)
+        pourcentages = [cotation.pourcentage_reussite for cotation, _ in cotations]
+        for point, moyenne in zip(donnees, TendanceService.moyenne_mobile(pourcentages), strict=True):
+            point['moyenne_mobile'] = moyenne
+        stats = TendanceService.regression(
+            [(seance.date_seance, cotation.pourcentage_reussite) for cotation, seance in cotations]
+        )
+        tendance = stats['tendance']
+        progression = stats['progression']
 
         return {
             'patient': f"{patient.prenom} {patient.nom}",
             'grille': grille.nom,
             'cotations': donnees,
             'tendance': tendance,
-            'progression': round(progression, 1)
+            'progression': round(progression, 1),
+            'pente_par_mois': stats['pente_par_mois'],
+            'variance': stats['variance']
         }
 
     @staticmethod
@@ -151,31 +372,13 @@ class AnalyticsService:
 
     @staticmethod
     def rapport_activite_mensuel(user_id: int, annee: int, mois: int) -> dict[str, Any]:
-        """Rapport d'activité détaillé pour un mois donné."""
+        """Rapport d'activité détaillé pour un mois donné (lu depuis monthly_activity_rollup)."""
         debut_mois = datetime(annee, mois, 1)
         fin_mois = datetime(annee + 1, 1, 1) if mois == 12 else datetime(annee, mois + 1, 1)
+        cle_mois = f"{annee:04d}-{mois:02d}"
 
-        seances = db.session.query(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut_mois,
-            Seance.date_seance < fin_mois
-        ).all()
-
-        cotations = db.session.query(CotationSeance).join(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut_mois,
-            Seance.date_seance < fin_mois
-        ).all()
-
-        stats_grilles = db.session.query(
-            GrilleEvaluation.nom,
-            func.count(CotationSeance.id).label('nb_utilisations'),
-            func.avg(CotationSeance.pourcentage_reussite).label('score_moyen')
-        ).join(CotationSeance).join(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut_mois,
-            Seance.date_seance < fin_mois
-        ).group_by(GrilleEvaluation.id, GrilleEvaluation.nom).all()
+        cumuls = ActiviteService.cumuls(user_id, cle_mois, cle_mois)
+        rapport = AnalyticsService._synthese_cumuls(cumuls)
 
         patients_actifs = db.session.query(
             Patient.prenom,
@@ -191,18 +394,7 @@ class AnalyticsService:
 
         return {
             'periode': f"{mois:02d}/{annee}",
-            'nb_seances': len(seances),
-            'nb_cotations': len(cotations),
-            'nb_patients_vus': len({s.patient_id for s in seances}),
-            'score_moyen_global': round(sum(c.pourcentage_reussite for c in cotations) / len(cotations), 1) if cotations else 0,
-            'grilles_utilisees': [
-                {
-                    'nom': nom,
-                    'nb_utilisations': nb_util,
-                    'score_moyen': round(score_moy, 1)
-                }
-                for nom, nb_util, score_moy in stats_grilles
-            ],
+            **rapport,
             'patients_actifs': [
                 {
                     'nom': f"{prenom} {nom}",
@@ -212,6 +404,57 @@ class AnalyticsService:
             ]
         }
 
+    @staticmethod
+    def rapport_activite_annuel(user_id: int, annee: int) -> dict[str, Any]:
+        """Rapport d'activité d'une année : totaux et détail mensuel (lu depuis monthly_activity_rollup).
+
+        `nb_patients_vus` y est la somme des patients vus chaque mois (patients-mois).
+        """
+        cumuls = ActiviteService.cumuls(user_id, f"{annee:04d}-01", f"{annee:04d}-12")
+        return {
+            'periode': str(annee),
+            **AnalyticsService._synthese_cumuls(cumuls),
+            'mois': [
+                {
+                    'mois': cumul.mois,
+                    'nb_seances': cumul.nb_seances,
+                    'nb_cotations': cumul.nb_cotations,
+                    'nb_patients_vus': cumul.nb_patients_vus,
+                    'score_moyen': round(cumul.somme_pourcentages / cumul.nb_cotations, 1) if cumul.nb_cotations else 0
+                }
+                for cumul in cumuls
+            ]
+        }
+
+    @staticmethod
+    def _synthese_cumuls(cumuls: list[ActiviteMensuelle]) -> dict[str, Any]:
+        """Additionne des lignes de cumul mensuel (totaux et usage des grilles)."""
+        nb_cotations = sum(c.nb_cotations for c in cumuls)
+        somme = sum(c.somme_pourcentages for c in cumuls)
+        grilles: dict[int, dict[str, float]] = {}
+        for cumul in cumuls:
+            for grille_id, usage in (cumul.grilles or {}).items():
+                total = grilles.setdefault(int(grille_id), {'nb': 0, 'somme': 0.0})
+                total['nb'] += usage.get('nb', 0)
+                total['somme'] += usage.get('somme', 0.0)
+        noms = dict(
+            db.session.query(GrilleEvaluation.id, GrilleEvaluation.nom).filter(GrilleEvaluation.id.in_(grilles)).all()
+        ) if grilles else {}
+        return {
+            'nb_seances': sum(c.nb_seances for c in cumuls),
+            'nb_cotations': nb_cotations,
+            'nb_patients_vus': sum(c.nb_patients_vus for c in cumuls),
+            'score_moyen_global': round(somme / nb_cotations, 1) if nb_cotations else 0,
+            'grilles_utilisees': [
+                {
+                    'nom': noms.get(grille_id, f"Grille {grille_id}"),
+                    'nb_utilisations': int(usage['nb']),
+                    'score_moyen': round(usage['somme'] / usage['nb'], 1) if usage['nb'] else 0
+                }
+                for grille_id, usage in sorted(grilles.items(), key=lambda item: -item[1]['nb'])
+            ]
+        }
+
     # ================== Nouveaux indicateurs pour le tableau d'analyses ==================
     @staticmethod
     def activite_hebdomadaire(user_id: int, semaines: int = 8) -> dict[str, Any]:
@@ -273,16 +516,55 @@ class AnalyticsService:
 
     @staticmethod
     def taux_couverture_cotation(user_id: int, jours: int = 30) -> float:
-        """Part des séances cotées dans la période (en %)."""
+        """Part des séances cotées dans la période (en %), en une requête."""
         debut = datetime.now() - timedelta(days=jours)
-        total_seances = db.session.query(Seance).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut
-        ).count()
+        total_seances, seances_cotees = db.session.execute(
+            select(
+                func.count(func.distinct(Seance.id)),
+                func.count(func.distinct(CotationSeance.seance_id)),
+            ).select_from(Seance).join(
+                Patient, Seance.patient_id == Patient.id
+            ).outerjoin(
+                CotationSeance, CotationSeance.seance_id == Seance.id
+            ).where(
+                Patient.user_id == user_id,
+                Seance.date_seance >= debut
+            )
+        ).one()
+        return AnalyticsService._taux(seances_cotees or 0, total_seances or 0)
 
-        seances_cotees = db.session.query(func.count(func.distinct(Seance.id))).join(CotationSeance, CotationSeance.seance_id == Seance.id).join(Patient).filter(
-            Patient.user_id == user_id,
-            Seance.date_seance >= debut
-        ).scalar() or 0
-
-        return round((seances_cotees / total_seances) * 100, 1) if total_seances > 0 else 0.0
+    @staticmethod
+    def moyenne_indicateur_par_mois(user_id: int, indicateur: str, grille_id: int | None = None,
+                                    patient_id: int | None = None) -> list[dict[str, Any]]:
+        """Moyenne mensuelle d'un indicateur, agrégée en SQL sur le document JSON des scores.
+
+        `indicateur` est la clé telle que stockée dans scores_detailles
+        (ex: "Engagement & Initiative_Participation active").
+        """
+        valeur = CotationSeance.scores_detailles[indicateur].as_float()
+        mois = tronquer_mois(Seance.date_seance).label('mois')
+        query = db.session.query(
+            mois,
+            func.avg(valeur).label('moyenne'),
+            func.count(CotationSeance.id).label('nb')
+        ).join(Seance, CotationSeance.seance_id == Seance.id).join(Patient, Seance.patient_id == Patient.id).filter(
+            Patient.user_id == user_id
+        )
+        if est_postgres():
+            # Filtre d'existence de clé servi par l'index GIN
+            query = query.filter(type_coerce(CotationSeance.scores_detailles, JSONB).has_key(indicateur))
+        else:
+            query = query.filter(valeur.isnot(None))
+        if grille_id is not None:
+            query = query.filter(CotationSeance.grille_id == grille_id)
+        if patient_id is not None:
+            query = query.filter(Seance.patient_id == patient_id)
+        resultats = query.group_by(mois).order_by(mois).all()
+        return [
+            {
+                'mois': m,
+                'moyenne': round(float(moy), 2) if moy is not None else None,
+                'nb_cotations': int(nb or 0)
+            }
+            for m, moy, nb in resultats
+        ]
@@ -6,20 +6,16 @@ import contextlib
 import logging
 import os
 import tempfile
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
-from openai import OpenAI
 from werkzeug.datastructures import FileStorage
 
-Mistral = None  # type: ignore
-MistralClient = None  # type: ignore
-try:  # Tentatives d'import flexibles
-    from mistralai import Mistral  # type: ignore
-except Exception:  # pragma: no cover
-    with contextlib.suppress(Exception):
-        from mistralai.client import MistralClient  # type: ignore
-
 from app.models import Seance, db
+from app.services.ia_provider import FournisseurIA
+from app.utils.instrumentation import mesurer_appel_ia
+
+if TYPE_CHECKING:  # pragma: no cover
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -32,49 +28,15 @@ class AudioTranscriptionService:
     
     def __init__(self):
         """Initialise le service (OpenAI pour transcription Whisper, Mistral pour synthèse si disponible)"""
-        self.openai_client: Optional[OpenAI] = None
-        self.mistral_client = None  # type: ignore
-        self.mistral_init_error: Optional[str] = None
-        self.mistral_mode: Optional[str] = None  # 'responses' | 'chat' | 'unknown'
-
-        openai_key = os.environ.get('OPENAI_API_KEY')
-        mistral_key = os.environ.get('MISTRAL_API_KEY')
-        mistral_model = os.environ.get('MISTRAL_MODEL', 'mistral-large-latest')
-
-        # Initialisation Mistral (synthèse)
-        logger.info(f"Initialisation AudioTranscriptionService: key_mistral_present={bool(mistral_key)} key_openai_present={bool(openai_key)}")
-
-        if mistral_key:
-            if Mistral is not None or MistralClient is not None:
-                try:
-                    client_cls = Mistral if Mistral is not None else MistralClient
-                    self.mistral_client = client_cls(api_key=mistral_key)  # type: ignore
-                    self.mistral_model = mistral_model
-                    cls_name = getattr(client_cls, '__name__', 'UnknownClient')
-                    # Déterminer le mode disponible (nouvelle API responses vs ancienne API chat)
-                    if hasattr(self.mistral_client, 'responses'):
-                        self.mistral_mode = 'responses'
-                    elif hasattr(self.mistral_client, 'chat'):
-                        self.mistral_mode = 'chat'
-                    else:
-                        self.mistral_mode = 'unknown'
-                    logger.info(
-                        f"✅ Client Mistral initialisé (classe={cls_name}, modèle={mistral_model}, mode={self.mistral_mode})"
-                    )
-                except Exception as e:
-                    self.mistral_init_error = str(e)
-                    logger.error(f"❌ Impossible d'initialiser Mistral: {e}")
-            else:
-                self.mistral_init_error = "Paquet mistralai non installé"
-                logger.warning("⚠️ Paquet 'mistralai' non installé: pip install mistralai pour activer Mistral")
-
-        # Initialisation OpenAI (nécessaire pour Whisper). On garde logique minimale.
-        if openai_key:
-            try:
-                self.openai_client = OpenAI(api_key=openai_key)
-            except Exception as e:
-                logger.error(f"❌ Échec initialisation OpenAI: {e}")
-        else:
+        # Clients obtenus via la façade : SDK importés et clients créés au premier usage
+        self.mistral_client, self.mistral_mode, self.mistral_init_error = FournisseurIA.mistral()  # mode: 'responses' | 'chat' | 'unknown'
+        self.openai_client: Optional[OpenAI] = FournisseurIA.openai()
+        self.mistral_model = FournisseurIA.modele_mistral()
+        logger.info(
+            f"Initialisation AudioTranscriptionService: mistral={self.mistral_mode or 'absent'} "
+            f"openai={'ok' if self.openai_client else 'absent'}"
+        )
+        if not self.openai_client:
             logger.warning("OPENAI_API_KEY non configurée: transcription Whisper désactivée")
 
         if not self.openai_client and not self.mistral_client:
@@ -146,7 +108,7 @@ class AudioTranscriptionService:
             
             try:
                 # Transcription avec Whisper - version simplifiée
-                with open(temp_file_path, 'rb') as audio_data:
+                with open(temp_file_path, 'rb') as audio_data, mesurer_appel_ia('openai'):
                     transcript = self.openai_client.audio.transcriptions.create(
                         model="whisper-1",
                         file=audio_data,
@@ -187,12 +149,13 @@ class AudioTranscriptionService:
         # Nouveau SDK (responses)
         if hasattr(self.mistral_client, 'responses'):
             try:  # type: ignore[attr-defined]
-                m_response = self.mistral_client.responses.create(  # type: ignore
-                    model=self.mistral_model,
-                    messages=messages,
-                    temperature=0.3,
-                    max_tokens=1000,
-                )
+                with mesurer_appel_ia('mistral'):
+                    m_response = self.mistral_client.responses.create(  # type: ignore
+                        model=self.mistral_model,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=1000,
+                    )
                 return self._extract_text_from_response(m_response)
             except Exception as e:  # pragma: no cover
                 raise RuntimeError(f"Échec appel Mistral (responses): {e}") from e
@@ -210,21 +173,22 @@ class AudioTranscriptionService:
             chat_obj = self.mistral_client.chat  # type: ignore[attr-defined]
             # Deux variantes possibles: méthode .complete ou appel direct chat(model=..., messages=...)
             try:  # type: ignore[attr-defined]
-                if hasattr(chat_obj, 'complete'):
-                    completion = chat_obj.complete(  # type: ignore
-                        model=self.mistral_model,
-                        messages=chat_messages,
-                        temperature=0.3,
-                        max_tokens=1000,
-                    )
-                else:
-                    # Appel direct si chat est une fonction
-                    completion = chat_obj(
-                        model=self.mistral_model,
-                        messages=chat_messages,
-                        temperature=0.3,
-                        max_tokens=1000,
-                    )
+                with mesurer_appel_ia('mistral'):
+                    if hasattr(chat_obj, 'complete'):
+                        completion = chat_obj.complete(  # type: ignore
+                            model=self.mistral_model,
+                            messages=chat_messages,
+                            temperature=0.3,
+                            max_tokens=1000,
+                        )
+                    else:
+                        # Appel direct si chat est une fonction
+                        completion = chat_obj(
+                            model=self.mistral_model,
+                            messages=chat_messages,
+                            temperature=0.3,
+                            max_tokens=1000,
+                        )
                 return self._extract_text_from_response(completion)
             except Exception as e:  # pragma: no cover
                 logger.error(
@@ -0,0 +1,123 @@
+"""Catalogue des grilles standard (data/grilles_standard/*.json), chargé une fois par processus.
+
+Le catalogue est immuable une fois chargé et rechargé seulement si la signature des
+fichiers (nom, taille, mtime) change. Un artefact précompilé (`flask grilles-catalogue`)
+évite l'analyse des JSON au premier accès lorsqu'il correspond aux fichiers.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DOSSIER_GRILLES = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'grilles_standard'))
+ARTEFACT = os.path.join(DOSSIER_GRILLES, 'catalogue.pickle')
+
+Signature = tuple[tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class Catalogue:
+    """Instantané immuable du catalogue : grilles sérialisées une fois, ETag du contenu."""
+
+    signature: Signature
+    grilles: tuple[dict[str, Any], ...]
+    json: str
+    etag: str
+
+
+def _signature(dossier: str) -> Signature:
+    entrees = []
+    for entree in os.scandir(dossier):
+        if entree.name.endswith('.json') and entree.is_file():
+            stat = entree.stat()
+            entrees.append((entree.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(entrees))
+
+
+def _analyser(dossier: str, signature: Signature) -> Catalogue:
+    grilles: list[dict[str, Any]] = []
+    for nom_fichier, _, _ in signature:
+        base = nom_fichier.replace('.json', '').upper()
+        try:
+            with open(os.path.join(dossier, nom_fichier), encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            logger.exception("Grille standard illisible: %s", nom_fichier)
+            continue
+        grilles.append({
+            'nom': data.get('nom', base),
+            'description': data.get('description', ''),
+            'domaines': data.get('domaines', []),
+            'reference_scientifique': data.get('reference_scientifique', base),
+            'versions': [data],
+            'id': f"std-{nom_fichier}",
+        })
+    contenu = json.dumps(grilles, ensure_ascii=False, sort_keys=True)
+    return Catalogue(signature, tuple(grilles), contenu, hashlib.sha1(contenu.encode('utf-8')).hexdigest())
+
+
+class CatalogueGrilles:
+    """Accès mémoïsé au catalogue des grilles standard."""
+
+    _courant: Catalogue | None = None
+    _predefinies: tuple[str, str] | None = None
+    _verrou = threading.Lock()
+
+    @staticmethod
+    def charger(dossier: str = DOSSIER_GRILLES) -> Catalogue:
+        """Catalogue courant ; relu seulement si les fichiers ont changé (mtime/taille/liste)."""
+        signature = _signature(dossier)
+        courant = CatalogueGrilles._courant
+        if courant is not None and courant.signature == signature:
+            return courant
+        with CatalogueGrilles._verrou:
+            courant = CatalogueGrilles._courant
+            if courant is None or courant.signature != signature:
+                courant = CatalogueGrilles._depuis_artefact(dossier, signature) or _analyser(dossier, signature)
+                CatalogueGrilles._courant = courant
+                logger.info("Catalogue grilles standard chargé: %d grilles", len(courant.grilles))
+        return courant
+
+    @staticmethod
+    def _depuis_artefact(dossier: str, signature: Signature) -> Catalogue | None:
+        """Artefact précompilé s'il existe et correspond exactement aux fichiers JSON."""
+        chemin = os.path.join(dossier, os.path.basename(ARTEFACT))
+        if not os.path.exists(chemin):
+            return None
+        try:
+            with open(chemin, 'rb') as f:
+                catalogue = pickle.load(f)  # artefact produit localement au build
+        except Exception:
+            logger.warning("Artefact catalogue illisible, relecture des JSON: %s", chemin)
+            return None
+        if not isinstance(catalogue, Catalogue) or catalogue.signature != signature:
+            return None
+        return catalogue
+
+    @staticmethod
+    def compiler(dossier: str = DOSSIER_GRILLES) -> str:
+        """Écrit l'artefact précompilé (à lancer au build) et renvoie son chemin."""
+        catalogue = _analyser(dossier, _signature(dossier))
+        chemin = os.path.join(dossier, os.path.basename(ARTEFACT))
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'wb') as f:
+            pickle.dump(catalogue, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, chemin)
+        return chemin
+
+    @staticmethod
+    def predefinies() -> tuple[str, str]:
+        """JSON sérialisé et ETag des grilles prédéfinies (constante de module, calculés une fois)."""
+        if CatalogueGrilles._predefinies is None:
+            from app.services.cotation_service import GRILLES_PREDEFINIES
+            contenu = json.dumps(GRILLES_PREDEFINIES, ensure_ascii=False, sort_keys=True)
+            CatalogueGrilles._predefinies = (contenu, hashlib.sha1(contenu.encode('utf-8')).hexdigest())
+        return CatalogueGrilles._predefinies
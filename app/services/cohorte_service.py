@@ -0,0 +1,241 @@
+"""Analyses de cohortes : patients regroupés par pathologie, grille et mois d'inclusion.
+
+Les agrégats sont calculés en une passe sur une requête ordonnée des cotations
+(distributions, progression) et une requête groupée sur les objectifs
+(délai d'atteinte), puis matérialisés par mois dans `cohorte_statistique`.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Patient, Seance, db
+from app.models.cotation import CohorteStatistique, CotationScore, CotationSeance, ObjectifTherapeutique
+
+# Au-delà, la lecture déclenche le recalcul des mois de l'utilisateur touchés depuis le dernier calcul
+DELAI_PEREMPTION = timedelta(hours=1)
+
+
+def percentile(valeurs_triees: list[float], fraction: float) -> float | None:
+    """Percentile par interpolation linéaire (même définition que percentile_cont)."""
+    if not valeurs_triees:
+        return None
+    position = (len(valeurs_triees) - 1) * fraction
+    bas = int(position)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * (position - bas)
+
+
+def _arrondi(valeur: float | None, decimales: int = 1) -> float | None:
+    return round(valeur, decimales) if valeur is not None else None
+
+
+class _Groupe:
+    """Accumulateur d'une ligne de cohorte (utilisateur, mois, pathologie, grille, inclusion)."""
+
+    __slots__ = ('pourcentages', 'derniers', 'delais')
+
+    def __init__(self) -> None:
+        self.pourcentages: list[float] = []
+        self.derniers: dict[int, float] = {}  # patient -> progression à la dernière cotation du mois
+        self.delais: list[float] = []
+
+
+class CohorteService:
+    """Calcul, matérialisation et lecture des statistiques de cohortes."""
+
+    @staticmethod
+    def calculer(user_id: int | None = None, depuis: str | None = None) -> list[dict[str, Any]]:
+        """Calcule les lignes de cohorte (sans les écrire).
+
+        Args:
+            user_id: Restreint à un thérapeute (None = tous)
+            depuis: Premier mois "AAAA-MM" à produire ; seules les cotations de ces
+                mois sont lues, la première cotation de chaque (patient, grille) restant
+                la référence de progression
+        """
+        groupes: dict[tuple[int, str, str, int, str], _Groupe] = defaultdict(_Groupe)
+        debut = datetime.strptime(depuis, '%Y-%m') if depuis else None
+
+        # Passe 1 : cotations triées par patient/grille/date (progression = écart à la 1re cotation)
+        query = db.session.query(
+            Patient.user_id, Patient.id, Patient.pathologie, Patient.date_creation,
+            CotationSeance.grille_id, Seance.date_seance, CotationSeance.pourcentage_reussite
+        ).join(Seance, CotationSeance.seance_id == Seance.id).join(Patient, Seance.patient_id == Patient.id).filter(
+            CotationSeance.pourcentage_reussite.isnot(None)
+        )
+        if user_id is not None:
+            query = query.filter(Patient.user_id == user_id)
+        # Recalcul partiel : seuls les mois demandés sont lus, les références viennent des premières cotations
+        bases = CohorteService._premieres_cotations(user_id) if debut is not None else {}
+        if debut is not None:
+            query = query.filter(Seance.date_seance >= debut)
+        query = query.order_by(Patient.id, CotationSeance.grille_id, Seance.date_seance)
+
+        reference: tuple[int, int] | None = None
+        base = 0.0
+        for proprietaire, patient_id, pathologie, inclusion, grille_id, date_seance, pourcentage in query.yield_per(2000):
+            if (patient_id, grille_id) != reference:
+                reference = (patient_id, grille_id)
+                base = bases.get(reference, pourcentage)
+            mois = date_seance.strftime('%Y-%m')
+            groupe = groupes[(proprietaire, mois, pathologie or '', grille_id, inclusion.strftime('%Y-%m'))]
+            groupe.pourcentages.append(pourcentage)
+            groupe.derniers[patient_id] = pourcentage - base
+
+        # Passe 2 : première cotation atteignant la cible de chaque objectif
+        atteinte = func.min(CotationScore.date_seance)
+        objectifs = db.session.query(
+            Patient.user_id, Patient.pathologie, Patient.date_creation,
+            ObjectifTherapeutique.grille_id, ObjectifTherapeutique.date_creation, atteinte
+        ).join(Patient, ObjectifTherapeutique.patient_id == Patient.id).join(
+            CotationScore, and_(
+                CotationScore.patient_id == ObjectifTherapeutique.patient_id,
+                CotationScore.grille_id == ObjectifTherapeutique.grille_id,
+                CotationScore.indicateur == ObjectifTherapeutique.domaine_cible + '_' + ObjectifTherapeutique.indicateur_cible,
+                CotationScore.valeur >= ObjectifTherapeutique.score_cible,
+                CotationScore.date_seance >= ObjectifTherapeutique.date_creation
+            )
+        )
+        if user_id is not None:
+            objectifs = objectifs.filter(Patient.user_id == user_id)
+        objectifs = objectifs.group_by(
+            ObjectifTherapeutique.id, Patient.user_id, Patient.pathologie, Patient.date_creation,
+            ObjectifTherapeutique.grille_id, ObjectifTherapeutique.date_creation
+        )
+        if debut is not None:
+            # Sur l'agrégat : un objectif atteint avant `depuis` reste hors des mois recalculés
+            objectifs = objectifs.having(atteinte >= debut)
+        for proprietaire, pathologie, inclusion, grille_id, fixe_le, atteint_le in objectifs:
+            mois = atteint_le.strftime('%Y-%m')
+            delai = (atteint_le.replace(tzinfo=None) - fixe_le.replace(tzinfo=None)).total_seconds() / 86400
+            groupes[(proprietaire, mois, pathologie or '', grille_id, inclusion.strftime('%Y-%m'))].delais.append(delai)
+
+        lignes: list[dict[str, Any]] = []
+        for (proprietaire, mois, pathologie, grille_id, cohorte_mois), groupe in groupes.items():
+            valeurs = sorted(groupe.pourcentages)
+            progressions = list(groupe.derniers.values())
+            lignes.append({
+                'user_id': proprietaire,
+                'mois': mois,
+                'pathologie': pathologie,
+                'grille_id': grille_id,
+                'cohorte_mois': cohorte_mois,
+                'nb_patients': len(groupe.derniers),
+                'nb_cotations': len(valeurs),
+                'moyenne': _arrondi(sum(valeurs) / len(valeurs)) if valeurs else None,
+                'p25': _arrondi(percentile(valeurs, 0.25)),
+                'mediane': _arrondi(percentile(valeurs, 0.5)),
+                'p75': _arrondi(percentile(valeurs, 0.75)),
+                'p90': _arrondi(percentile(valeurs, 0.9)),
+                'progression_moyenne': _arrondi(sum(progressions) / len(progressions)) if progressions else None,
+                'nb_objectifs_atteints': len(groupe.delais),
+                'delai_objectif_moyen_jours': _arrondi(sum(groupe.delais) / len(groupe.delais)) if groupe.delais else None
+            })
+        return lignes
+
+    @staticmethod
+    def _premieres_cotations(user_id: int | None) -> dict[tuple[int, int], float]:
+        """Pourcentage de la première cotation de chaque (patient, grille) : référence de progression."""
+        premieres = db.session.query(
+            Seance.patient_id.label('patient_id'), CotationSeance.grille_id.label('grille_id'),
+            func.min(Seance.date_seance).label('premiere')
+        ).join(Seance, CotationSeance.seance_id == Seance.id).filter(CotationSeance.pourcentage_reussite.isnot(None))
+        if user_id is not None:
+            premieres = premieres.join(Patient, Seance.patient_id == Patient.id).filter(Patient.user_id == user_id)
+        premieres = premieres.group_by(Seance.patient_id, CotationSeance.grille_id).subquery()
+
+        lignes = db.session.query(
+            premieres.c.patient_id, premieres.c.grille_id, CotationSeance.pourcentage_reussite
+        ).join(Seance, CotationSeance.seance_id == Seance.id).join(premieres, and_(
+            premieres.c.patient_id == Seance.patient_id,
+            premieres.c.grille_id == CotationSeance.grille_id,
+            premieres.c.premiere == Seance.date_seance,
+        )).filter(CotationSeance.pourcentage_reussite.isnot(None)).order_by(CotationSeance.id)
+        bases: dict[tuple[int, int], float] = {}
+        for patient_id, grille_id, pourcentage in lignes:
+            bases.setdefault((patient_id, grille_id), pourcentage)
+        return bases
+
+    @staticmethod
+    def reconstruire(user_id: int | None = None, depuis: str | None = None) -> int:
+        """Recalcule et remplace les lignes matérialisées (une transaction).
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        lignes = CohorteService.calculer(user_id, depuis)
+        maintenant = datetime.now(timezone.utc)
+        purge = delete(CohorteStatistique)
+        if user_id is not None:
+            purge = purge.where(CohorteStatistique.user_id == user_id)
+        if depuis:
+            purge = purge.where(CohorteStatistique.mois >= depuis)
+        db.session.execute(purge)
+        if lignes:
+            db.session.execute(
+                CohorteStatistique.__table__.insert(),
+                [{**ligne, 'date_calcul': maintenant} for ligne in lignes]
+            )
+        db.session.commit()
+        return len(lignes)
+
+    @staticmethod
+    def rafraichir_si_perime(user_id: int) -> None:
+        """Recalcule les mois périmés de l'utilisateur si sa matérialisation date de plus d'une heure.
+
+        Sont recalculés le mois du dernier calcul (resté partiel) jusqu'au mois courant,
+        et depuis le plus ancien mois d'une cotation saisie ou modifiée après ce calcul.
+        """
+        dernier_calcul = db.session.query(func.max(CohorteStatistique.date_calcul)).filter(
+            CohorteStatistique.user_id == user_id
+        ).scalar()
+        depuis = None
+        if dernier_calcul is not None:
+            calcule_le = dernier_calcul if dernier_calcul.tzinfo else dernier_calcul.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - calcule_le < DELAI_PEREMPTION:
+                return
+            depuis = CohorteService._premier_mois_touche(user_id, dernier_calcul)
+        try:
+            CohorteService.reconstruire(user_id, depuis)
+        except IntegrityError:
+            # Recalcul concurrent (autre lecture) validé entre notre purge et notre insertion : ses lignes font foi
+            db.session.rollback()
+
+    @staticmethod
+    def _premier_mois_touche(user_id: int, dernier_calcul: datetime) -> str:
+        """Premier mois "AAAA-MM" à recalculer après `dernier_calcul` (valeur telle que stockée)."""
+        depuis = dernier_calcul.strftime('%Y-%m')
+        # Cotation saisie ou modifiée, ou séance re-datée, depuis le calcul : son mois est à refaire
+        plus_ancienne = db.session.query(func.min(Seance.date_seance)).select_from(CotationSeance).join(
+            Seance, CotationSeance.seance_id == Seance.id
+        ).join(Patient, Seance.patient_id == Patient.id).filter(
+            Patient.user_id == user_id,
+            or_(CotationSeance.date_modification > dernier_calcul, Seance.date_modification > dernier_calcul)
+        ).scalar()
+        if plus_ancienne is not None:
+            depuis = min(depuis, plus_ancienne.strftime('%Y-%m'))
+        return depuis
+
+    @staticmethod
+    def cohortes(user_id: int, mois_debut: str | None = None, mois_fin: str | None = None,
+                 pathologie: str | None = None, grille_id: int | None = None) -> list[dict[str, Any]]:
+        """Lit les statistiques matérialisées d'un utilisateur, triées par mois."""
+        query = CohorteStatistique.query.filter(CohorteStatistique.user_id == user_id)
+        if mois_debut:
+            query = query.filter(CohorteStatistique.mois >= mois_debut)
+        if mois_fin:
+            query = query.filter(CohorteStatistique.mois <= mois_fin)
+        if pathologie is not None:
+            query = query.filter(CohorteStatistique.pathologie == pathologie)
+        if grille_id is not None:
+            query = query.filter(CohorteStatistique.grille_id == grille_id)
+        query = query.order_by(
+            CohorteStatistique.mois, CohorteStatistique.grille_id,
+            CohorteStatistique.pathologie, CohorteStatistique.cohorte_mois
+        )
+        return [ligne.to_dict() for ligne in query.all()]
@@ -1,9 +1,20 @@
 """Service pour la gestion des grilles d'évaluation et cotations (versioning)."""
-import json
+import copy
+import hashlib
 from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import func, select
+
 from app.models import db
-from app.models.cotation import CotationSeance, GrilleEvaluation, GrilleVersion
+from app.models.cotation import (
+    CotationSeance,
+    Domaine,
+    DomaineIndicateur,
+    GrilleDomaine,
+    GrilleEvaluation,
+    GrilleVersion,
+    Indicateur,
+)
 from app.services.calcul_cotation_service import CalculCotationService
 from app.services.validation_service import CotationValidator, ValidationError
 
@@ -15,346 +26,351 @@ except Exception:  # pragma: no cover
     current_user = _U()  # type: ignore
 
 
-class CotationService:
-    # ------------------- Données prédéfinies ------------------- #
-    @staticmethod
-    def get_grilles_predefinies() -> Dict[str, Dict[str, Any]]:
-        return {
-            "musicotherapie_active": {
-                "nom": "Musicothérapie Active - Improvisation & Interaction",
-                "description": "Grille centrée sur le jeu, l’improvisation, l’engagement corporel et la co-création.",
-                "reference_scientifique": "Spécifique Active",
-                "domaines": [
-                    {
-                        "nom": "Engagement & Initiative",
-                        "couleur": "#3b82f6",
-                        "description": "Niveau d’implication dans le jeu musical et capacité à initier des propositions.",
-                        "indicateurs": [
-                            {"nom": "Participation active", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Initiatives musicales", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Persévérance dans la tâche", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Interaction Rythmique & Motrice",
-                        "couleur": "#f59e0b",
-                        "description": "Synchronisation, coordination et réponse motrice au rythme.",
-                        "indicateurs": [
-                            {"nom": "Stabilité du tempo", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Coordination geste/son", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Réponse aux variations", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Improvisation & Créativité",
-                        "couleur": "#a855f7",
-                        "description": "Qualité des propositions musicales, exploration et variété.",
-                        "indicateurs": [
-                            {"nom": "Variété des idées", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Exploration sonore", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Adaptation musicale", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Interaction Sociale & Co-création",
-                        "couleur": "#10b981",
-                        "description": "Tours de rôle, écoute mutuelle et réciprocité dans le jeu.",
-                        "indicateurs": [
-                            {"nom": "Écoute et ajustement", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Tours de rôle", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Réponses contingentes", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Autorégulation Émotionnelle par le Jeu",
-                        "couleur": "#ef4444",
-                        "description": "Capacité à moduler son activation émotionnelle via l’activité musicale.",
-                        "indicateurs": [
-                            {"nom": "Tolérance à l’intensité", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Retour au calme", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Expression adaptée", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    }
+# Grilles prédéfinies : constante de module construite une fois à l'import.
+# Ne pas modifier en place (copier avant d'affecter à un modèle).
+GRILLES_PREDEFINIES: Dict[str, Dict[str, Any]] = {
+    "musicotherapie_active": {
+        "nom": "Musicothérapie Active - Improvisation & Interaction",
+        "description": "Grille centrée sur le jeu, l’improvisation, l’engagement corporel et la co-création.",
+        "reference_scientifique": "Spécifique Active",
+        "domaines": [
+            {
+                "nom": "Engagement & Initiative",
+                "couleur": "#3b82f6",
+                "description": "Niveau d’implication dans le jeu musical et capacité à initier des propositions.",
+                "indicateurs": [
+                    {"nom": "Participation active", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Initiatives musicales", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Persévérance dans la tâche", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Interaction Rythmique & Motrice",
+                "couleur": "#f59e0b",
+                "description": "Synchronisation, coordination et réponse motrice au rythme.",
+                "indicateurs": [
+                    {"nom": "Stabilité du tempo", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Coordination geste/son", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Réponse aux variations", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "musicotherapie_receptive": {
-                "nom": "Musicothérapie Réceptive - Relaxation & Réceptivité",
-                "description": "Grille axée sur l’écoute, la détente, l’attention et l’intégration émotionnelle.",
-                "reference_scientifique": "Spécifique Réceptive",
-                "domaines": [
-                    {
-                        "nom": "Relaxation & Tonicité",
-                        "couleur": "#60a5fa",
-                        "description": "Niveau de détente corporelle et baisse des tensions observables.",
-                        "indicateurs": [
-                            {"nom": "Détente musculaire", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Posture relâchée", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Diminution agitation", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Attention & Présence",
-                        "couleur": "#34d399",
-                        "description": "Qualité d’attention, ancrage et continuité de l’écoute.",
-                        "indicateurs": [
-                            {"nom": "Attention soutenue", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Présence au stimulus", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Moins de distractibilité", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Apaisement Émotionnel",
-                        "couleur": "#f87171",
-                        "description": "Réduction de l’anxiété et régulation émotionnelle au cours de l’écoute.",
-                        "indicateurs": [
-                            {"nom": "Baisse anxiété perçue", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Affect plus stable", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Signe d’apaisement", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Imagerie & Intégration",
-                        "couleur": "#f59e0b",
-                        "description": "Capacité d’évocation, de visualisation et de mise en sens.",
-                        "indicateurs": [
-                            {"nom": "Imagerie/visualisation", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Contenu symbolique", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Intégration verbale", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Humeur & Bien-être",
-                        "couleur": "#10b981",
-                        "description": "Impact global sur l’humeur et le sentiment de bien-être.",
-                        "indicateurs": [
-                            {"nom": "Amélioration de l’humeur", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Apaisement durable", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Confort subjectif", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    }
+            {
+                "nom": "Improvisation & Créativité",
+                "couleur": "#a855f7",
+                "description": "Qualité des propositions musicales, exploration et variété.",
+                "indicateurs": [
+                    {"nom": "Variété des idées", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Exploration sonore", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Adaptation musicale", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "amta_standard": {
-                "nom": "AMTA - Grille Standard",
-                "description": "Grille de l'Association Américaine de Musicothérapie (7 domaines, 28 indicateurs)",
-                "reference_scientifique": "AMTA",
-                "domaines": [
-                    {
-                        "nom": "Engagement Musical", 
-                        "couleur": "#3498db", 
-                        "description": "Participation active aux activités musicales", 
-                        "indicateurs": [
-                            {"nom": "Attention soutenue", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Initiative musicale", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Persévérance", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Exploration sonore", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Expression Émotionnelle",
-                        "couleur": "#e74c3c",
-                        "description": "Capacité d'expression des émotions par la musique",
-                        "indicateurs": [
-                            {"nom": "Expression spontanée", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Reconnaissance émotionnelle", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Régulation émotionnelle", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Empathie musicale", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Communication",
-                        "couleur": "#2ecc71",
-                        "description": "Compétences de communication verbale et non-verbale",
-                        "indicateurs": [
-                            {"nom": "Expression verbale", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Écoute active", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Communication non-verbale", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Tour de parole", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Motricité",
-                        "couleur": "#f39c12",
-                        "description": "Compétences motrices globales et fines",
-                        "indicateurs": [
-                            {"nom": "Coordination globale", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Motricité fine", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Rythme corporel", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Équilibre postural", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    }
+            {
+                "nom": "Interaction Sociale & Co-création",
+                "couleur": "#10b981",
+                "description": "Tours de rôle, écoute mutuelle et réciprocité dans le jeu.",
+                "indicateurs": [
+                    {"nom": "Écoute et ajustement", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Tours de rôle", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Réponses contingentes", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "imcap_nd": {
-                "nom": "IMCAP-ND - Autisme",
-                "description": "Individual Music-Centered Assessment Profile for Neurodevelopmental Disorders (spécialisée troubles autistiques)",
-                "reference_scientifique": "IMCAP-ND",
-                "domaines": [
-                    {
-                        "nom": "Attention et Engagement",
-                        "couleur": "#9b59b6",
-                        "description": "Capacité d'attention et d'engagement dans l'activité musicale",
-                        "indicateurs": [
-                            {"nom": "Attention visuelle", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Attention auditive", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Durée d'engagement", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Qualité de l'engagement", "min": 0, "max": 3, "unite": "niveau"}
-                        ]
-                    },
-                    {
-                        "nom": "Interaction Sociale",
-                        "couleur": "#1abc9c",
-                        "description": "Compétences d'interaction et de communication sociale",
-                        "indicateurs": [
-                            {"nom": "Contact oculaire", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Imitation", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Tour de rôle", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Initiation sociale", "min": 0, "max": 3, "unite": "niveau"}
-                        ]
-                    },
-                    {
-                        "nom": "Flexibilité Cognitive",
-                        "couleur": "#34495e",
-                        "description": "Adaptation aux changements et flexibilité comportementale",
-                        "indicateurs": [
-                            {"nom": "Adaptation au changement", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Tolérance à l'imprévu", "min": 0, "max": 3, "unite": "niveau"},
-                            {"nom": "Créativité musicale", "min": 0, "max": 3, "unite": "niveau"}
-                        ]
-                    }
+            {
+                "nom": "Autorégulation Émotionnelle par le Jeu",
+                "couleur": "#ef4444",
+                "description": "Capacité à moduler son activation émotionnelle via l’activité musicale.",
+                "indicateurs": [
+                    {"nom": "Tolérance à l’intensité", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Retour au calme", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Expression adaptée", "min": 0, "max": 5, "unite": "points"}
+                ]
+            }
+        ]
+    },
+    "musicotherapie_receptive": {
+        "nom": "Musicothérapie Réceptive - Relaxation & Réceptivité",
+        "description": "Grille axée sur l’écoute, la détente, l’attention et l’intégration émotionnelle.",
+        "reference_scientifique": "Spécifique Réceptive",
+        "domaines": [
+            {
+                "nom": "Relaxation & Tonicité",
+                "couleur": "#60a5fa",
+                "description": "Niveau de détente corporelle et baisse des tensions observables.",
+                "indicateurs": [
+                    {"nom": "Détente musculaire", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Posture relâchée", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Diminution agitation", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "geriatrie_simple": {
-                "nom": "Gériatrie - Évaluation Simplifiée",
-                "description": "Grille adaptée pour l'évaluation en gérontologie et troubles cognitifs",
-                "reference_scientifique": "Adapté MMSE/NPI",
-                "domaines": [
-                    {
-                        "nom": "Cognition",
-                        "couleur": "#8e44ad",
-                        "description": "Fonctions cognitives et mémoire",
-                        "indicateurs": [
-                            {"nom": "Reconnaissance mélodique", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Mémoire des paroles", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Attention soutenue", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Orientation temporelle", "min": 0, "max": 4, "unite": "niveau"}
-                        ]
-                    },
-                    {
-                        "nom": "Humeur et Bien-être",
-                        "couleur": "#e67e22",
-                        "description": "État émotionnel et bien-être psychologique",
-                        "indicateurs": [
-                            {"nom": "Plaisir musical", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Apaisement", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Sourires/rires", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Diminution agitation", "min": 0, "max": 4, "unite": "niveau"}
-                        ]
-                    },
-                    {
-                        "nom": "Interaction Sociale",
-                        "couleur": "#27ae60",
-                        "description": "Relations sociales et communication",
-                        "indicateurs": [
-                            {"nom": "Échanges verbaux", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Partage musical", "min": 0, "max": 4, "unite": "niveau"},
-                            {"nom": "Reconnexion relationnelle", "min": 0, "max": 4, "unite": "niveau"}
-                        ]
-                    }
+            {
+                "nom": "Attention & Présence",
+                "couleur": "#34d399",
+                "description": "Qualité d’attention, ancrage et continuité de l’écoute.",
+                "indicateurs": [
+                    {"nom": "Attention soutenue", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Présence au stimulus", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Moins de distractibilité", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "pediatrie_globale": {
-                "nom": "Pédiatrie - Développement Global",
-                "description": "Grille complète pour l'évaluation du développement chez l'enfant",
-                "reference_scientifique": "Adapté Bayley/ADOS",
-                "domaines": [
-                    {
-                        "nom": "Développement Moteur",
-                        "couleur": "#d35400",
-                        "description": "Motricité globale et fine adaptée à l'âge",
-                        "indicateurs": [
-                            {"nom": "Coordination bi-manuelle", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Rythme et mouvement", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Précision gestuelle", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Tonus postural", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Langage et Communication",
-                        "couleur": "#c0392b",
-                        "description": "Développement du langage et des compétences communicatives",
-                        "indicateurs": [
-                            {"nom": "Vocalises musicales", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Compréhension verbale", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Expression spontanée", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Pragmatique", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    },
-                    {
-                        "nom": "Socio-affectif",
-                        "couleur": "#16a085",
-                        "description": "Compétences sociales et régulation émotionnelle",
-                        "indicateurs": [
-                            {"nom": "Attachement thérapeute", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Jeu partagé", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Autorégulation", "min": 0, "max": 5, "unite": "points"},
-                            {"nom": "Empathie", "min": 0, "max": 5, "unite": "points"}
-                        ]
-                    }
+            {
+                "nom": "Apaisement Émotionnel",
+                "couleur": "#f87171",
+                "description": "Réduction de l’anxiété et régulation émotionnelle au cours de l’écoute.",
+                "indicateurs": [
+                    {"nom": "Baisse anxiété perçue", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Affect plus stable", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Signe d’apaisement", "min": 0, "max": 5, "unite": "points"}
                 ]
             },
-            "evaluation_rapide": {
-                "nom": "Évaluation Rapide - 3 Domaines",
-                "description": "Grille simplifiée pour évaluation rapide en séance (3 domaines essentiels)",
-                "reference_scientifique": "Synthèse clinique",
-                "domaines": [
-                    {
-                        "nom": "Engagement",
-                        "couleur": "#3498db",
-                        "description": "Niveau de participation et d'implication",
-                        "indicateurs": [
-                            {"nom": "Participation active", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Initiative", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Concentration", "min": 0, "max": 10, "unite": "sur 10"}
-                        ]
-                    },
-                    {
-                        "nom": "Expression",
-                        "couleur": "#e74c3c",
-                        "description": "Capacité d'expression personnelle",
-                        "indicateurs": [
-                            {"nom": "Expression émotionnelle", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Créativité", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Spontanéité", "min": 0, "max": 10, "unite": "sur 10"}
-                        ]
-                    },
-                    {
-                        "nom": "Interaction",
-                        "couleur": "#2ecc71",
-                        "description": "Qualité des interactions sociales",
-                        "indicateurs": [
-                            {"nom": "Communication", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Coopération", "min": 0, "max": 10, "unite": "sur 10"},
-                            {"nom": "Écoute d'autrui", "min": 0, "max": 10, "unite": "sur 10"}
-                        ]
-                    }
+            {
+                "nom": "Imagerie & Intégration",
+                "couleur": "#f59e0b",
+                "description": "Capacité d’évocation, de visualisation et de mise en sens.",
+                "indicateurs": [
+                    {"nom": "Imagerie/visualisation", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Contenu symbolique", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Intégration verbale", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Humeur & Bien-être",
+                "couleur": "#10b981",
+                "description": "Impact global sur l’humeur et le sentiment de bien-être.",
+                "indicateurs": [
+                    {"nom": "Amélioration de l’humeur", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Apaisement durable", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Confort subjectif", "min": 0, "max": 5, "unite": "points"}
                 ]
             }
-        }
+        ]
+    },
+    "amta_standard": {
+        "nom": "AMTA - Grille Standard",
+        "description": "Grille de l'Association Américaine de Musicothérapie (7 domaines, 28 indicateurs)",
+        "reference_scientifique": "AMTA",
+        "domaines": [
+            {
+                "nom": "Engagement Musical", 
+                "couleur": "#3498db", 
+                "description": "Participation active aux activités musicales", 
+                "indicateurs": [
+                    {"nom": "Attention soutenue", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Initiative musicale", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Persévérance", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Exploration sonore", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Expression Émotionnelle",
+                "couleur": "#e74c3c",
+                "description": "Capacité d'expression des émotions par la musique",
+                "indicateurs": [
+                    {"nom": "Expression spontanée", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Reconnaissance émotionnelle", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Régulation émotionnelle", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Empathie musicale", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Communication",
+                "couleur": "#2ecc71",
+                "description": "Compétences de communication verbale et non-verbale",
+                "indicateurs": [
+                    {"nom": "Expression verbale", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Écoute active", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Communication non-verbale", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Tour de parole", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Motricité",
+                "couleur": "#f39c12",
+                "description": "Compétences motrices globales et fines",
+                "indicateurs": [
+                    {"nom": "Coordination globale", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Motricité fine", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Rythme corporel", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Équilibre postural", "min": 0, "max": 5, "unite": "points"}
+                ]
+            }
+        ]
+    },
+    "imcap_nd": {
+        "nom": "IMCAP-ND - Autisme",
+        "description": "Individual Music-Centered Assessment Profile for Neurodevelopmental Disorders (spécialisée troubles autistiques)",
+        "reference_scientifique": "IMCAP-ND",
+        "domaines": [
+            {
+                "nom": "Attention et Engagement",
+                "couleur": "#9b59b6",
+                "description": "Capacité d'attention et d'engagement dans l'activité musicale",
+                "indicateurs": [
+                    {"nom": "Attention visuelle", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Attention auditive", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Durée d'engagement", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Qualité de l'engagement", "min": 0, "max": 3, "unite": "niveau"}
+                ]
+            },
+            {
+                "nom": "Interaction Sociale",
+                "couleur": "#1abc9c",
+                "description": "Compétences d'interaction et de communication sociale",
+                "indicateurs": [
+                    {"nom": "Contact oculaire", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Imitation", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Tour de rôle", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Initiation sociale", "min": 0, "max": 3, "unite": "niveau"}
+                ]
+            },
+            {
+                "nom": "Flexibilité Cognitive",
+                "couleur": "#34495e",
+                "description": "Adaptation aux changements et flexibilité comportementale",
+                "indicateurs": [
+                    {"nom": "Adaptation au changement", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Tolérance à l'imprévu", "min": 0, "max": 3, "unite": "niveau"},
+                    {"nom": "Créativité musicale", "min": 0, "max": 3, "unite": "niveau"}
+                ]
+            }
+        ]
+    },
+    "geriatrie_simple": {
+        "nom": "Gériatrie - Évaluation Simplifiée",
+        "description": "Grille adaptée pour l'évaluation en gérontologie et troubles cognitifs",
+        "reference_scientifique": "Adapté MMSE/NPI",
+        "domaines": [
+            {
+                "nom": "Cognition",
+                "couleur": "#8e44ad",
+                "description": "Fonctions cognitives et mémoire",
+                "indicateurs": [
+                    {"nom": "Reconnaissance mélodique", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Mémoire des paroles", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Attention soutenue", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Orientation temporelle", "min": 0, "max": 4, "unite": "niveau"}
+                ]
+            },
+            {
+                "nom": "Humeur et Bien-être",
+                "couleur": "#e67e22",
+                "description": "État émotionnel et bien-être psychologique",
+                "indicateurs": [
+                    {"nom": "Plaisir musical", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Apaisement", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Sourires/rires", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Diminution agitation", "min": 0, "max": 4, "unite": "niveau"}
+                ]
+            },
+            {
+                "nom": "Interaction Sociale",
+                "couleur": "#27ae60",
+                "description": "Relations sociales et communication",
+                "indicateurs": [
+                    {"nom": "Échanges verbaux", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Partage musical", "min": 0, "max": 4, "unite": "niveau"},
+                    {"nom": "Reconnexion relationnelle", "min": 0, "max": 4, "unite": "niveau"}
+                ]
+            }
+        ]
+    },
+    "pediatrie_globale": {
+        "nom": "Pédiatrie - Développement Global",
+        "description": "Grille complète pour l'évaluation du développement chez l'enfant",
+        "reference_scientifique": "Adapté Bayley/ADOS",
+        "domaines": [
+            {
+                "nom": "Développement Moteur",
+                "couleur": "#d35400",
+                "description": "Motricité globale et fine adaptée à l'âge",
+                "indicateurs": [
+                    {"nom": "Coordination bi-manuelle", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Rythme et mouvement", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Précision gestuelle", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Tonus postural", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Langage et Communication",
+                "couleur": "#c0392b",
+                "description": "Développement du langage et des compétences communicatives",
+                "indicateurs": [
+                    {"nom": "Vocalises musicales", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Compréhension verbale", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Expression spontanée", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Pragmatique", "min": 0, "max": 5, "unite": "points"}
+                ]
+            },
+            {
+                "nom": "Socio-affectif",
+                "couleur": "#16a085",
+                "description": "Compétences sociales et régulation émotionnelle",
+                "indicateurs": [
+                    {"nom": "Attachement thérapeute", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Jeu partagé", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Autorégulation", "min": 0, "max": 5, "unite": "points"},
+                    {"nom": "Empathie", "min": 0, "max": 5, "unite": "points"}
+                ]
+            }
+        ]
+    },
+    "evaluation_rapide": {
+        "nom": "Évaluation Rapide - 3 Domaines",
+        "description": "Grille simplifiée pour évaluation rapide en séance (3 domaines essentiels)",
+        "reference_scientifique": "Synthèse clinique",
+        "domaines": [
+            {
+                "nom": "Engagement",
+                "couleur": "#3498db",
+                "description": "Niveau de participation et d'implication",
+                "indicateurs": [
+                    {"nom": "Participation active", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Initiative", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Concentration", "min": 0, "max": 10, "unite": "sur 10"}
+                ]
+            },
+            {
+                "nom": "Expression",
+                "couleur": "#e74c3c",
+                "description": "Capacité d'expression personnelle",
+                "indicateurs": [
+                    {"nom": "Expression émotionnelle", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Créativité", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Spontanéité", "min": 0, "max": 10, "unite": "sur 10"}
+                ]
+            },
+            {
+                "nom": "Interaction",
+                "couleur": "#2ecc71",
+                "description": "Qualité des interactions sociales",
+                "indicateurs": [
+                    {"nom": "Communication", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Coopération", "min": 0, "max": 10, "unite": "sur 10"},
+                    {"nom": "Écoute d'autrui", "min": 0, "max": 10, "unite": "sur 10"}
+                ]
+            }
+        ]
+    }
+}
+
+
+class CotationService:
+    # ------------------- Données prédéfinies ------------------- #
+    @staticmethod
+    def get_grilles_predefinies() -> Dict[str, Dict[str, Any]]:
+        """Copie profonde : la constante est sérialisée et ETaguée une fois par CatalogueGrilles."""
+        return copy.deepcopy(GRILLES_PREDEFINIES)
 
     # ------------------- Création ------------------- #
     @staticmethod
     def creer_grille_predefinie(type_grille: str) -> Optional[GrilleEvaluation]:
-        grilles = CotationService.get_grilles_predefinies()
-        if type_grille not in grilles:
+        if type_grille not in GRILLES_PREDEFINIES:
             return None
-        cfg = grilles[type_grille]
+        cfg = copy.deepcopy(GRILLES_PREDEFINIES[type_grille])
         g = GrilleEvaluation()
         g.nom = cfg["nom"]
         g.description = cfg["description"]
         g.type_grille = "standard"
         g.reference_scientifique = cfg["reference_scientifique"]
-        g.domaines_config = json.dumps(cfg["domaines"])
+        g.domaines_config = cfg["domaines"]
         g.active = True
         db.session.add(g)
         db.session.commit()
@@ -393,7 +409,7 @@ class CotationService:
         g.description = description.strip()[:500]
         g.type_grille = "personnalisee"
         g.reference_scientifique = None
-        g.domaines_config = json.dumps(domaines_valides)
+        g.domaines_config = domaines_valides
         g.active = True
     # g.publique = False
         g.user_id = current_user.id  # type: ignore[attr-defined]
@@ -467,7 +483,7 @@ class CotationService:
         new_v = GrilleVersion()
         new_v.grille_id = g.id
         new_v.version_num = 1 if not last_v else last_v.version_num + 1
-        new_v.domaines_config = json.dumps(cleaned)
+        new_v.domaines_config = cleaned
         new_v.active = True
         g.domaines = cleaned
         db.session.add(new_v)
@@ -497,7 +513,7 @@ class CotationService:
         cot = CotationSeance()
         cot.seance_id = seance_id
         cot.grille_id = grille_id
-        cot.scores_detailles = json.dumps(scores_valides)
+        cot.scores_detailles = scores_valides
         cot.score_global = score
         cot.score_max_possible = max_score
         cot.pourcentage_reussite = pct
@@ -547,6 +563,38 @@ class CotationService:
         except Exception:
             return []
 
+    @staticmethod
+    def version_grille(grille_id: int) -> Optional[Tuple[Any, ...]]:
+        """Version d'une grille pour les ETag ; None si la grille n'existe pas.
+
+        Dernière modification et dernier numéro de version de la grille, plus une
+        empreinte du contenu servi (domaines et indicateurs liés, partagés entre
+        grilles) : renommer un domaine ou remplacer un lien change la version.
+        """
+        entete = db.session.execute(
+            select(
+                GrilleEvaluation.date_modification,
+                select(func.max(GrilleVersion.version_num)).where(GrilleVersion.grille_id == grille_id).scalar_subquery(),
+            ).where(GrilleEvaluation.id == grille_id)
+        ).first()
+        if entete is None:
+            return None
+        lignes = db.session.execute(
+            select(
+                Domaine.id, Domaine.nom, Domaine.description, Domaine.couleur, Domaine.poids,
+                Indicateur.id, Indicateur.nom, Indicateur.description, Indicateur.echelle_min,
+                Indicateur.echelle_max, Indicateur.unite, Indicateur.poids,
+            )
+            .select_from(GrilleDomaine)
+            .join(Domaine, Domaine.id == GrilleDomaine.domaine_id)
+            .outerjoin(DomaineIndicateur, DomaineIndicateur.domaine_id == Domaine.id)
+            .outerjoin(Indicateur, Indicateur.id == DomaineIndicateur.indicateur_id)
+            .where(GrilleDomaine.grille_id == grille_id)
+            .order_by(GrilleDomaine.id, Indicateur.id)
+        ).all()
+        empreinte = hashlib.sha1(repr([tuple(ligne) for ligne in lignes]).encode('utf-8')).hexdigest()
+        return (*entete, empreinte)
+
     @staticmethod
     def get_grille_by_id(grille_id: int) -> Optional[GrilleEvaluation]:
         """Récupère une grille par son ID avec vérification d'accès."""
@@ -613,7 +661,7 @@ class CotationService:
             new_version = GrilleVersion()
             new_version.grille_id = grille.id
             new_version.version_num = 1 if not last_version else last_version.version_num + 1
-            new_version.domaines_config = json.dumps(domaines_valides)
+            new_version.domaines_config = domaines_valides
             new_version.active = True
             
             grille.domaines = domaines_valides
@@ -666,7 +714,6 @@ class CotationService:
             True si sauvegarde réussie
         """
         try:
-            import json
             from datetime import datetime, timezone
             
             # Vérifier si une cotation existe déjà
@@ -681,11 +728,19 @@ class CotationService:
                 cotation = CotationSeance()
                 cotation.seance_id = seance_id
                 cotation.grille_id = grille_id
+                # Colonnes obligatoires : patient et thérapeute de la séance
+                from app.models import Seance
+                seance = db.session.get(Seance, seance_id)
+                if seance is not None:
+                    cotation.patient_id = seance.patient_id
+                    cotation.therapeute_id = seance.patient.user_id
+                    if cotation.therapeute_id is None:  # patient sans propriétaire : utilisateur connecté
+                        from flask_login import current_user  # type: ignore
+                        cotation.therapeute_id = getattr(current_user, 'id', None)
                 db.session.add(cotation)
             
-            # Sauvegarder les scores détaillés en JSON
-            scores_json = json.dumps(scores) if scores else "{}"
-            cotation.scores_detailles = scores_json
+            # Sauvegarder les scores détaillés (document JSON natif)
+            cotation.scores_detailles = dict(scores) if scores else {}
             cotation.observations_cotation = observations or ""
             
             # Calculer le score global simple (moyenne des scores)
@@ -753,7 +808,7 @@ class CotationService:
                 return False
             
             # Sauvegarder les scores détaillés
-            cotation.scores_detailles = json.dumps(scores)
+            cotation.scores_detailles = dict(scores)
             cotation.observations_cotation = observations
             
             # Calculer le score global
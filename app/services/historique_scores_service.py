@@ -0,0 +1,205 @@
+"""Série temporelle des scores par indicateur (table de faits cotation_score).
+
+Les faits sont écrits dans la même transaction que la cotation, via un écouteur
+`after_flush` de la session : tous les chemins d'enregistrement (service, routes,
+import) alimentent donc la table sans appel explicite.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models import Seance, db
+from app.models.cotation import CotationScore, CotationSeance, GrilleVersion
+
+
+class HistoriqueScoresService:
+    """Alimentation et lecture de la table de faits cotation_score."""
+
+    @staticmethod
+    def extraire_faits(scores: Any) -> list[tuple[str, float]]:
+        """Liste (indicateur, valeur) des scores numériques d'un document scores_detailles."""
+        if isinstance(scores, str):
+            try:
+                scores = json.loads(scores)
+            except Exception:
+                return []
+        if not isinstance(scores, dict):
+            return []
+        faits: list[tuple[str, float]] = []
+        for cle, valeur in scores.items():
+            if isinstance(valeur, bool):
+                continue
+            try:
+                faits.append((str(cle)[:255], float(valeur)))
+            except (TypeError, ValueError):
+                continue
+        return faits
+
+    @staticmethod
+    def enregistrer_cotations(connection, cotation_ids: list[int]) -> int:
+        """Remplace les faits des cotations données (nombre de requêtes constant par lot).
+
+        La version de grille d'une cotation déjà synchronisée est conservée ; sinon c'est
+        la version en vigueur à sa création (voir `_version_a_la_date`).
+
+        Returns:
+            Nombre de faits insérés
+        """
+        if not cotation_ids:
+            return 0
+        cotations = CotationSeance.__table__
+        seances = Seance.__table__
+        faits_table = CotationScore.__table__
+        lignes = connection.execute(
+            select(
+                cotations.c.id, cotations.c.grille_id, cotations.c.scores_detailles, cotations.c.date_creation,
+                seances.c.patient_id, seances.c.date_seance
+            ).join(seances, cotations.c.seance_id == seances.c.id).where(cotations.c.id.in_(cotation_ids))
+        ).all()
+
+        # Version portée par les faits existants (même grille) : une modification ne la change pas
+        existantes: dict[tuple[int, int], int] = {
+            (cotation_id, grille_id): version
+            for cotation_id, grille_id, version in connection.execute(
+                select(faits_table.c.cotation_id, faits_table.c.grille_id, func.max(faits_table.c.grille_version))
+                .where(faits_table.c.cotation_id.in_(cotation_ids), faits_table.c.grille_version.isnot(None))
+                .group_by(faits_table.c.cotation_id, faits_table.c.grille_id)
+            )
+        }
+
+        versions_table = GrilleVersion.__table__
+        grille_ids = {ligne.grille_id for ligne in lignes if (ligne.id, ligne.grille_id) not in existantes}
+        historiques: dict[int, list[tuple[datetime, int]]] = {}
+        if grille_ids:
+            for grille_id, date_creation, version_num in connection.execute(
+                select(versions_table.c.grille_id, versions_table.c.date_creation, versions_table.c.version_num)
+                .where(versions_table.c.grille_id.in_(grille_ids))
+                .order_by(versions_table.c.grille_id, versions_table.c.version_num)
+            ):
+                historiques.setdefault(grille_id, []).append((date_creation, version_num))
+
+        faits: list[dict[str, Any]] = []
+        for ligne in lignes:
+            version = existantes.get((ligne.id, ligne.grille_id))
+            if version is None:
+                version = _version_a_la_date(historiques.get(ligne.grille_id, []), ligne.date_creation)
+            for indicateur, valeur in HistoriqueScoresService.extraire_faits(ligne.scores_detailles):
+                faits.append({
+                    'cotation_id': ligne.id,
+                    'patient_id': ligne.patient_id,
+                    'grille_id': ligne.grille_id,
+                    'grille_version': version,
+                    'indicateur': indicateur,
+                    'valeur': valeur,
+                    'date_seance': ligne.date_seance,
+                })
+
+        connection.execute(delete(faits_table).where(faits_table.c.cotation_id.in_(cotation_ids)))
+        if faits:
+            connection.execute(insert(faits_table), faits)
+        return len(faits)
+
+    @staticmethod
+    def backfill(taille_lot: int = 1000) -> int:
+        """Reconstruit la table de faits pour toutes les cotations existantes, par lots.
+
+        Returns:
+            Nombre total de faits insérés
+        """
+        total = 0
+        dernier_id = 0
+        while True:
+            ids = [row[0] for row in db.session.execute(
+                select(CotationSeance.id).where(CotationSeance.id > dernier_id)
+                .order_by(CotationSeance.id).limit(taille_lot)
+            ).all()]
+            if not ids:
+                break
+            total += HistoriqueScoresService.enregistrer_cotations(db.session.connection(), ids)
+            db.session.commit()
+            dernier_id = ids[-1]
+        return total
+
+    @staticmethod
+    def evolution_indicateurs(patient_id: int, grille_id: int | None = None, indicateurs: list[str] | None = None,
+                              debut: datetime | None = None, fin: datetime | None = None) -> dict[str, list[dict[str, Any]]]:
+        """Séries chronologiques par indicateur pour un patient (balayage d'index)."""
+        query = db.session.query(
+            CotationScore.indicateur, CotationScore.date_seance, CotationScore.valeur, CotationScore.cotation_id
+        ).filter(CotationScore.patient_id == patient_id)
+        if indicateurs:
+            query = query.filter(CotationScore.indicateur.in_(indicateurs))
+        if grille_id is not None:
+            query = query.filter(CotationScore.grille_id == grille_id)
+        if debut is not None:
+            query = query.filter(CotationScore.date_seance >= debut)
+        if fin is not None:
+            query = query.filter(CotationScore.date_seance < fin)
+        series: dict[str, list[dict[str, Any]]] = {}
+        for indicateur, date_seance, valeur, cotation_id in query.order_by(CotationScore.indicateur, CotationScore.date_seance):
+            series.setdefault(indicateur, []).append({
+                'date': date_seance.isoformat(),
+                'valeur': valeur,
+                'cotation_id': cotation_id
+            })
+        return series
+
+    # ------------------- Écouteur de session ------------------- #
+    @staticmethod
+    def installer() -> None:
+        """Branche l'alimentation automatique sur les flush de session (idempotent)."""
+        if not event.contains(Session, 'after_flush', _apres_flush):
+            event.listen(Session, 'after_flush', _apres_flush)
+
+
+def _version_a_la_date(historique: list[tuple[datetime, int]], date: datetime | None) -> int | None:
+    """Dernière version créée au plus tard à `date` (historique trié par version).
+
+    Une cotation antérieure à toute version (version initiale créée après coup)
+    reçoit la plus ancienne : c'est l'état de la grille avant sa première modification.
+    """
+    if not historique:
+        return None
+    retenue = historique[0][1]
+    for date_creation, version_num in historique:
+        if date is not None and date_creation is not None and date_creation > date:
+            break
+        retenue = version_num
+    return retenue
+
+
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    """Synchronise les faits des cotations créées, modifiées ou supprimées dans ce flush."""
+    a_synchroniser: list[int] = []
+    supprimees: list[int] = []
+    for obj in session.new:
+        if isinstance(obj, CotationSeance) and obj.id is not None:
+            a_synchroniser.append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, CotationSeance) and obj.id is not None and session.is_modified(obj):
+            a_synchroniser.append(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, CotationSeance) and obj.id is not None:
+            supprimees.append(obj.id)
+    # Une séance re-datée ou réaffectée invalide la date/patient portés par ses faits
+    seances_modifiees = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, Seance) and obj.id is not None
+        and (inspect(obj).attrs.date_seance.history.has_changes() or inspect(obj).attrs.patient_id.history.has_changes())
+    ]
+    if seances_modifiees:
+        a_synchroniser.extend(session.connection().execute(
+            select(CotationSeance.__table__.c.id).where(CotationSeance.__table__.c.seance_id.in_(seances_modifiees))
+        ).scalars())
+    if not (a_synchroniser or supprimees):
+        return
+    connection = session.connection()
+    if supprimees:
+        table = CotationScore.__table__
+        connection.execute(delete(table).where(table.c.cotation_id.in_(supprimees)))
+    HistoriqueScoresService.enregistrer_cotations(connection, sorted(set(a_synchroniser)))
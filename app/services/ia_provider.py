@@ -0,0 +1,104 @@
+"""Accès aux fournisseurs IA (OpenAI pour Whisper, Mistral pour les synthèses).
+
+Les SDK ne sont importés qu'au premier appel : un worker qui ne transcrit ni ne
+synthétise jamais ne paie pas leur coût d'import. Les clients sont ensuite
+réutilisés par le processus (un client par clé API).
+
+OPENAI_BASE_URL / MISTRAL_BASE_URL redirigent les appels vers un autre serveur
+compatible (ex. le faux fournisseur de loadtest/ pour les tests de charge).
+"""
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[tuple[str, str], Any] = {}
+_verrou = threading.Lock()
+
+
+def _client(fournisseur: str, cle: str, fabrique) -> Any:
+    """Client mis en cache par (fournisseur, clé) ; créé une seule fois par processus."""
+    client = _clients.get((fournisseur, cle))
+    if client is None:
+        with _verrou:
+            client = _clients.get((fournisseur, cle))
+            if client is None:
+                client = _clients[(fournisseur, cle)] = fabrique(cle)
+    return client
+
+
+def _classe_mistral() -> Any | None:
+    """Classe client Mistral selon la version installée (SDK v1 puis ancien client)."""
+    try:
+        from mistralai import Mistral  # type: ignore
+        return Mistral
+    except Exception:  # pragma: no cover
+        with contextlib.suppress(Exception):
+            from mistralai.client import MistralClient  # type: ignore
+            return MistralClient
+    return None
+
+
+def _url_mistral(classe: Any) -> dict[str, str]:
+    """Argument d'URL de base selon le SDK (server_url en v1, endpoint pour l'ancien client)."""
+    url = os.environ.get('MISTRAL_BASE_URL')
+    if not url:
+        return {}
+    return {'endpoint': url} if classe.__name__ == 'MistralClient' else {'server_url': url}
+
+
+class FournisseurIA:
+    """Façade des clients IA, chargés à la demande."""
+
+    @staticmethod
+    def openai() -> Any | None:
+        """Client OpenAI, ou None si OPENAI_API_KEY est absente ou le SDK indisponible."""
+        cle = os.environ.get('OPENAI_API_KEY')
+        if not cle:
+            return None
+
+        def creer(api_key: str) -> Any:
+            import openai
+            return openai.OpenAI(api_key=api_key, base_url=os.environ.get('OPENAI_BASE_URL') or None)
+
+        try:
+            return _client('openai', cle, creer)
+        except Exception as e:
+            logger.error(f"❌ Échec initialisation OpenAI: {e}")
+            return None
+
+    @staticmethod
+    def mistral() -> tuple[Any | None, str | None, str | None]:
+        """Client Mistral, mode d'appel ('responses' | 'chat' | 'unknown') et erreur d'initialisation.
+
+        Returns:
+            (client, mode, erreur) ; client None si MISTRAL_API_KEY est absente ou en cas d'échec
+        """
+        cle = os.environ.get('MISTRAL_API_KEY')
+        if not cle:
+            return None, None, None
+        classe = _classe_mistral()
+        if classe is None:
+            logger.warning("⚠️ Paquet 'mistralai' non installé: pip install mistralai pour activer Mistral")
+            return None, None, "Paquet mistralai non installé"
+        try:
+            client = _client('mistral', cle, lambda api_key: classe(api_key=api_key, **_url_mistral(classe)))
+        except Exception as e:
+            logger.error(f"❌ Impossible d'initialiser Mistral: {e}")
+            return None, None, str(e)
+        if hasattr(client, 'responses'):
+            mode = 'responses'
+        elif hasattr(client, 'chat'):
+            mode = 'chat'
+        else:
+            mode = 'unknown'
+        return client, mode, None
+
+    @staticmethod
+    def modele_mistral() -> str:
+        return os.environ.get('MISTRAL_MODEL', 'mistral-large-latest')
@@ -0,0 +1,240 @@
+"""Synchronisation du catalogue JSON des grilles standard vers la base.
+
+Un seul passage : lecture de l'état existant (une requête par table), calcul du
+différentiel, puis écriture des seules différences par insertions multi-lignes
+(INSERT ... RETURNING / ON CONFLICT DO NOTHING) dans une transaction.
+
+Deux représentations sont alimentées :
+- `grille_evaluation` (type 'standard', domaines_config JSON) + `grille_version`
+  (nouvelle version à chaque changement de domaines, comme update_grille_domaines) ;
+- les tables normalisées `grille`, `domaine`, `indicateur`, `grille_domaine`,
+  `domaine_indicateur` (domaines et indicateurs dédoublonnés par nom).
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+from app.models import db
+from app.models.cotation import (
+    Domaine,
+    DomaineIndicateur,
+    Grille,
+    GrilleDomaine,
+    GrilleEvaluation,
+    GrilleVersion,
+    Indicateur,
+)
+from app.services.catalogue_grilles import CatalogueGrilles
+
+
+def _inserer_dialecte(connection: Connection, table: Any):
+    """INSERT propre au dialecte (pour ON CONFLICT DO NOTHING)."""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as inserer
+    else:
+        from sqlalchemy.dialects.sqlite import insert as inserer
+    return inserer(table)
+
+
+def _nom(element: Any) -> str | None:
+    """Nom d'un domaine/indicateur du JSON (objet {'nom': ...} ou simple chaîne)."""
+    return element.get('nom') if isinstance(element, dict) else element
+
+
+class ImportGrillesService:
+    """Différentiel catalogue JSON ↔ base et application en une transaction."""
+
+    @staticmethod
+    def planifier(connection: Connection, grilles: list[dict[str, Any]] | None = None) -> dict[str, Any]:
+        """Calcule les changements à appliquer (aucune écriture)."""
+        if grilles is None:
+            grilles = list(CatalogueGrilles.charger().grilles)
+        ge = GrilleEvaluation.__table__
+        versions = GrilleVersion.__table__
+
+        existantes = {
+            ligne.nom: ligne for ligne in connection.execute(
+                select(ge.c.id, ge.c.nom, ge.c.description, ge.c.reference_scientifique, ge.c.domaines_config, ge.c.active)
+                .where(ge.c.type_grille == 'standard', ge.c.user_id.is_(None))
+                .order_by(ge.c.id)
+            )
+        }
+        derniere_version = dict(connection.execute(
+            select(versions.c.grille_id, func.max(versions.c.version_num)).group_by(versions.c.grille_id)
+        ).all())
+
+        a_creer: list[dict[str, Any]] = []
+        a_modifier: list[dict[str, Any]] = []
+        inchangees = 0
+        for grille in grilles:
+            valeurs = {
+                'nom': grille['nom'],
+                'description': grille.get('description', ''),
+                'reference_scientifique': grille.get('reference_scientifique'),
+                'domaines_config': grille.get('domaines', []),
+            }
+            ligne = existantes.get(grille['nom'])
+            if ligne is None:
+                a_creer.append(valeurs)
+                continue
+            changements = {
+                cle: valeur for cle, valeur in valeurs.items()
+                if cle != 'nom' and getattr(ligne, cle) != valeur
+            }
+            if not ligne.active:
+                changements['active'] = True
+            if changements:
+                a_modifier.append({
+                    'id': ligne.id, 'nom': ligne.nom, 'changements': changements,
+                    'version': (derniere_version.get(ligne.id) or 0) + 1 if 'domaines_config' in changements else None,
+                })
+            else:
+                inchangees += 1
+
+        # Tables normalisées : noms existants (premier id en cas de doublon historique)
+        def ids_par_nom(modele: Any) -> dict[str, int]:
+            table = modele.__table__
+            return dict(connection.execute(select(table.c.nom, func.min(table.c.id)).group_by(table.c.nom)).all())
+
+        grilles_norm = ids_par_nom(Grille)
+        domaines = ids_par_nom(Domaine)
+        indicateurs = ids_par_nom(Indicateur)
+        gd, dom, ind = GrilleDomaine.__table__, Domaine.__table__, Indicateur.__table__
+        di, gr = DomaineIndicateur.__table__, Grille.__table__
+        liens_gd = set(connection.execute(
+            select(gr.c.nom, dom.c.nom).select_from(gd.join(gr, gd.c.grille_id == gr.c.id).join(dom, gd.c.domaine_id == dom.c.id))
+        ).all())
+        liens_di = set(connection.execute(
+            select(dom.c.nom, ind.c.nom).select_from(di.join(dom, di.c.domaine_id == dom.c.id).join(ind, di.c.indicateur_id == ind.c.id))
+        ).all())
+
+        nouvelles_grilles: dict[str, dict[str, Any]] = {}
+        nouveaux_domaines: dict[str, None] = {}
+        nouveaux_indicateurs: dict[str, None] = {}
+        nouveaux_gd: dict[tuple[str, str], None] = {}
+        nouveaux_di: dict[tuple[str, str], None] = {}
+        for grille in grilles:
+            if grille['nom'] not in grilles_norm:
+                nouvelles_grilles[grille['nom']] = {
+                    'nom': grille['nom'], 'description': grille.get('description', ''),
+                    'type_grille': 'standardisée', 'reference_scientifique': grille.get('reference_scientifique', ''),
+                }
+            for domaine in grille.get('domaines', []):
+                nom_domaine = _nom(domaine)
+                if not nom_domaine:
+                    continue
+                if nom_domaine not in domaines:
+                    nouveaux_domaines[nom_domaine] = None
+                if (grille['nom'], nom_domaine) not in liens_gd:
+                    nouveaux_gd[(grille['nom'], nom_domaine)] = None
+                for indicateur in (domaine.get('indicateurs', []) if isinstance(domaine, dict) else []):
+                    nom_indicateur = _nom(indicateur)
+                    if not nom_indicateur:
+                        continue
+                    if nom_indicateur not in indicateurs:
+                        nouveaux_indicateurs[nom_indicateur] = None
+                    if (nom_domaine, nom_indicateur) not in liens_di:
+                        nouveaux_di[(nom_domaine, nom_indicateur)] = None
+
+        return {
+            'grilles_a_creer': a_creer,
+            'grilles_a_modifier': a_modifier,
+            'grilles_inchangees': inchangees,
+            'normalise': {
+                'grilles': list(nouvelles_grilles.values()),
+                'domaines': list(nouveaux_domaines),
+                'indicateurs': list(nouveaux_indicateurs),
+                'grille_domaine': list(nouveaux_gd),
+                'domaine_indicateur': list(nouveaux_di),
+                'ids': {'grilles': grilles_norm, 'domaines': domaines, 'indicateurs': indicateurs},
+            },
+        }
+
+    @staticmethod
+    def appliquer(connection: Connection, plan: dict[str, Any]) -> None:
+        """Écrit le plan (insertions multi-lignes ; l'appelant gère la transaction)."""
+        ge = GrilleEvaluation.__table__
+        versions = GrilleVersion.__table__
+        nouvelles_versions: list[dict[str, Any]] = []
+
+        if plan['grilles_a_creer']:
+            lignes = [{**valeurs, 'type_grille': 'standard', 'active': True} for valeurs in plan['grilles_a_creer']]
+            ids = dict(connection.execute(insert(ge).returning(ge.c.nom, ge.c.id), lignes).all())
+            nouvelles_versions += [
+                {'grille_id': ids[valeurs['nom']], 'version_num': 1, 'domaines_config': valeurs['domaines_config'], 'active': True}
+                for valeurs in plan['grilles_a_creer']
+            ]
+
+        # Mises à jour groupées par ensemble de colonnes modifiées (un executemany par forme)
+        par_colonnes: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for modification in plan['grilles_a_modifier']:
+            colonnes = tuple(sorted(modification['changements']))
+            par_colonnes.setdefault(colonnes, []).append({'b_id': modification['id'], **modification['changements']})
+            if modification['version'] is not None:
+                nouvelles_versions.append({
+                    'grille_id': modification['id'], 'version_num': modification['version'],
+                    'domaines_config': modification['changements']['domaines_config'], 'active': True,
+                })
+        for colonnes, lignes in par_colonnes.items():
+            connection.execute(
+                update(ge).where(ge.c.id == bindparam('b_id')).values({c: bindparam(c) for c in colonnes}), lignes
+            )
+        if nouvelles_versions:
+            connection.execute(insert(versions), nouvelles_versions)
+
+        normalise = plan['normalise']
+        ids = {cle: dict(valeur) for cle, valeur in normalise['ids'].items()}
+        for cle, modele, lignes in (
+            ('grilles', Grille, normalise['grilles']),
+            ('domaines', Domaine, [{'nom': nom, 'description': ''} for nom in normalise['domaines']]),
+            ('indicateurs', Indicateur, [{'nom': nom, 'description': ''} for nom in normalise['indicateurs']]),
+        ):
+            if lignes:
+                table = modele.__table__
+                ids[cle].update(connection.execute(insert(table).returning(table.c.nom, table.c.id), lignes).all())
+
+        if normalise['grille_domaine']:
+            connection.execute(insert(GrilleDomaine.__table__), [
+                {'grille_id': ids['grilles'][g], 'domaine_id': ids['domaines'][d]} for g, d in normalise['grille_domaine']
+            ])
+        if normalise['domaine_indicateur']:
+            connection.execute(
+                _inserer_dialecte(connection, DomaineIndicateur.__table__).on_conflict_do_nothing(),
+                [{'domaine_id': ids['domaines'][d], 'indicateur_id': ids['indicateurs'][i]}
+                 for d, i in normalise['domaine_indicateur']]
+            )
+
+    @staticmethod
+    def synchroniser(dry_run: bool = False) -> dict[str, Any]:
+        """Planifie puis applique (ou non, en dry-run) dans une seule transaction."""
+        connection = db.session.connection()
+        try:
+            plan = ImportGrillesService.planifier(connection)
+            if dry_run:
+                db.session.rollback()
+            else:
+                ImportGrillesService.appliquer(connection, plan)
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return plan
+
+    @staticmethod
+    def resume(plan: dict[str, Any]) -> list[str]:
+        """Lignes lisibles décrivant un plan."""
+        lignes = [f"+ grille {v['nom']}" for v in plan['grilles_a_creer']]
+        for modification in plan['grilles_a_modifier']:
+            version = f" (version {modification['version']})" if modification['version'] else ''
+            lignes.append(f"~ grille {modification['nom']}: {', '.join(sorted(modification['changements']))}{version}")
+        normalise = plan['normalise']
+        lignes += [
+            f"= {plan['grilles_inchangees']} grille(s) inchangée(s)",
+            f"normalisé: +{len(normalise['grilles'])} grille(s), +{len(normalise['domaines'])} domaine(s), "
+            f"+{len(normalise['indicateurs'])} indicateur(s), +{len(normalise['grille_domaine'])} lien(s) grille-domaine, "
+            f"+{len(normalise['domaine_indicateur'])} lien(s) domaine-indicateur",
+        ]
+        return lignes
@@ -2,12 +2,22 @@
 
 Objectif: unifier la logique d'accès par user_id afin de réduire
 la duplication et préparer une future gestion fine des permissions.
+
+Carte d'ownership par requête : au premier contrôle, les ids des patients,
+séances et grilles de l'utilisateur courant sont chargés en une requête
+(UNION ALL) et conservés dans `flask.g`. Les contrôles suivants de la même
+requête sont de simples tests d'appartenance à un ensemble. La carte est
+invalidée au flush dès qu'un patient, une séance ou une grille est créé,
+modifié ou supprimé.
 """
 from __future__ import annotations
 
 from typing import Any
 
+from flask import g, has_request_context
 from flask_login import current_user  # type: ignore
+from sqlalchemy import event, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
 
 
 def _CURRENT_UID():  # type: ignore
@@ -51,3 +61,92 @@ def assert_owns(instance) -> bool:
     if hasattr(instance, 'user_id'):
         return instance.user_id == uid
     return True
+
+
+_CLE_G = '_ownership'
+_TYPES = ('patients', 'seances', 'grilles')
+
+
+def _charger_carte(uid: int) -> dict[str, frozenset[int]]:
+    """Ids possédés par l'utilisateur, en une seule requête."""
+    from app.models import Patient, Seance, db
+    from app.models.cotation import GrilleEvaluation
+
+    requete = union_all(
+        select(literal('patients'), Patient.id).where(Patient.user_id == uid),
+        select(literal('seances'), Seance.id).join(Patient, Seance.patient_id == Patient.id).where(Patient.user_id == uid),
+        select(literal('grilles'), GrilleEvaluation.id).where(GrilleEvaluation.user_id == uid),
+    )
+    ids: dict[str, set[int]] = {type_: set() for type_ in _TYPES}
+    for type_, id_ in db.session.execute(requete):
+        ids[type_].add(id_)
+    return {type_: frozenset(valeurs) for type_, valeurs in ids.items()}
+
+
+def owned_ids(type_: str) -> frozenset[int] | None:
+    """Ids possédés ('patients' | 'seances' | 'grilles') pour la requête courante.
+
+    None hors requête ou sans utilisateur connecté (contexte système).
+    """
+    if not has_request_context():
+        return None
+    uid = current_owner_id()
+    if not uid:
+        return None
+    carte = g.get(_CLE_G)
+    if carte is None or carte[0] != uid:
+        carte = (uid, _charger_carte(uid))
+        setattr(g, _CLE_G, carte)
+    return carte[1][type_]
+
+
+def _possede(type_: str, id_: int | None) -> bool:
+    if id_ is None:
+        return False
+    ids = owned_ids(type_)
+    return True if ids is None else id_ in ids
+
+
+def owns_patient(patient_id: int | None) -> bool:
+    """Le patient appartient-il à l'utilisateur courant ? (True en contexte système)"""
+    return _possede('patients', patient_id)
+
+
+def owns_seance(seance_id: int | None) -> bool:
+    """La séance appartient-elle à un patient de l'utilisateur courant ?"""
+    return _possede('seances', seance_id)
+
+
+def owns_grille(grille_id: int | None) -> bool:
+    """La grille (personnalisée) appartient-elle à l'utilisateur courant ?"""
+    return _possede('grilles', grille_id)
+
+
+def invalidate_ownership() -> None:
+    """Oublie la carte de la requête courante (rechargée au prochain contrôle)."""
+    if has_request_context():
+        g.pop(_CLE_G, None)
+
+
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    """Invalide la carte si un objet soumis à ownership a changé pendant le flush."""
+    if not has_request_context() or g.get(_CLE_G) is None:
+        return
+    from app.models import Patient, Seance
+    from app.models.cotation import GrilleEvaluation
+
+    suivis = (Patient, Seance, GrilleEvaluation)
+    if any(isinstance(obj, suivis) for obj in (*session.new, *session.deleted)):
+        invalidate_ownership()
+        return
+    for obj in session.dirty:
+        cle = 'patient_id' if isinstance(obj, Seance) else 'user_id'
+        if isinstance(obj, suivis) and inspect(obj).attrs[cle].history.has_changes():
+            invalidate_ownership()
+            return
+
+
+def installer() -> None:
+    """Branche l'invalidation de la carte sur les flush de session (idempotent)."""
+    if not event.contains(Session, 'after_flush', _apres_flush):
+        event.listen(Session, 'after_flush', _apres_flush)
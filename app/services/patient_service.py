@@ -7,6 +7,7 @@ from flask_login import current_user  # type: ignore
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Patient, db
+from app.services.ownership import owns_patient
 
 # NOTE: Les appels de construction Patient(...) et PatientGrille(...) peuvent générer
 # des faux positifs (params non reconnus) car SQLAlchemy injecte dynamiquement les
@@ -15,11 +16,9 @@ from app.models import Patient, db
 # Helper interne
 def _get_owned_patient(patient_id: int) -> Optional[Patient]:
     """Retourne le patient appartenant à l'utilisateur courant (ou None)."""
-    try:
-        user_id = current_user.id  # type: ignore[attr-defined]
-        return Patient.query.filter_by(id=patient_id, user_id=user_id).first()
-    except Exception:
-        return Patient.query.get(patient_id)
+    if not owns_patient(patient_id):
+        return None
+    return db.session.get(Patient, patient_id)
 
 
 class PatientService:
@@ -218,20 +217,13 @@ class PatientService:
             return False, f"Erreur lors de l'archivage: {str(e)}"
     
     @staticmethod
-    def search_patients(query: str) -> List[Patient]:
-        """Recherche des patients (nom ou prénom, filtrés par user si disponible)."""
-        search = f"%{query.lower()}%"
-        q = Patient.query
+    def search_patients(query: str, limite: int = 10) -> List[Patient]:
+        """Recherche des patients (nom ou prénom, insensible aux accents, filtrés par user si disponible)."""
+        from app.services.recherche_patients_service import RecherchePatientsService
+        user_id = None
         with contextlib.suppress(Exception):
             user_id = current_user.id  # type: ignore[attr-defined]
-            q = q.filter_by(user_id=user_id)
-        # Colonnes annotées en Any pour éviter faux positifs (SQLAlchemy instrumentation)
-        nom_col: Any = Patient.nom
-        prenom_col: Any = Patient.prenom
-        q = q.filter(db.or_(nom_col.ilike(search), prenom_col.ilike(search)))
-        q = q.filter_by(actif=True)
-        q = q.order_by(Patient.nom, Patient.prenom)
-        return q.all()
+        return [patient for patient, _ in RecherchePatientsService.rechercher(user_id, query, limite)]
 
     @staticmethod
     def _assigner_grilles(patient_id: int, grilles_ids: List[int]) -> tuple[bool, str]:
@@ -332,11 +324,7 @@ class PatientService:
         """
         try:
             # Vérifier que le patient existe et appartient à l'utilisateur
-            try:
-                user_id = current_user.id  # type: ignore[attr-defined]
-                patient = Patient.query.filter_by(id=patient_id, user_id=user_id).first()
-            except Exception:
-                patient = Patient.query.get(patient_id)
+            patient = _get_owned_patient(patient_id)
             
             if not patient:
                 return False, "Patient non trouvé"
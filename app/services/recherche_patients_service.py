@@ -0,0 +1,202 @@
+"""Recherche de patients en saisie prédictive (nom / prénom, insensible aux accents).
+
+- PostgreSQL : index GIN pg_trgm sur `synchronie_unaccent(lower(prenom || ' ' || nom))`,
+  filtre `LIKE '%q%' OR q <% nom_complet` (tous deux servis par l'index) et
+  classement par word_similarity.
+- SQLite : index de trigrammes en mémoire par utilisateur, construit une fois et
+  reconstruit seulement quand la signature (nombre, dernière modification) des
+  patients actifs de l'utilisateur change.
+"""
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.models import Patient, db
+
+LIMITE_MAX = 25
+
+SCHEMA_POSTGRES = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # unaccent() n'est pas IMMUTABLE : enveloppe requise pour l'utiliser dans un index
+    """
+    CREATE OR REPLACE FUNCTION synchronie_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_patients_nom_complet_trgm ON patients
+        USING GIN (synchronie_unaccent(lower(prenom || ' ' || nom)) gin_trgm_ops)
+    """,
+)
+
+
+def normaliser(texte: str) -> str:
+    """Minuscules sans diacritiques ni espaces superflus."""
+    decompose = unicodedata.normalize('NFKD', texte or '')
+    return ' '.join(''.join(c for c in decompose if not unicodedata.combining(c)).lower().split())
+
+
+def trigrammes(texte: str) -> set[str]:
+    """Trigrammes par mot (bordures comme pg_trgm : deux espaces avant, un après)."""
+    resultat: set[str] = set()
+    for mot in texte.split():
+        borde = f'  {mot} '
+        resultat.update(borde[i:i + 3] for i in range(len(borde) - 2))
+    return resultat
+
+
+@dataclass
+class _IndexNgrammes:
+    """Index inversé trigramme -> ids de patients d'un utilisateur."""
+
+    signature: tuple[Any, ...]
+    noms: dict[int, str] = field(default_factory=dict)
+    postings: dict[str, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def construire(cls, signature: tuple[Any, ...], lignes: list[tuple[int, str, str]]) -> _IndexNgrammes:
+        index = cls(signature)
+        for id_, nom, prenom in lignes:
+            complet = normaliser(f'{prenom} {nom}')
+            index.noms[id_] = complet
+            for trigramme in trigrammes(complet):
+                index.postings.setdefault(trigramme, []).append(id_)
+        return index
+
+    def chercher(self, requete: str, limite: int) -> list[tuple[int, float]]:
+        """Top-k (id, score) : part des trigrammes de la requête présents ; sous-chaînes d'abord.
+
+        Toute sous-chaîne est retenue quel que soit son score (comme `LIKE '%q%'` sous
+        PostgreSQL) ; le seuil de 0.3 ne filtre que les correspondances approchées.
+        """
+        cibles = trigrammes(requete)
+        if not cibles:
+            return []
+        communs: Counter[int] = Counter()
+        for trigramme in cibles:
+            communs.update(self.postings.get(trigramme, ()))
+        sous_chaines = {id_ for id_ in self._contenant(requete) if requete in self.noms[id_]}
+        candidats = [(True, communs[id_] / len(cibles), id_) for id_ in sous_chaines]
+        candidats += [
+            (False, nb / len(cibles), id_)
+            for id_, nb in communs.items()
+            if id_ not in sous_chaines and nb / len(cibles) >= 0.3
+        ]
+        candidats.sort(key=lambda item: (not item[0], -item[1], self.noms[item[2]]))
+        return [(id_, round(score, 4)) for _, score, id_ in candidats[:limite]]
+
+    def _contenant(self, requete: str) -> Iterable[int]:
+        """Ids dont le nom peut contenir `requete` : intersection des listes de ses trigrammes internes.
+
+        Un nom contenant la requête contient chaque trigramme non bordé de ses mots ;
+        sans trigramme (mots de 1 ou 2 lettres), parcours linéaire de tous les noms.
+        """
+        internes = {mot[i:i + 3] for mot in requete.split() for i in range(len(mot) - 2)}
+        if not internes:
+            return self.noms.keys()
+        listes = sorted((self.postings.get(trigramme, ()) for trigramme in internes), key=len)
+        ids = set(listes[0])
+        for liste in listes[1:]:
+            if not ids:
+                break
+            ids.intersection_update(liste)
+        return ids
+
+
+class RecherchePatientsService:
+    """Recherche prédictive des patients d'un utilisateur."""
+
+    _index: dict[int, _IndexNgrammes] = {}
+    _verrou = threading.Lock()
+
+    @staticmethod
+    def installer_index(connection: Connection) -> None:
+        """Crée (idempotent) l'index trigramme PostgreSQL ; rien à faire ailleurs."""
+        if connection.dialect.name == 'postgresql':
+            for instruction in SCHEMA_POSTGRES:
+                connection.exec_driver_sql(instruction)
+
+    @staticmethod
+    def rechercher(user_id: int | None, requete: str, limite: int = 10) -> list[tuple[Patient, float]]:
+        """Patients actifs les plus proches de `requete`, du plus au moins similaire."""
+        resultats = RecherchePatientsService.suggestions(user_id, requete, limite)
+        if not resultats:
+            return []
+        patients = {p.id: p for p in Patient.query.filter(Patient.id.in_([r['id'] for r in resultats])).all()}
+        return [(patients[r['id']], r['score']) for r in resultats if r['id'] in patients]
+
+    @staticmethod
+    def suggestions(user_id: int | None, requete: str, limite: int = 10) -> list[dict[str, Any]]:
+        """Projection légère (id, nom, prenom, pathologie, score) pour la saisie prédictive.
+
+        Une instruction sous PostgreSQL (la recherche elle-même), deux sous SQLite
+        (signature de l'index, puis colonnes des patients retenus) : sans chargement
+        d'objets ni de relations.
+        """
+        requete = normaliser(requete)
+        limite = min(max(limite, 1), LIMITE_MAX)
+        if not requete:
+            return []
+        if db.session.get_bind().dialect.name == 'postgresql':
+            return RecherchePatientsService._rechercher_postgres(user_id, requete, limite)
+        classement = RecherchePatientsService._index_utilisateur(user_id).chercher(requete, limite)
+        if not classement:
+            return []
+        lignes = {ligne.id: ligne for ligne in db.session.execute(
+            select(Patient.id, Patient.nom, Patient.prenom, Patient.pathologie)
+            .where(Patient.id.in_([id_ for id_, _ in classement]))
+        )}
+        return [
+            {'id': id_, 'nom': lignes[id_].nom, 'prenom': lignes[id_].prenom,
+             'pathologie': lignes[id_].pathologie, 'score': score}
+            for id_, score in classement if id_ in lignes
+        ]
+
+    @staticmethod
+    def _rechercher_postgres(user_id: int | None, requete: str, limite: int) -> list[dict[str, Any]]:
+        motif = requete.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        filtre_user = "AND user_id = :uid" if user_id else ""
+        lignes = db.session.execute(text(f"""
+            SELECT id, nom, prenom, pathologie, word_similarity(:q, nom_complet) AS score
+            FROM (
+                SELECT id, nom, prenom, pathologie, synchronie_unaccent(lower(prenom || ' ' || nom)) AS nom_complet
+                FROM patients
+                WHERE actif {filtre_user}
+            ) p
+            WHERE nom_complet LIKE '%' || :motif || '%' OR :q <% nom_complet
+            ORDER BY (nom_complet LIKE :motif || '%') DESC, score DESC, nom_complet
+            LIMIT :limite
+        """), {'q': requete, 'motif': motif, 'uid': user_id, 'limite': limite}).all()
+        return [
+            {'id': ligne.id, 'nom': ligne.nom, 'prenom': ligne.prenom, 'pathologie': ligne.pathologie,
+             'score': round(float(ligne.score), 4)}
+            for ligne in lignes
+        ]
+
+    @staticmethod
+    def _index_utilisateur(user_id: int | None) -> _IndexNgrammes:
+        """Index en mémoire de l'utilisateur, reconstruit si ses patients actifs ont changé."""
+        filtres = [Patient.actif.is_(True)]
+        if user_id:
+            filtres.append(Patient.user_id == user_id)
+        signature = tuple(db.session.execute(
+            select(func.count(Patient.id), func.max(Patient.date_modification), func.max(Patient.id)).where(*filtres)
+        ).one())
+        cle = user_id or 0
+        index = RecherchePatientsService._index.get(cle)
+        if index is not None and index.signature == signature:
+            return index
+        lignes = db.session.execute(select(Patient.id, Patient.nom, Patient.prenom).where(*filtres)).all()
+        index = _IndexNgrammes.construire(signature, [tuple(ligne) for ligne in lignes])
+        with RecherchePatientsService._verrou:
+            RecherchePatientsService._index[cle] = index
+        return index
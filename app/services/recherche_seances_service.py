@@ -0,0 +1,200 @@
+"""Recherche plein texte dans les séances (observations, transcriptions, synthèses IA).
+
+- PostgreSQL : colonne `seances.recherche` (tsvector pondéré) tenue à jour par trigger,
+  index GIN, configuration `synchronie_fr` (unaccent + racinisation française),
+  classement ts_rank_cd et extraits ts_headline.
+- SQLite : table FTS5 `seances_fts` à contenu externe, synchronisée par triggers
+  (tokenizer unicode61 sans diacritiques, préfixes à la place de la racinisation),
+  classement bm25 et extraits snippet().
+
+Le schéma est installé par `flask init-db` (et au démarrage si AUTO_CREATE_SCHEMA) ;
+migration_seances_fts.sql en est l'équivalent PostgreSQL à appliquer manuellement.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from markupsafe import escape
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.models import db
+
+DEBUT, FIN = '\x02', '\x03'  # délimiteurs des termes trouvés dans les extraits, avant échappement HTML
+PAR_PAGE_MAX = 50
+
+COLONNES = ('type_seance', 'objectifs_seance', 'activites_realisees', 'observations', 'transcription_audio', 'synthese_ia')
+
+SCHEMA_POSTGRES = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'synchronie_fr') THEN
+            CREATE TEXT SEARCH CONFIGURATION synchronie_fr (COPY = french);
+            ALTER TEXT SEARCH CONFIGURATION synchronie_fr
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE seances ADD COLUMN IF NOT EXISTS recherche tsvector",
+    """
+    CREATE OR REPLACE FUNCTION seances_recherche_maj() RETURNS trigger AS $$
+    BEGIN
+        NEW.recherche :=
+            setweight(to_tsvector('synchronie_fr', coalesce(NEW.observations, '')), 'A')
+            || setweight(to_tsvector('synchronie_fr', coalesce(NEW.synthese_ia, '')), 'B')
+            || setweight(to_tsvector('synchronie_fr',
+                   concat_ws(' ', NEW.type_seance, NEW.objectifs_seance, NEW.activites_realisees)), 'B')
+            || setweight(to_tsvector('synchronie_fr', coalesce(NEW.transcription_audio, '')), 'C');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS seances_recherche_maj ON seances",
+    """
+    CREATE TRIGGER seances_recherche_maj
+        BEFORE INSERT OR UPDATE OF type_seance, objectifs_seance, activites_realisees,
+                                   observations, transcription_audio, synthese_ia
+        ON seances FOR EACH ROW EXECUTE FUNCTION seances_recherche_maj()
+    """,
+    # Rattrapage des lignes existantes (le trigger calcule la colonne)
+    "UPDATE seances SET observations = observations WHERE recherche IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_seances_recherche ON seances USING GIN (recherche)",
+)
+
+_LISTE = ', '.join(COLONNES)
+_NEW = ', '.join(f'new.{c}' for c in COLONNES)
+_OLD = ', '.join(f'old.{c}' for c in COLONNES)
+SCHEMA_SQLITE = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS seances_fts USING fts5(
+        {_LISTE}, content='seances', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS seances_fts_ai AFTER INSERT ON seances BEGIN
+        INSERT INTO seances_fts(rowid, {_LISTE}) VALUES (new.id, {_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS seances_fts_ad AFTER DELETE ON seances BEGIN
+        INSERT INTO seances_fts(seances_fts, rowid, {_LISTE}) VALUES ('delete', old.id, {_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS seances_fts_au AFTER UPDATE ON seances BEGIN
+        INSERT INTO seances_fts(seances_fts, rowid, {_LISTE}) VALUES ('delete', old.id, {_OLD});
+        INSERT INTO seances_fts(rowid, {_LISTE}) VALUES (new.id, {_NEW});
+    END
+    """,
+)
+
+# Poids bm25 dans l'ordre de COLONNES (observations et synthèses en tête)
+_POIDS_BM25 = '1.0, 2.0, 2.0, 4.0, 1.0, 3.0'
+
+
+def _extrait(brut: str | None) -> str:
+    """Extrait échappé pour HTML, termes trouvés entourés de <mark>."""
+    if not brut:
+        return ''
+    return str(escape(brut)).replace(DEBUT, '<mark>').replace(FIN, '</mark>')
+
+
+def _requete_fts5(texte: str) -> str | None:
+    """Requête FTS5 sûre : chaque mot en préfixe, tous requis (aucune syntaxe utilisateur interprétée)."""
+    mots = re.findall(r'\w+', texte)
+    if not mots:
+        return None
+    return ' '.join(f'"{mot}"*' for mot in mots[:16])
+
+
+class RechercheSeancesService:
+    """Index plein texte des séances et recherche classée/paginée."""
+
+    @staticmethod
+    def installer_index(connection: Connection) -> None:
+        """Crée (idempotent) l'index plein texte propre au dialecte et indexe l'existant."""
+        if connection.dialect.name == 'postgresql':
+            for instruction in SCHEMA_POSTGRES:
+                connection.exec_driver_sql(instruction)
+        elif connection.dialect.name == 'sqlite':
+            existe = connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'seances_fts'"
+            ).first()
+            for instruction in SCHEMA_SQLITE:
+                connection.exec_driver_sql(instruction)
+            if not existe:
+                connection.exec_driver_sql("INSERT INTO seances_fts(seances_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def rechercher(user_id: int, texte: str, patient_id: int | None = None,
+                   page: int = 1, par_page: int = 20) -> dict[str, Any]:
+        """Séances de l'utilisateur correspondant à `texte`, les plus pertinentes d'abord.
+
+        Returns:
+            {'items': [{id, patient_id, date_seance, rang, extrait}], 'total', 'page', 'par_page'}
+        """
+        page = max(page, 1)
+        par_page = min(max(par_page, 1), PAR_PAGE_MAX)
+        resultat: dict[str, Any] = {'items': [], 'total': 0, 'page': page, 'par_page': par_page}
+        texte = (texte or '').strip()
+        if not texte:
+            return resultat
+
+        params: dict[str, Any] = {
+            'uid': user_id, 'pid': patient_id, 'limite': par_page, 'decalage': (page - 1) * par_page,
+        }
+        filtre_patient = "AND s.patient_id = :pid" if patient_id else ""
+        connection = db.session.connection()
+        if connection.dialect.name == 'postgresql':
+            params['texte'] = texte
+            params['options'] = f'StartSel={DEBUT}, StopSel={FIN}, MaxFragments=2, MaxWords=20, MinWords=6'
+            sql = f"""
+                SELECT s.id, s.patient_id, s.date_seance,
+                       ts_rank_cd(s.recherche, q.requete) AS rang,
+                       ts_headline('synchronie_fr',
+                                   concat_ws(' … ', s.observations, s.synthese_ia, s.transcription_audio,
+                                             s.objectifs_seance, s.activites_realisees),
+                                   q.requete, :options) AS extrait,
+                       count(*) OVER () AS total
+                FROM seances s
+                JOIN patients p ON p.id = s.patient_id,
+                     websearch_to_tsquery('synchronie_fr', :texte) AS q(requete)
+                WHERE p.user_id = :uid AND s.recherche @@ q.requete {filtre_patient}
+                ORDER BY rang DESC, s.date_seance DESC
+                LIMIT :limite OFFSET :decalage
+            """
+        else:
+            requete = _requete_fts5(texte)
+            if requete is None:
+                return resultat
+            params['texte'] = requete
+            # Les fonctions auxiliaires FTS5 ne tolèrent pas de fenêtre au même niveau : CTE
+            sql = f"""
+                WITH trouves AS (
+                    SELECT rowid AS seance_id,
+                           bm25(seances_fts, {_POIDS_BM25}) AS score,
+                           snippet(seances_fts, -1, char(2), char(3), '…', 16) AS extrait
+                    FROM seances_fts
+                    WHERE seances_fts MATCH :texte
+                )
+                SELECT s.id, s.patient_id, s.date_seance, -t.score AS rang, t.extrait,
+                       count(*) OVER () AS total
+                FROM trouves t
+                JOIN seances s ON s.id = t.seance_id
+                JOIN patients p ON p.id = s.patient_id
+                WHERE p.user_id = :uid {filtre_patient}
+                ORDER BY t.score, s.date_seance DESC
+                LIMIT :limite OFFSET :decalage
+            """
+        lignes = connection.execute(text(sql), params).all()
+        if lignes:
+            resultat['total'] = lignes[0].total
+        resultat['items'] = [{
+            'id': ligne.id,
+            'patient_id': ligne.patient_id,
+            'date_seance': ligne.date_seance.isoformat() if hasattr(ligne.date_seance, 'isoformat') else ligne.date_seance,
+            'rang': round(float(ligne.rang), 4),
+            'extrait': _extrait(ligne.extrait),
+        } for ligne in lignes]
+        return resultat
@@ -0,0 +1,104 @@
+"""Contrôles de santé sans charge sur la base.
+
+- vivacité : aucune requête SQL ;
+- disponibilité : un `SELECT 1` borné dans le temps (HEALTH_READY_TIMEOUT_MS) ;
+- schéma : colonnes essentielles vérifiées une seule fois par processus (premier
+  appel ou `flask init-db`) puis servies depuis le cache ;
+- volumes : estimations du planificateur (pg_class.reltuples) ou max(id) sous
+  SQLite, jamais de COUNT(*) complet.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as DelaiDepasse
+from typing import Any
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+COLONNES_REQUISES: dict[str, set[str]] = {
+    'grille_evaluation': {'id', 'nom', 'type_grille', 'domaines_config', 'active', 'date_creation', 'date_modification'},
+    'patients': {'id', 'nom', 'prenom', 'actif', 'date_creation', 'date_modification'},
+    'seances': {'id', 'patient_id', 'date_seance', 'date_creation', 'date_modification'},
+}
+
+# Un seul thread de sonde : une base bloquée n'accumule pas de threads, les sondes suivantes expirent
+_executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sonde-db')
+
+
+class SanteService:
+    """Sondes de vivacité, de disponibilité et vérification de schéma mise en cache."""
+
+    _schema: dict[str, Any] | None = None
+    _verrou = threading.Lock()
+
+    @staticmethod
+    def sonder(engine: Engine, timeout_ms: int) -> dict[str, Any]:
+        """`SELECT 1` sur une connexion du pool, abandonné au-delà de `timeout_ms`."""
+        def ping() -> float:
+            debut = time.perf_counter()
+            with engine.connect() as connection:
+                if connection.dialect.name == 'postgresql':
+                    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+                connection.exec_driver_sql("SELECT 1")
+            return (time.perf_counter() - debut) * 1000
+
+        try:
+            duree = _executeur.submit(ping).result(timeout=timeout_ms / 1000)
+        except DelaiDepasse:
+            return {'pret': False, 'erreur': f'délai de {timeout_ms} ms dépassé'}
+        except Exception as e:
+            return {'pret': False, 'erreur': str(e)}
+        return {'pret': True, 'db_ms': round(duree, 1)}
+
+    @staticmethod
+    def schema(engine: Engine, rafraichir: bool = False) -> dict[str, Any]:
+        """Vérification du schéma, calculée une fois par processus (ou sur demande)."""
+        if SanteService._schema is None or rafraichir:
+            with SanteService._verrou:
+                if SanteService._schema is None or rafraichir:
+                    SanteService._schema = SanteService._verifier_schema(engine)
+        return SanteService._schema
+
+    @staticmethod
+    def _verifier_schema(engine: Engine) -> dict[str, Any]:
+        issues: list[str] = []
+        details: dict[str, dict[str, Any]] = {}
+        inspecteur = inspect(engine)
+        for table, requises in COLONNES_REQUISES.items():
+            colonnes = {colonne['name'] for colonne in inspecteur.get_columns(table)} if inspecteur.has_table(table) else set()
+            manquantes = sorted(requises - colonnes)
+            if manquantes:
+                issues.append(f"{table}: colonnes manquantes {manquantes}")
+            details[table] = {'missing': manquantes}
+        if inspecteur.has_table('grille_evaluation') and 'domaines_config' not in details['grille_evaluation']['missing']:
+            with engine.connect() as connection:
+                nulles = connection.execute(text(
+                    "SELECT COUNT(*) FROM grille_evaluation WHERE domaines_config IS NULL"
+                )).scalar()
+            if nulles:
+                issues.append(f"grille_evaluation: {nulles} lignes domaines_config NULL")
+                details['grille_evaluation']['bad_domaines_config_null'] = nulles
+        return {'issues': issues, 'details': details, 'verifie_le': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+    @staticmethod
+    def estimations_lignes(engine: Engine) -> dict[str, int | None]:
+        """Nombre de lignes estimé par table (statistiques du planificateur, sans parcours)."""
+        tables = list(COLONNES_REQUISES)
+        with engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                lignes = connection.execute(text(
+                    "SELECT relname, reltuples::bigint FROM pg_class "
+                    "WHERE relkind = 'r' AND relname = ANY(:tables) AND pg_table_is_visible(oid)"
+                ), {'tables': tables}).all()
+                # reltuples = -1 : table jamais analysée
+                estimations = {nom: (int(n) if n is not None and n >= 0 else None) for nom, n in lignes}
+            else:
+                # max(id) : lecture de la fin de l'index de clé primaire, majorant du nombre de lignes
+                estimations = {
+                    table: connection.execute(text(f"SELECT max(id) FROM {table}")).scalar() or 0
+                    for table in tables
+                }
+        return {table: estimations.get(table) for table in tables}
@@ -8,6 +8,7 @@ from flask_login import current_user  # type: ignore
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Patient, Seance, db
+from app.services.ownership import owns_patient, owns_seance
 
 
 class SeanceService:
@@ -26,12 +27,8 @@ class SeanceService:
             Tuple[bool, str, Optional[Seance]]: (success, message, seance)
         """
         try:
-            # Vérifier que le patient existe
-            try:
-                uid = current_user.id  # type: ignore[attr-defined]
-                patient = Patient.query.filter_by(id=patient_id, user_id=uid).first()
-            except Exception:
-                patient = Patient.query.get(patient_id)
+            # Vérifier que le patient existe et appartient à l'utilisateur
+            patient = db.session.get(Patient, patient_id) if owns_patient(patient_id) else None
             if not patient:
                 return False, "Patient non trouvé", None
             
@@ -79,13 +76,9 @@ class SeanceService:
     def get_seance_by_id(seance_id: int) -> Optional[Seance]:
         """Récupérer une séance par son ID avec la relation patient"""
         try:
-            try:
-                uid = current_user.id  # type: ignore[attr-defined]
-                return (Seance.query.join(Patient)
-                        .filter(Seance.id == seance_id, Patient.user_id == uid)
-                        .first())  # type: ignore
-            except Exception:
-                return Seance.query.join(Patient).filter(Seance.id == seance_id).first()  # type: ignore
+            if not owns_seance(seance_id):
+                return None
+            return db.session.get(Seance, seance_id)
         except Exception:
             return None
     
@@ -93,13 +86,9 @@ class SeanceService:
     def get_seances_by_patient(patient_id: int) -> List[Seance]:
         """Récupérer toutes les séances d'un patient"""
         try:
-            try:
-                uid = current_user.id  # type: ignore[attr-defined]
-                return (Seance.query.join(Patient)
-                        .filter(Seance.patient_id == patient_id, Patient.user_id == uid)
-                        .order_by(Seance.date_seance.desc()).all())  # type: ignore
-            except Exception:
-                return Seance.query.filter_by(patient_id=patient_id).order_by(Seance.date_seance.desc()).all()  # type: ignore
+            if not owns_patient(patient_id):
+                return []
+            return Seance.query.filter_by(patient_id=patient_id).order_by(Seance.date_seance.desc()).all()  # type: ignore
         except Exception:
             return []
     
@@ -116,13 +105,7 @@ class SeanceService:
             Tuple[bool, str, Optional[Seance]]: (success, message, seance)
         """
         try:
-            try:
-                uid = current_user.id  # type: ignore[attr-defined]
-                seance = (Seance.query.join(Patient)
-                          .filter(Seance.id == seance_id, Patient.user_id == uid)
-                          .first())
-            except Exception:
-                seance = Seance.query.get(seance_id)
+            seance = db.session.get(Seance, seance_id) if owns_seance(seance_id) else None
             if not seance:
                 return False, "Séance non trouvée", None
             
@@ -183,13 +166,7 @@ class SeanceService:
             Tuple[bool, str]: (success, message)
         """
         try:
-            try:
-                uid = current_user.id  # type: ignore[attr-defined]
-                seance = (Seance.query.join(Patient)
-                          .filter(Seance.id == seance_id, Patient.user_id == uid)
-                          .first())
-            except Exception:
-                seance = Seance.query.get(seance_id)
+            seance = db.session.get(Seance, seance_id) if owns_seance(seance_id) else None
             if not seance:
                 return False, "Séance non trouvée"
             
@@ -287,7 +264,7 @@ class SeanceService:
     @staticmethod
     def search_seances(query: str, patient_id: Optional[int] = None) -> List[Seance]:
         """
-        Rechercher des séances par mots-clés
+        Rechercher des séances par mots-clés (index plein texte, 50 premières par pertinence)
         
         Args:
             query: Terme de recherche
@@ -297,23 +274,12 @@ class SeanceService:
             Liste des séances correspondantes
         """
         try:
-            base_query = Seance.query
-            
-            if patient_id:
-                base_query = base_query.filter_by(patient_id=patient_id)
-            
-            if query:
-                search_term = f"%{query}%"
-                base_query = base_query.filter(
-                    db.or_(
-                        Seance.type_seance.ilike(search_term),
-                        Seance.objectifs_seance.ilike(search_term),
-                        Seance.activites_realisees.ilike(search_term),
-                        Seance.observations.ilike(search_term)
-                    )
-                )
-            
-            return base_query.order_by(Seance.date_seance.desc()).all()  # type: ignore
+            from app.services.recherche_seances_service import PAR_PAGE_MAX, RechercheSeancesService
+            uid = current_user.id  # type: ignore[attr-defined]
+            resultat = RechercheSeancesService.rechercher(uid, query, patient_id=patient_id, par_page=PAR_PAGE_MAX)
+            ids = [item['id'] for item in resultat['items']]
+            seances = {s.id: s for s in Seance.query.filter(Seance.id.in_(ids)).all()} if ids else {}
+            return [seances[i] for i in ids if i in seances]
             
         except Exception:
             return []
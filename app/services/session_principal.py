@@ -0,0 +1,171 @@
+"""Principal de session : utilisateur courant mis en cache dans la session signée.
+
+Le `user_loader` de Flask-Login relisait `users` à chaque requête authentifiée.
+L'identité (id, email, nom, actif) est désormais conservée dans le cookie de
+session signé avec une durée de vie courte (PRINCIPAL_TTL) et n'est revalidée
+en base qu'à expiration, après une révocation (désactivation) ou à la connexion.
+
+Les révocations sont écrites dans `principal_revocation` (la désactivation se fait
+souvent depuis la CLI, un autre processus) ; chaque worker relit les révocations
+récentes au plus toutes les PRINCIPAL_REVOCATIONS_INTERVALLE secondes, en une
+requête, sur une connexion distincte de la session de la requête.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from flask import current_app, session
+from flask_login import UserMixin, user_logged_in, user_logged_out  # type: ignore
+
+from app.utils.metrics import compter_cache
+
+logger = logging.getLogger(__name__)
+
+CLE_SESSION = '_principal'
+
+# Révocations connues de ce processus (user_id -> horodatage), copie de
+# `principal_revocation` relue au plus toutes les PRINCIPAL_REVOCATIONS_INTERVALLE s
+_revocations: dict[int, float] = {}
+_derniere_lecture = 0.0
+_verrou = threading.Lock()
+
+
+class Principal(UserMixin):  # type: ignore[misc]
+    """Utilisateur courant reconstruit depuis la session, sans accès base."""
+
+    def __init__(self, id: int, email: str, nom: str | None, actif: bool) -> None:
+        self.id = id
+        self.email = email
+        self.nom = nom
+        self.actif = actif
+
+    @property
+    def is_active(self) -> bool:  # type: ignore[override]
+        return bool(self.actif)
+
+    def get_id(self) -> str:  # type: ignore[override]
+        return str(self.id)
+
+    def __repr__(self) -> str:
+        return f"<Principal {self.email}>"
+
+
+class SessionPrincipal:
+    """Lecture, mémorisation et invalidation du principal de session."""
+
+    @staticmethod
+    def charger(user_id: str) -> Principal | None:
+        """Principal pour `user_loader` : session si valide, sinon revalidation en base."""
+        principal = SessionPrincipal.depuis_session(user_id)
+        compter_cache('principal', principal is not None)
+        if principal is not None:
+            return principal
+        from app.models import User, db
+        user = db.session.get(User, int(user_id))
+        if user is None or not user.actif:
+            SessionPrincipal.invalider()
+            return None
+        return SessionPrincipal.memoriser(user)
+
+    @staticmethod
+    def depuis_session(user_id: str) -> Principal | None:
+        """Principal mis en cache s'il correspond à l'utilisateur, n'a pas expiré ni été révoqué."""
+        donnees = session.get(CLE_SESSION)
+        if not isinstance(donnees, dict) or str(donnees.get('id')) != str(user_id):
+            return None
+        maintenant = time.time()
+        emis = float(donnees.get('emis', 0))
+        if maintenant - emis > current_app.config.get('PRINCIPAL_TTL', 120):
+            return None
+        SessionPrincipal._relire_revocations()
+        if _revocations.get(int(donnees['id']), 0) >= emis:
+            return None
+        return Principal(int(donnees['id']), donnees.get('email', ''), donnees.get('nom'), bool(donnees.get('actif')))
+
+    @staticmethod
+    def memoriser(user: Any) -> Principal:
+        """Écrit l'identité de l'utilisateur dans la session et renvoie le principal."""
+        principal = Principal(user.id, user.email, user.nom, bool(user.actif))
+        session[CLE_SESSION] = {
+            'id': principal.id, 'email': principal.email, 'nom': principal.nom,
+            'actif': principal.actif, 'emis': time.time(),
+        }
+        return principal
+
+    @staticmethod
+    def invalider() -> None:
+        """Retire le principal de la session courante (relu en base à la prochaine requête)."""
+        session.pop(CLE_SESSION, None)
+
+    @staticmethod
+    def revoquer(user_id: int) -> None:
+        """Invalide les principaux émis jusqu'ici pour cet utilisateur, dans tous les processus.
+
+        Écrit la révocation dans la session SQLAlchemy courante (l'appelant commite).
+        """
+        from app.models import RevocationPrincipal, db
+        maintenant = datetime.now(timezone.utc)
+        revocation = db.session.get(RevocationPrincipal, user_id)
+        if revocation is None:
+            db.session.add(RevocationPrincipal(user_id=user_id, revoque_le=maintenant.replace(tzinfo=None)))
+        else:
+            revocation.revoque_le = maintenant.replace(tzinfo=None)
+        with _verrou:
+            _revocations[user_id] = maintenant.timestamp()
+
+    @staticmethod
+    def desactiver(user: Any) -> None:
+        """Désactive un compte et révoque ses principaux (l'appelant commite)."""
+        user.actif = False
+        SessionPrincipal.revoquer(user.id)
+
+    @staticmethod
+    def _relire_revocations() -> None:
+        """Recharge les révocations encore utiles (postérieures à now - PRINCIPAL_TTL), au plus une fois par intervalle."""
+        global _derniere_lecture
+        intervalle = current_app.config.get('PRINCIPAL_REVOCATIONS_INTERVALLE', 10)
+        maintenant = time.monotonic()
+        if maintenant - _derniere_lecture < intervalle:
+            return
+        with _verrou:
+            if maintenant - _derniere_lecture < intervalle:
+                return
+            _derniere_lecture = maintenant
+        from sqlalchemy import select
+
+        from app.models import RevocationPrincipal, db
+        # Un principal plus ancien que le TTL est de toute façon revalidé en base (dates UTC naïves)
+        limite = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=current_app.config.get('PRINCIPAL_TTL', 120))
+        try:
+            with db.engine.connect() as connection:
+                lignes = connection.execute(
+                    select(RevocationPrincipal.user_id, RevocationPrincipal.revoque_le)
+                    .where(RevocationPrincipal.revoque_le >= limite)
+                ).all()
+        except Exception:
+            # Table absente (migration non appliquée) : révocations bornées par PRINCIPAL_TTL
+            logger.warning("Révocations de principaux illisibles", exc_info=True)
+            return
+        with _verrou:
+            for user_id, revoque_le in lignes:
+                horodatage = revoque_le.replace(tzinfo=timezone.utc).timestamp()
+                _revocations[user_id] = max(_revocations.get(user_id, 0), horodatage)
+
+    @staticmethod
+    def installer(app: Any) -> None:
+        """Mémorise à la connexion et invalide à la déconnexion (signaux Flask-Login)."""
+        user_logged_in.connect(_connexion, app)
+        user_logged_out.connect(_deconnexion, app)
+
+
+def _connexion(sender: Any, user: Any = None, **extra: Any) -> None:
+    if user is not None:
+        SessionPrincipal.memoriser(user)
+
+
+def _deconnexion(sender: Any, user: Any = None, **extra: Any) -> None:
+    SessionPrincipal.invalider()
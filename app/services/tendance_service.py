@@ -0,0 +1,225 @@
+"""Moteur de tendances : régression linéaire, moyennes mobiles et variance des cotations.
+
+Sous PostgreSQL, les agrégats sont calculés en SQL (`regr_slope`, `var_samp`,
+fonctions de fenêtre). Ailleurs (SQLite), une seule requête ordonnée est parcourue
+en accumulant les sommes nécessaires (une passe, mémoire constante par patient).
+
+La variable explicative est la date de séance exprimée en jours : les pentes sont
+donc en points (ou % de réussite) par jour, et rapportées par mois (30 jours).
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.models import Patient, Seance, db
+from app.models.cotation import CotationScore, CotationSeance
+from app.utils.sql import est_postgres
+
+# Seuil (en points sur la période observée) au-delà duquel on parle d'évolution
+SEUIL_PROGRESSION = 5.0
+FENETRE_MOYENNE_MOBILE = 3
+
+
+class _Accumulateur:
+    """Sommes courantes pour une régression des moindres carrés en une passe."""
+
+    __slots__ = ('n', 'x0', 'sx', 'sy', 'sxx', 'sxy', 'syy', 'x_min', 'x_max', 'premier', 'dernier')
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.x0: float | None = None  # recentrage pour la stabilité numérique
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+        self.x_min = self.x_max = 0.0
+        self.premier: float | None = None
+        self.dernier: float | None = None
+
+    def ajouter(self, x: float, y: float) -> None:
+        if self.x0 is None:
+            self.x0 = x
+            self.x_min = self.x_max = x
+            self.premier = y
+        xc = x - self.x0
+        self.n += 1
+        self.sx += xc
+        self.sy += y
+        self.sxx += xc * xc
+        self.sxy += xc * y
+        self.syy += y * y
+        self.x_min = min(self.x_min, x)
+        self.x_max = max(self.x_max, x)
+        self.dernier = y
+
+    def resultat(self) -> dict[str, Any]:
+        n = self.n
+        moyenne = self.sy / n if n else None
+        variance = (self.syy - self.sy * self.sy / n) / (n - 1) if n >= 2 else None
+        denominateur = n * self.sxx - self.sx * self.sx
+        pente = (n * self.sxy - self.sx * self.sy) / denominateur if n >= 2 and denominateur > 1e-12 else None
+        return TendanceService.resume(n, pente, moyenne, variance, self.x_max - self.x_min, self.premier, self.dernier)
+
+
+class TendanceService:
+    """Calculs de tendance globaux (pourcentage de réussite) ou par indicateur."""
+
+    @staticmethod
+    def resume(n: int, pente: float | None, moyenne: float | None, variance: float | None,
+               etendue_jours: float, premier: float | None, dernier: float | None) -> dict[str, Any]:
+        """Normalise un résultat de régression et qualifie la tendance."""
+        progression = pente * etendue_jours if pente is not None else 0.0
+        tendance = None
+        if n >= 2:
+            if progression > SEUIL_PROGRESSION:
+                tendance = 'amelioration'
+            elif progression < -SEUIL_PROGRESSION:
+                tendance = 'deterioration'
+            else:
+                tendance = 'stable'
+        return {
+            'nb_points': n,
+            'pente_par_jour': round(pente, 4) if pente is not None else None,
+            'pente_par_mois': round(pente * 30, 2) if pente is not None else None,
+            'moyenne': round(moyenne, 2) if moyenne is not None else None,
+            'variance': round(variance, 2) if variance is not None else None,
+            'premiere_valeur': premier,
+            'derniere_valeur': dernier,
+            'progression': round(progression, 1),
+            'tendance': tendance
+        }
+
+    @staticmethod
+    def regression(points: list[tuple[datetime, float | None]]) -> dict[str, Any]:
+        """Régression des moindres carrés sur des points (date, valeur) déjà chargés."""
+        acc = _Accumulateur()
+        for date_point, valeur in points:
+            if date_point is not None and valeur is not None:
+                acc.ajouter(date_point.timestamp() / 86400.0, float(valeur))
+        return acc.resultat()
+
+    @staticmethod
+    def moyenne_mobile(valeurs: list[float | None], fenetre: int = FENETRE_MOYENNE_MOBILE) -> list[float | None]:
+        """Moyenne glissante sur les `fenetre` dernières valeurs non nulles."""
+        glissante: deque[float] = deque(maxlen=max(1, fenetre))
+        resultat: list[float | None] = []
+        for valeur in valeurs:
+            if valeur is not None:
+                glissante.append(float(valeur))
+            resultat.append(round(sum(glissante) / len(glissante), 2) if glissante else None)
+        return resultat
+
+    @staticmethod
+    def _source(indicateur: str | None) -> tuple[Any, Any, Any, list[Any]]:
+        """Colonnes (patient, date, valeur) et jointures selon la mesure demandée."""
+        if indicateur:
+            return CotationScore.patient_id, CotationScore.date_seance, CotationScore.valeur, [CotationScore.indicateur == indicateur]
+        return Seance.patient_id, Seance.date_seance, CotationSeance.pourcentage_reussite, [CotationSeance.pourcentage_reussite.isnot(None)]
+
+    @staticmethod
+    def _requete(colonnes: list[Any], indicateur: str | None, patient_ids: list[int], grille_id: int | None,
+                 debut: datetime | None, fin: datetime | None):
+        patient_col, date_col, _, filtres = TendanceService._source(indicateur)
+        query = db.session.query(*colonnes)
+        if indicateur:
+            query = query.select_from(CotationScore)
+            if grille_id is not None:
+                filtres = [*filtres, CotationScore.grille_id == grille_id]
+        else:
+            query = query.select_from(CotationSeance).join(Seance, CotationSeance.seance_id == Seance.id)
+            if grille_id is not None:
+                filtres = [*filtres, CotationSeance.grille_id == grille_id]
+        query = query.filter(patient_col.in_(patient_ids), *filtres)
+        if debut is not None:
+            query = query.filter(date_col >= debut)
+        if fin is not None:
+            query = query.filter(date_col < fin)
+        return query
+
+    @staticmethod
+    def _jours(date_col: Any) -> Any:
+        """Date exprimée en jours (flottant), pour la régression côté SQL."""
+        return func.extract('epoch', date_col) / 86400.0
+
+    @staticmethod
+    def tendances_patients(patient_ids: list[int], grille_id: int | None = None, indicateur: str | None = None,
+                           debut: datetime | None = None, fin: datetime | None = None) -> dict[int, dict[str, Any]]:
+        """Régression par patient, pour plusieurs patients en une requête.
+
+        Args:
+            patient_ids: Patients à analyser (déjà filtrés par ownership)
+            grille_id: Restreint aux cotations d'une grille
+            indicateur: Clé d'indicateur (table cotation_score) ; None = pourcentage global
+            debut, fin: Fenêtre temporelle [debut, fin[
+        """
+        if not patient_ids:
+            return {}
+        patient_col, date_col, valeur_col, _ = TendanceService._source(indicateur)
+        resultats: dict[int, dict[str, Any]] = {}
+
+        if est_postgres():
+            x = TendanceService._jours(date_col)
+            lignes = TendanceService._requete([
+                patient_col,
+                func.count(valeur_col),
+                func.regr_slope(valeur_col, x),
+                func.avg(valeur_col),
+                func.var_samp(valeur_col),
+                func.max(x) - func.min(x),
+                func.array_agg(aggregate_order_by(valeur_col, date_col.asc()))[1],
+                func.array_agg(aggregate_order_by(valeur_col, date_col.desc()))[1],
+            ], indicateur, patient_ids, grille_id, debut, fin).group_by(patient_col).all()
+            for patient_id, n, pente, moyenne, variance, etendue, premier, dernier in lignes:
+                resultats[patient_id] = TendanceService.resume(
+                    int(n),
+                    float(pente) if pente is not None else None,
+                    float(moyenne) if moyenne is not None else None,
+                    float(variance) if variance is not None else None,
+                    float(etendue or 0.0), premier, dernier
+                )
+            return resultats
+
+        accumulateurs: dict[int, _Accumulateur] = {}
+        lignes = TendanceService._requete([patient_col, date_col, valeur_col], indicateur, patient_ids, grille_id, debut, fin)
+        for patient_id, date_seance, valeur in lignes.order_by(patient_col, date_col).yield_per(2000):
+            if valeur is None or date_seance is None:
+                continue
+            acc = accumulateurs.get(patient_id)
+            if acc is None:
+                acc = accumulateurs[patient_id] = _Accumulateur()
+            acc.ajouter(date_seance.timestamp() / 86400.0, float(valeur))
+        for patient_id, acc in accumulateurs.items():
+            resultats[patient_id] = acc.resultat()
+        return resultats
+
+    @staticmethod
+    def serie_patient(patient_id: int, grille_id: int | None = None, indicateur: str | None = None,
+                      debut: datetime | None = None, fin: datetime | None = None,
+                      fenetre: int = FENETRE_MOYENNE_MOBILE) -> list[dict[str, Any]]:
+        """Points chronologiques d'un patient avec moyenne mobile sur `fenetre` cotations."""
+        patient_col, date_col, valeur_col, _ = TendanceService._source(indicateur)
+        fenetre = max(1, fenetre)
+        if est_postgres():
+            mobile = func.avg(valeur_col).over(order_by=date_col.asc(), rows=(-(fenetre - 1), 0))
+            lignes = TendanceService._requete([date_col, valeur_col, mobile], indicateur, [patient_id], grille_id, debut, fin)
+            return [
+                {'date': d.isoformat(), 'valeur': v, 'moyenne_mobile': round(float(m), 2) if m is not None else None}
+                for d, v, m in lignes.order_by(date_col.asc()).all()
+            ]
+        lignes = TendanceService._requete([date_col, valeur_col], indicateur, [patient_id], grille_id, debut, fin)
+        lignes = lignes.order_by(date_col.asc()).all()
+        moyennes = TendanceService.moyenne_mobile([valeur for _, valeur in lignes], fenetre)
+        return [
+            {'date': date_seance.isoformat(), 'valeur': valeur, 'moyenne_mobile': moyenne}
+            for (date_seance, valeur), moyenne in zip(lignes, moyennes, strict=True)
+        ]
+
+    @staticmethod
+    def patients_utilisateur(user_id: int, patient_ids: list[int] | None = None) -> list[int]:
+        """Restreint une liste de patients à ceux de l'utilisateur (tous si None)."""
+        query = db.session.query(Patient.id).filter(Patient.user_id == user_id)
+        if patient_ids:
+            query = query.filter(Patient.id.in_(patient_ids))
+        return [pid for (pid,) in query.all()]
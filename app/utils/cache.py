@@ -0,0 +1,217 @@
+"""Cache serveur des résultats analytiques, invalidé à l'écriture.
+
+Backends interchangeables (config ANALYTICS_CACHE) :
+- 'memoire' : LRU en mémoire du processus (défaut) ;
+- 'sqlite'  : fichier SQLite partagé par les workers gunicorn d'une même machine
+  (ANALYTICS_CACHE_CHEMIN) ;
+- 'aucun'   : désactivé.
+
+Clés : espace (nom du calcul) + utilisateur + génération de l'utilisateur + paramètres.
+Un commit qui crée, modifie ou supprime un Patient, une Seance, une CotationSeance,
+un ObjectifTherapeutique ou une GrilleEvaluation de l'utilisateur (nom, statut actif)
+incrémente la génération des utilisateurs concernés : leurs anciennes entrées ne sont
+plus jamais lues et disparaissent par LRU / expiration.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.utils.metrics import compter_cache
+
+logger = logging.getLogger(__name__)
+
+_ABSENT = object()
+
+
+class BackendCache(Protocol):
+    def lire(self, cle: str) -> Any: ...
+    def ecrire(self, cle: str, valeur: Any, ttl: int) -> None: ...
+    def generation(self, user_id: int) -> int: ...
+    def incrementer(self, user_ids: set[int]) -> None: ...
+
+
+class CacheMemoire:
+    """LRU borné avec expiration, propre au processus."""
+
+    def __init__(self, taille_max: int = 512) -> None:
+        self.taille_max = taille_max
+        self._entrees: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._verrou = threading.Lock()
+
+    def lire(self, cle: str) -> Any:
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return _ABSENT
+            if entree[0] < time.monotonic():
+                del self._entrees[cle]
+                return _ABSENT
+            self._entrees.move_to_end(cle)
+            return entree[1]
+
+    def ecrire(self, cle: str, valeur: Any, ttl: int) -> None:
+        with self._verrou:
+            self._entrees[cle] = (time.monotonic() + ttl, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def incrementer(self, user_ids: set[int]) -> None:
+        with self._verrou:
+            for user_id in user_ids:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+class CacheSQLite:
+    """Cache partagé entre processus via un fichier SQLite (WAL, une connexion par thread)."""
+
+    def __init__(self, chemin: str) -> None:
+        self.chemin = chemin
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        with self._connexion() as connexion:
+            connexion.execute("CREATE TABLE IF NOT EXISTS entrees (cle TEXT PRIMARY KEY, expire REAL, valeur BLOB)")
+            connexion.execute("CREATE TABLE IF NOT EXISTS generations (user_id INTEGER PRIMARY KEY, generation INTEGER)")
+
+    def _connexion(self) -> sqlite3.Connection:
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None:
+            connexion = sqlite3.connect(self.chemin, timeout=2, isolation_level=None, check_same_thread=False)
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.connexion = connexion
+        return connexion
+
+    def lire(self, cle: str) -> Any:
+        ligne = self._connexion().execute(
+            "SELECT valeur FROM entrees WHERE cle = ? AND expire >= ?", (cle, time.time())
+        ).fetchone()
+        return _ABSENT if ligne is None else pickle.loads(ligne[0])  # valeurs écrites par l'application
+
+    def ecrire(self, cle: str, valeur: Any, ttl: int) -> None:
+        connexion = self._connexion()
+        maintenant = time.time()
+        connexion.execute(
+            "INSERT OR REPLACE INTO entrees (cle, expire, valeur) VALUES (?, ?, ?)",
+            (cle, maintenant + ttl, pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+        if int(maintenant) % 60 == 0:  # purge opportuniste des entrées expirées
+            connexion.execute("DELETE FROM entrees WHERE expire < ?", (maintenant,))
+
+    def generation(self, user_id: int) -> int:
+        ligne = self._connexion().execute("SELECT generation FROM generations WHERE user_id = ?", (user_id,)).fetchone()
+        return ligne[0] if ligne else 0
+
+    def incrementer(self, user_ids: set[int]) -> None:
+        self._connexion().executemany(
+            "INSERT INTO generations (user_id, generation) VALUES (?, 1) "
+            "ON CONFLICT (user_id) DO UPDATE SET generation = generation + 1",
+            [(user_id,) for user_id in user_ids],
+        )
+
+
+class CacheAnalytics:
+    """Point d'accès au backend configuré et mémoïsation des calculs par utilisateur."""
+
+    _backend: BackendCache | None = None
+    _ttl = 300
+
+    @staticmethod
+    def configurer(app: Any) -> None:
+        """Choisit le backend selon la configuration et branche l'invalidation au commit."""
+        type_ = app.config.get('ANALYTICS_CACHE', 'memoire')
+        CacheAnalytics._ttl = app.config.get('ANALYTICS_CACHE_TTL', 300)
+        if type_ == 'sqlite':
+            chemin = app.config.get('ANALYTICS_CACHE_CHEMIN') or os.path.join(app.instance_path, 'analytics_cache.sqlite')
+            CacheAnalytics._backend = CacheSQLite(chemin)
+        elif type_ == 'memoire':
+            CacheAnalytics._backend = CacheMemoire(app.config.get('ANALYTICS_CACHE_TAILLE', 512))
+        else:
+            CacheAnalytics._backend = None
+        if not event.contains(Session, 'after_flush', _apres_flush):
+            event.listen(Session, 'after_flush', _apres_flush)
+            event.listen(Session, 'after_commit', _apres_commit)
+            event.listen(Session, 'after_rollback', _apres_rollback)
+
+    @staticmethod
+    def memoiser(espace: str, user_id: int, parametres: tuple[Any, ...], calcul: Callable[[], Any],
+                 ttl: int | None = None) -> Any:
+        """Résultat en cache pour (espace, utilisateur, paramètres), sinon calcule et stocke."""
+        backend = CacheAnalytics._backend
+        if backend is None:
+            return calcul()
+        try:
+            cle = f"{espace}:{user_id}:{backend.generation(user_id)}:{parametres!r}"
+            valeur = backend.lire(cle)
+        except Exception:
+            logger.exception("Lecture du cache analytique impossible")
+            return calcul()
+        compter_cache('analytics', valeur is not _ABSENT)
+        if valeur is not _ABSENT:
+            return valeur
+        valeur = calcul()
+        try:
+            backend.ecrire(cle, valeur, ttl or CacheAnalytics._ttl)
+        except Exception:
+            logger.exception("Écriture du cache analytique impossible")
+        return valeur
+
+    @staticmethod
+    def invalider(user_ids: set[int]) -> None:
+        """Rend obsolètes toutes les entrées des utilisateurs donnés."""
+        if CacheAnalytics._backend is not None and user_ids:
+            try:
+                CacheAnalytics._backend.incrementer(user_ids)
+            except Exception:
+                logger.exception("Invalidation du cache analytique impossible")
+
+
+_CLE_SESSION = 'cache_analytics_users'
+
+
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    """Note les utilisateurs dont les données changent (résolus pendant la transaction)."""
+    from app.models import Patient, Seance
+    from app.models.cotation import CotationSeance, GrilleEvaluation, ObjectifTherapeutique
+
+    user_ids: set[int] = set()
+    patient_ids: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Patient, GrilleEvaluation)):
+            if obj.user_id is not None:
+                user_ids.add(obj.user_id)
+        elif isinstance(obj, (Seance, CotationSeance, ObjectifTherapeutique)) and obj.patient_id is not None:
+            patient_ids.add(obj.patient_id)
+    if patient_ids:
+        user_ids.update(
+            uid for uid in session.connection().execute(
+                select(Patient.user_id).where(Patient.id.in_(patient_ids))
+            ).scalars() if uid is not None
+        )
+    if user_ids:
+        session.info.setdefault(_CLE_SESSION, set()).update(user_ids)
+
+
+def _apres_commit(session: Session) -> None:
+    user_ids = session.info.pop(_CLE_SESSION, None)
+    if user_ids:
+        CacheAnalytics.invalider(user_ids)
+
+
+def _apres_rollback(session: Session) -> None:
+    session.info.pop(_CLE_SESSION, None)
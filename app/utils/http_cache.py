@@ -0,0 +1,58 @@
+"""Cache HTTP des lectures JSON : ETag dérivé des versions de lignes, réponses 304.
+
+Le décorateur `cache_conditionnel` évalue d'abord une fonction de version peu coûteuse
+(date_modification, numéro de version de grille, compteurs...) : si le client présente
+déjà l'ETag correspondant (If-None-Match), la vue n'est pas exécutée et la réponse est
+un 304 vide. Sinon la vue s'exécute normalement et sa réponse 200 reçoit l'ETag.
+
+L'ETag combine la version, le chemin complet (paramètres inclus) et l'utilisateur
+courant : deux utilisateurs ou deux jeux de filtres n'en partagent jamais.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from flask import Response, make_response, request
+from flask_login import current_user  # type: ignore
+
+
+def calculer_etag(version: Any) -> str:
+    """ETag faible-coût : empreinte de la version, du chemin et de l'utilisateur."""
+    utilisateur = getattr(current_user, 'id', None)
+    cle = f"{request.full_path}|{utilisateur}|{version!r}"
+    return hashlib.sha1(cle.encode('utf-8')).hexdigest()
+
+
+def _entetes(reponse: Response, etag: str, max_age: int) -> Response:
+    reponse.set_etag(etag)
+    reponse.headers['Cache-Control'] = f'private, max-age={max_age}' if max_age else 'private, no-cache'
+    reponse.headers['Vary'] = 'Cookie'
+    return reponse
+
+
+def cache_conditionnel(version: Callable[..., Any], max_age: int = 0) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Décorateur de vue : 304 si If-None-Match correspond à `version(**view_args)`.
+
+    Args:
+        version: Reçoit les arguments de la vue ; renvoie une valeur représentant l'état
+            des données (None : pas de cache pour cet appel, la vue décide, ex. 404)
+        max_age: Secondes de fraîcheur côté client (0 = revalidation à chaque appel)
+    """
+    def decorateur(vue: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(vue)
+        def enveloppe(*args: Any, **kwargs: Any) -> Any:
+            valeur = version(*args, **kwargs)
+            if valeur is None:
+                return vue(*args, **kwargs)
+            etag = calculer_etag(valeur)
+            if etag in request.if_none_match:
+                return _entetes(Response(status=304), etag, max_age)
+            reponse = make_response(vue(*args, **kwargs))
+            if reponse.status_code == 200:
+                _entetes(reponse, etag, max_age)
+            return reponse
+        return enveloppe
+    return decorateur
@@ -0,0 +1,163 @@
+"""Instrumentation par requête : nombre et durée des requêtes SQL, appels IA.
+
+Les écouteurs `before/after_cursor_execute` (posés sur toutes les Engine) alimentent
+la mesure de la requête HTTP en cours (flask.g) :
+- nombre d'instructions SQL, temps base cumulé, instructions les plus lentes ;
+- temps des appels IA (Whisper, Mistral) via `mesurer_appel_ia`, aussi exportés
+  dans les métriques (app.utils.metrics) ;
+- alerte N+1 : une même instruction répétée au moins INSTRUMENTATION_SEUIL_N_PLUS_1 fois.
+
+En fin de requête : une ligne de log structurée (JSON, logger `synchronie.requetes`)
+et l'en-tête `Server-Timing` (db, ia, app) lisible dans les outils du navigateur.
+Hors requête HTTP (CLI, tâches) les écouteurs ne font rien.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from flask import Flask, Response, g, has_request_context, request
+from flask.logging import default_handler
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils import metrics
+
+logger = logging.getLogger('synchronie.requetes')
+
+_CLE_DEBUTS = 'instrumentation_debuts'
+
+
+@dataclass
+class MesureRequete:
+    """Compteurs d'une requête HTTP."""
+
+    debut: float
+    nb_requetes: int = 0
+    duree_db: float = 0.0
+    lentes: list[tuple[float, str]] = field(default_factory=list)
+    instructions: Counter[str] = field(default_factory=Counter)
+    appels_ia: list[tuple[str, float]] = field(default_factory=list)
+
+    def ajouter_sql(self, instruction: str, duree: float, nb_lentes: int) -> None:
+        self.nb_requetes += 1
+        self.duree_db += duree
+        self.instructions[instruction] += 1
+        if len(self.lentes) < nb_lentes or duree > self.lentes[-1][0]:
+            self.lentes.append((duree, instruction))
+            self.lentes.sort(key=lambda item: -item[0])
+            del self.lentes[nb_lentes:]
+
+    @property
+    def duree_ia(self) -> float:
+        return sum(duree for _, duree in self.appels_ia)
+
+
+def mesure_courante() -> MesureRequete | None:
+    """Mesure de la requête HTTP en cours, ou None (hors requête, instrumentation inactive)."""
+    if not has_request_context():
+        return None
+    return g.get('_instrumentation')
+
+
+@contextmanager
+def mesurer_appel_ia(fournisseur: str) -> Iterator[None]:
+    """Chronomètre un appel à un fournisseur IA et l'impute à la requête courante."""
+    debut = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.incrementer('synchronie_appels_ia_erreurs_total', fournisseur=fournisseur)
+        raise
+    finally:
+        duree = time.perf_counter() - debut
+        metrics.observer('synchronie_appels_ia_duree_secondes', duree, fournisseur=fournisseur)
+        mesure = mesure_courante()
+        if mesure is not None:
+            mesure.appels_ia.append((fournisseur, duree))
+
+
+def _avant_execution(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if mesure_courante() is not None:
+        conn.info.setdefault(_CLE_DEBUTS, []).append(time.perf_counter())
+
+
+def _apres_execution(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    debuts = conn.info.get(_CLE_DEBUTS)
+    mesure = mesure_courante()
+    if not debuts or mesure is None:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    mesure.ajouter_sql(statement, duree, g.get('_instrumentation_nb_lentes', 3))
+
+
+def _ms(secondes: float) -> float:
+    return round(secondes * 1000, 1)
+
+
+def _resume(instruction: str, longueur: int = 200) -> str:
+    return ' '.join(instruction.split())[:longueur]
+
+
+class Instrumentation:
+    """Branchement de l'instrumentation sur l'application."""
+
+    @staticmethod
+    def installer(app: Flask) -> None:
+        """Écouteurs SQL globaux (idempotents) et hooks de requête de l'application."""
+        if not app.config.get('INSTRUMENTATION', True):
+            return
+        if not logger.handlers and not logging.getLogger().handlers:
+            # Comme app.logger : sortie sur le flux d'erreurs WSGI si rien n'est configuré
+            logger.addHandler(default_handler)
+            logger.setLevel(logging.INFO)
+        if not event.contains(Engine, 'before_cursor_execute', _avant_execution):
+            event.listen(Engine, 'before_cursor_execute', _avant_execution)
+            event.listen(Engine, 'after_cursor_execute', _apres_execution)
+        seuil_n_plus_1 = app.config.get('INSTRUMENTATION_SEUIL_N_PLUS_1', 10)
+        nb_lentes = app.config.get('INSTRUMENTATION_REQUETES_LENTES', 3)
+        server_timing = app.config.get('INSTRUMENTATION_SERVER_TIMING', True)
+
+        @app.before_request
+        def _debut_mesure() -> None:
+            if request.endpoint != 'static':
+                g._instrumentation = MesureRequete(time.perf_counter())
+                g._instrumentation_nb_lentes = nb_lentes
+
+        @app.after_request
+        def _fin_mesure(reponse: Response) -> Response:
+            mesure: MesureRequete | None = g.pop('_instrumentation', None)
+            if mesure is None:
+                return reponse
+            duree = time.perf_counter() - mesure.debut
+            if server_timing:
+                reponse.headers.add('Server-Timing', ', '.join((
+                    f'db;dur={_ms(mesure.duree_db)};desc="{mesure.nb_requetes} requetes SQL"',
+                    f'ia;dur={_ms(mesure.duree_ia)}',
+                    f'app;dur={_ms(duree)}',
+                )))
+            logger.info(json.dumps({
+                'methode': request.method,
+                'chemin': request.path,
+                'endpoint': request.endpoint,
+                'statut': reponse.status_code,
+                'duree_ms': _ms(duree),
+                'nb_requetes': mesure.nb_requetes,
+                'db_ms': _ms(mesure.duree_db),
+                'ia_ms': _ms(mesure.duree_ia),
+                'appels_ia': [{'fournisseur': f, 'ms': _ms(d)} for f, d in mesure.appels_ia],
+                'lentes': [{'ms': _ms(d), 'sql': _resume(s)} for d, s in mesure.lentes],
+            }, ensure_ascii=False))
+            repetees = [(s, n) for s, n in mesure.instructions.most_common(3) if n >= seuil_n_plus_1]
+            for instruction, nombre in repetees:
+                logger.warning(
+                    "N+1 probable sur %s : instruction exécutée %d fois : %s",
+                    request.endpoint, nombre, _resume(instruction)
+                )
+            return reponse
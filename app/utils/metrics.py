@@ -0,0 +1,244 @@
+"""Métriques au format texte Prometheus (endpoint /metrics).
+
+Registre en mémoire, sans dépendance : compteurs et histogrammes étiquetés, jauges
+calculées à la collecte. Avec plusieurs workers gunicorn, chaque processus écrit
+périodiquement un instantané JSON dans METRICS_DIR ; /metrics additionne les
+compteurs et histogrammes de tous les fichiers (y compris ceux des workers
+terminés, pour que les totaux restent croissants) et expose les jauges par pid
+(celles d'un instantané de plus d'une minute sont ignorées).
+Sans METRICS_DIR, seul le processus qui répond est exposé.
+
+Séries exposées :
+- synchronie_requetes_http_total : par blueprint, méthode et statut ;
+- synchronie_requetes_http_duree_secondes : par blueprint et méthode ;
+- synchronie_requetes_http_erreurs_total : réponses 5xx par blueprint ;
+- synchronie_requetes_sql_par_requete : instructions SQL par requête HTTP ;
+- synchronie_appels_ia_duree_secondes / _erreurs_total : par fournisseur ;
+- synchronie_cache_total : lectures de cache par cache et résultat (hit / miss) ;
+- synchronie_pool_connexions : état du pool SQLAlchemy (jauge, par pid).
+"""
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from flask import Flask, Response, g, request
+
+logger = logging.getLogger(__name__)
+
+Etiquettes = tuple[tuple[str, str], ...]
+
+BORNES_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BORNES_IA = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+BORNES_SQL = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Registre:
+    """Compteurs, histogrammes et jauges d'un processus."""
+
+    def __init__(self) -> None:
+        self._verrou = threading.Lock()
+        self._definitions: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._compteurs: dict[tuple[str, Etiquettes], float] = {}
+        self._histogrammes: dict[tuple[str, Etiquettes], list[float]] = {}
+        self._jauges: dict[str, Callable[[], Iterable[tuple[dict[str, str], float]]]] = {}
+
+    def compteur(self, nom: str, aide: str) -> None:
+        self._definitions[nom] = ('counter', aide, ())
+
+    def histogramme(self, nom: str, aide: str, bornes: tuple[float, ...]) -> None:
+        self._definitions[nom] = ('histogram', aide, bornes)
+
+    def jauge(self, nom: str, aide: str, collecte: Callable[[], Iterable[tuple[dict[str, str], float]]]) -> None:
+        self._definitions[nom] = ('gauge', aide, ())
+        self._jauges[nom] = collecte
+
+    def incrementer(self, nom: str, valeur: float = 1, **etiquettes: str) -> None:
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        with self._verrou:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + valeur
+
+    def observer(self, nom: str, valeur: float, **etiquettes: str) -> None:
+        bornes = self._definitions[nom][2]
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        with self._verrou:
+            # [compte par borne..., +Inf, somme] (non cumulés ; cumul à l'exposition)
+            serie = self._histogrammes.setdefault(cle, [0.0] * (len(bornes) + 2))
+            index = next((i for i, borne in enumerate(bornes) if valeur <= borne), len(bornes))
+            serie[index] += 1
+            serie[-1] += valeur
+
+    def instantane(self) -> dict[str, Any]:
+        """État sérialisable (JSON) du processus, jauges évaluées maintenant."""
+        jauges = []
+        for nom, collecte in self._jauges.items():
+            try:
+                for etiquettes, valeur in collecte():
+                    jauges.append([nom, sorted({**etiquettes, 'pid': str(os.getpid())}.items()), valeur])
+            except Exception:
+                logger.debug("Jauge %s indisponible", nom, exc_info=True)
+        with self._verrou:
+            return {
+                'compteurs': [[nom, list(etiq), v] for (nom, etiq), v in self._compteurs.items()],
+                'histogrammes': [[nom, list(etiq), list(v)] for (nom, etiq), v in self._histogrammes.items()],
+                'jauges': jauges,
+            }
+
+    def exposer(self, instantanes: list[dict[str, Any]]) -> str:
+        """Texte Prometheus agrégeant plusieurs instantanés (un par processus)."""
+        valeurs: dict[str, dict[Etiquettes, Any]] = {nom: {} for nom in self._definitions}
+        for instantane in instantanes:
+            for nom, etiq, v in instantane.get('compteurs', []) + instantane.get('jauges', []):
+                if nom in valeurs:
+                    cle = tuple(tuple(paire) for paire in etiq)
+                    valeurs[nom][cle] = valeurs[nom].get(cle, 0) + v
+            for nom, etiq, serie in instantane.get('histogrammes', []):
+                if nom in valeurs:
+                    cle = tuple(tuple(paire) for paire in etiq)
+                    cumul = valeurs[nom].setdefault(cle, [0.0] * len(serie))
+                    for i, v in enumerate(serie):
+                        cumul[i] += v
+
+        lignes: list[str] = []
+        for nom, (type_, aide, bornes) in self._definitions.items():
+            lignes.append(f'# HELP {nom} {aide}')
+            lignes.append(f'# TYPE {nom} {type_}')
+            for etiq, valeur in sorted(valeurs[nom].items()):
+                if type_ != 'histogram':
+                    lignes.append(f'{nom}{_etiquettes(etiq)} {_nombre(valeur)}')
+                    continue
+                cumul = 0.0
+                for borne, compte in zip((*bornes, '+Inf'), valeur[:-1], strict=True):
+                    cumul += compte
+                    lignes.append(f'{nom}_bucket{_etiquettes((*etiq, ("le", _nombre(borne))))} {_nombre(cumul)}')
+                lignes.append(f'{nom}_sum{_etiquettes(etiq)} {_nombre(valeur[-1])}')
+                lignes.append(f'{nom}_count{_etiquettes(etiq)} {_nombre(cumul)}')
+        return '\n'.join(lignes) + '\n'
+
+
+def _echapper(valeur: Any) -> str:
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _etiquettes(etiq: Iterable[tuple[str, str]]) -> str:
+    paires = [f'{cle}="{_echapper(valeur)}"' for cle, valeur in etiq]
+    return '{' + ','.join(paires) + '}' if paires else ''
+
+
+def _nombre(valeur: Any) -> str:
+    if isinstance(valeur, str):
+        return valeur
+    return str(int(valeur)) if float(valeur).is_integer() else repr(float(valeur))
+
+
+registre = Registre()
+registre.compteur('synchronie_requetes_http_total', 'Requêtes HTTP traitées')
+registre.histogramme('synchronie_requetes_http_duree_secondes', 'Durée des requêtes HTTP', BORNES_HTTP)
+registre.compteur('synchronie_requetes_http_erreurs_total', 'Réponses HTTP 5xx')
+registre.histogramme('synchronie_requetes_sql_par_requete', 'Instructions SQL par requête HTTP', BORNES_SQL)
+registre.histogramme('synchronie_appels_ia_duree_secondes', 'Durée des appels aux fournisseurs IA', BORNES_IA)
+registre.compteur('synchronie_appels_ia_erreurs_total', 'Appels IA en erreur')
+registre.compteur('synchronie_cache_total', 'Lectures de cache (resultat=hit|miss)')
+
+
+def incrementer(nom: str, valeur: float = 1, **etiquettes: str) -> None:
+    registre.incrementer(nom, valeur, **etiquettes)
+
+
+def observer(nom: str, valeur: float, **etiquettes: str) -> None:
+    registre.observer(nom, valeur, **etiquettes)
+
+
+def compter_cache(cache: str, trouve: bool) -> None:
+    registre.incrementer('synchronie_cache_total', cache=cache, resultat='hit' if trouve else 'miss')
+
+
+def _pool() -> Iterable[tuple[dict[str, str], float]]:
+    from app.utils.sql import statistiques_pool
+    stats = statistiques_pool()
+    for etat in ('taille', 'utilisees', 'disponibles', 'debordement'):
+        if etat in stats:
+            yield {'etat': etat}, stats[etat]
+
+
+registre.jauge('synchronie_pool_connexions', 'Connexions du pool SQLAlchemy', _pool)
+
+
+class Metriques:
+    """Collecte par requête, instantanés multi-processus et exposition."""
+
+    _dossier: str | None = None
+    _intervalle = 5.0
+    _dernier_ecrit = 0.0
+
+    @staticmethod
+    def installer(app: Flask) -> None:
+        """Hooks de requête de l'application ; dossier partagé si METRICS_DIR est défini."""
+        Metriques._dossier = app.config.get('METRICS_DIR') or None
+        Metriques._intervalle = float(app.config.get('METRICS_INTERVALLE', 5))
+        if Metriques._dossier:
+            os.makedirs(Metriques._dossier, exist_ok=True)
+
+        @app.before_request
+        def _debut_metriques() -> None:
+            g._metriques_debut = time.perf_counter()
+
+        @app.after_request
+        def _fin_metriques(reponse: Response) -> Response:
+            debut = g.pop('_metriques_debut', None)
+            if debut is None:
+                return reponse
+            blueprint = request.blueprint or ('app' if request.endpoint else 'aucun')
+            observer('synchronie_requetes_http_duree_secondes', time.perf_counter() - debut,
+                     blueprint=blueprint, methode=request.method)
+            incrementer('synchronie_requetes_http_total', blueprint=blueprint, methode=request.method,
+                        statut=str(reponse.status_code))
+            if reponse.status_code >= 500:
+                incrementer('synchronie_requetes_http_erreurs_total', blueprint=blueprint)
+            from app.utils.instrumentation import mesure_courante
+            mesure = mesure_courante()
+            if mesure is not None:
+                observer('synchronie_requetes_sql_par_requete', mesure.nb_requetes, blueprint=blueprint)
+            Metriques.ecrire_instantane()
+            return reponse
+
+    @staticmethod
+    def ecrire_instantane(force: bool = False) -> None:
+        """Écrit l'instantané du processus dans METRICS_DIR (au plus toutes les METRICS_INTERVALLE s)."""
+        dossier = Metriques._dossier
+        maintenant = time.monotonic()
+        if not dossier or (not force and maintenant - Metriques._dernier_ecrit < Metriques._intervalle):
+            return
+        Metriques._dernier_ecrit = maintenant
+        chemin = os.path.join(dossier, f'metriques_{os.getpid()}.json')
+        try:
+            with open(chemin + '.tmp', 'w', encoding='utf-8') as fichier:
+                json.dump(registre.instantane(), fichier)
+            os.replace(chemin + '.tmp', chemin)
+        except OSError:
+            logger.warning("Instantané de métriques non écrit dans %s", dossier, exc_info=True)
+
+    @staticmethod
+    def exposer() -> str:
+        """Texte Prometheus : tous les processus si METRICS_DIR, sinon ce processus."""
+        if not Metriques._dossier:
+            return registre.exposer([registre.instantane()])
+        Metriques.ecrire_instantane(force=True)
+        instantanes = []
+        peremption = time.time() - max(60.0, 3 * Metriques._intervalle)
+        for chemin in glob.glob(os.path.join(Metriques._dossier, 'metriques_*.json')):
+            try:
+                with open(chemin, encoding='utf-8') as fichier:
+                    instantane = json.load(fichier)
+                if os.path.getmtime(chemin) < peremption:
+                    instantane.pop('jauges', None)  # worker inactif ou terminé : jauges périmées
+                instantanes.append(instantane)
+            except (OSError, ValueError):
+                continue
+        return registre.exposer(instantanes)
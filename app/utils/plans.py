@@ -0,0 +1,98 @@
+"""Vérification des plans d'exécution des requêtes critiques (EXPLAIN).
+
+Chaque table d'une requête listée doit être atteinte par une recherche dans un index,
+pas par un parcours complet (même d'un index) :
+- SQLite : une étape « SEARCH <table> » par table, aucune étape « SCAN » ;
+- PostgreSQL (plan demandé avec `enable_seqscan = off`) : chaque nœud de parcours
+  de la table porte une condition d'index (« Index Cond », ou « Recheck Cond » d'un
+  Bitmap Heap Scan). Un Index Scan sans condition n'est qu'un parcours complet ordonné.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import Select, select, text, true
+from sqlalchemy.sql.util import find_tables
+
+from app.models import Patient, Seance, db
+from app.models.cotation import CotationScore, CotationSeance, ObjectifTherapeutique, PatientGrille
+
+# Valeurs arbitraires : seul le plan compte, pas le résultat
+_DATE = '2025-01-01 00:00:00'
+
+REQUETES_CRITIQUES: list[tuple[str, Callable[[], Select[Any]]]] = [
+    ('seances_patient_periode', lambda: select(Seance.id).where(
+        Seance.patient_id == 1, Seance.date_seance >= _DATE, Seance.date_seance < '2025-02-01 00:00:00')),
+    ('patients_actifs_utilisateur', lambda: select(Patient.id).where(Patient.user_id == 1, Patient.actif == true())),
+    ('cotation_seance_grille', lambda: select(CotationSeance.id).where(
+        CotationSeance.seance_id == 1, CotationSeance.grille_id == 1)),
+    ('cotations_patient_grille', lambda: select(CotationSeance.id).where(
+        CotationSeance.patient_id == 1, CotationSeance.grille_id == 1)),
+    ('cotations_recentes', lambda: select(CotationSeance.id).where(CotationSeance.date_creation >= _DATE)),
+    ('grilles_patient', lambda: select(PatientGrille.grille_id).where(PatientGrille.patient_id == 1)),
+    ('objectifs_patient_grille', lambda: select(ObjectifTherapeutique.id).where(
+        ObjectifTherapeutique.patient_id == 1, ObjectifTherapeutique.grille_id == 1)),
+    ('scores_indicateur_patient', lambda: select(CotationScore.valeur).where(
+        CotationScore.patient_id == 1, CotationScore.indicateur == 'D_I', CotationScore.date_seance >= _DATE)),
+    ('seances_utilisateur_periode', lambda: select(Seance.id).join(Patient, Seance.patient_id == Patient.id).where(
+        Patient.user_id == 1, Seance.date_seance >= _DATE)),
+]
+
+
+def _noeuds(plan: dict[str, Any]):
+    yield plan
+    for enfant in plan.get('Plans', []):
+        yield from _noeuds(enfant)
+
+
+def _sans_recherche_postgres(plan: dict[str, Any], tables: set[str]) -> list[str]:
+    """Tables parcourues sans condition d'index (ou absentes du plan)."""
+    fautives = set()
+    vues = set()
+    for noeud in _noeuds(plan):
+        relation = noeud.get('Relation Name')
+        if relation not in tables:
+            continue
+        vues.add(relation)
+        if 'Index Cond' not in noeud and 'Recheck Cond' not in noeud:
+            fautives.add(relation)
+    return sorted(fautives | (tables - vues))
+
+
+def _sans_recherche_sqlite(etapes: list[str], tables: set[str]) -> list[str]:
+    """Étapes SCAN et tables sans étape SEARCH."""
+    cherchees = {etape.split()[1] for etape in etapes if etape.startswith('SEARCH ')}
+    return [etape for etape in etapes if etape.startswith('SCAN')] + sorted(tables - cherchees)
+
+
+def verifier_plans() -> list[dict[str, Any]]:
+    """EXPLAIN de chaque requête critique.
+
+    Returns:
+        Une entrée par requête : nom, ok, parcours sans recherche d'index détectés, plan brut
+    """
+    connection = db.session.connection()
+    postgres = connection.dialect.name == 'postgresql'
+    resultats: list[dict[str, Any]] = []
+    try:
+        if postgres:
+            connection.execute(text('SET LOCAL enable_seqscan = off'))
+        for nom, construire in REQUETES_CRITIQUES:
+            requete = construire()
+            tables = {table.name for table in find_tables(requete, include_joins=False)}
+            sql = str(requete.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+            if postgres:
+                brut = connection.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+                plan = (json.loads(brut) if isinstance(brut, str) else brut)[0]['Plan']
+                balayages = _sans_recherche_postgres(plan, tables)
+                detail = plan
+            else:
+                etapes = [ligne[-1] for ligne in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+                balayages = _sans_recherche_sqlite(etapes, tables)
+                detail = etapes
+            resultats.append({'requete': nom, 'ok': not balayages, 'balayages': balayages, 'plan': detail})
+    finally:
+        db.session.rollback()
+    return resultats
@@ -0,0 +1,188 @@
+"""Profilage à la demande d'une requête HTTP (cProfile), réservé à l'administrateur.
+
+Activation par requête : paramètre `?_profil=1` ou en-tête `X-Synchronie-Profil: 1`,
+pris en compte seulement pour l'utilisateur #1. Sans ce drapeau, le coût se limite à
+un test sur la requête (aucun profileur, aucune lecture de session) ; PROFILAGE=0
+ne pose même pas les hooks.
+
+Chaque profil est écrit dans PROFILAGE_DIR (défaut : instance/profils) :
+- `<id>.prof` : statistiques pstats (`python -m pstats`, snakeviz...) ;
+- `<id>.json` : métadonnées (chemin, statut, durée, SQL, fonctions les plus coûteuses).
+Seuls les PROFILAGE_CONSERVES plus récents sont gardés. L'identifiant est renvoyé
+dans l'en-tête de réponse `X-Synchronie-Profil` ; liste sur /admin/profils.
+"""
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import glob
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import secrets
+import time
+from datetime import datetime
+from typing import Any
+
+from flask import Flask, Response, g, request
+
+logger = logging.getLogger(__name__)
+
+EN_TETE = 'X-Synchronie-Profil'
+PARAMETRE = '_profil'
+_IDENTIFIANT = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]{6}-[0-9a-f]{4}$')
+
+
+def est_admin(utilisateur: Any) -> bool:
+    """Même règle que l'administration des grilles : utilisateur #1."""
+    return bool(getattr(utilisateur, 'is_authenticated', False)) and getattr(utilisateur, 'id', None) == 1
+
+
+def _fonction(cle: tuple[str, int, str]) -> str:
+    fichier, ligne, nom = cle
+    if fichier == '~':
+        return nom  # fonction native : '<built-in method ...>'
+    return f'{os.path.basename(fichier)}:{ligne}({nom})'
+
+
+class Profilage:
+    """Hooks de profilage, stockage et lecture des profils."""
+
+    _dossier: str | None = None
+    _conserves = 50
+
+    @staticmethod
+    def installer(app: Flask) -> None:
+        """Hooks de requête (si PROFILAGE) ; à installer après l'instrumentation pour en lire la mesure."""
+        if not app.config.get('PROFILAGE', True):
+            return
+        Profilage._dossier = app.config.get('PROFILAGE_DIR') or os.path.join(app.instance_path, 'profils')
+        Profilage._conserves = int(app.config.get('PROFILAGE_CONSERVES', 50))
+
+        @app.before_request
+        def _debut_profil() -> None:
+            if PARAMETRE not in request.args and EN_TETE not in request.headers:
+                return
+            from flask_login import current_user  # type: ignore
+            if request.endpoint == 'static' or not est_admin(current_user):
+                return
+            profileur = cProfile.Profile()
+            try:
+                profileur.enable()
+            except ValueError:  # un autre profileur est déjà actif sur ce thread
+                logger.warning("Profilage ignoré pour %s : profileur déjà actif", request.path)
+                return
+            g._profil = (profileur, time.perf_counter())
+
+        @app.after_request
+        def _fin_profil(reponse: Response) -> Response:
+            en_cours = g.pop('_profil', None)
+            if en_cours is None:
+                return reponse
+            profileur, debut = en_cours
+            profileur.disable()
+            try:
+                identifiant = Profilage.enregistrer(profileur, time.perf_counter() - debut, reponse.status_code)
+            except OSError:
+                logger.warning("Profil non écrit dans %s", Profilage._dossier, exc_info=True)
+            else:
+                reponse.headers[EN_TETE] = identifiant
+            return reponse
+
+        @app.teardown_request
+        def _arret_profil(_exc: BaseException | None) -> None:
+            # Exception non gérée : after_request n'a pas tourné, ne pas laisser le profileur actif
+            en_cours = g.pop('_profil', None)
+            if en_cours is not None:
+                en_cours[0].disable()
+
+    @staticmethod
+    def enregistrer(profileur: cProfile.Profile, duree: float, statut: int) -> str:
+        """Écrit pstats + métadonnées de la requête courante ; renvoie l'identifiant du profil."""
+        from flask_login import current_user  # type: ignore
+
+        from app.utils.instrumentation import mesure_courante
+
+        dossier = Profilage._dossier or 'profils'
+        os.makedirs(dossier, exist_ok=True)
+        maintenant = datetime.now()
+        # Horodatage en tête (tri chronologique des fichiers), suffixe aléatoire entre workers
+        identifiant = f'{maintenant:%Y%m%d-%H%M%S-%f}-{secrets.token_hex(2)}'
+        chemin = os.path.join(dossier, identifiant)
+        profileur.dump_stats(chemin + '.prof')
+
+        statistiques = pstats.Stats(profileur)
+        couteuses = sorted(statistiques.stats.items(), key=lambda item: -item[1][3])[:15]  # type: ignore[attr-defined]
+        mesure = mesure_courante()
+        meta = {
+            'id': identifiant,
+            'date': maintenant.isoformat(timespec='seconds'),
+            'methode': request.method,
+            'chemin': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'statut': statut,
+            'duree_ms': round(duree * 1000, 1),
+            'user_id': getattr(current_user, 'id', None),
+            'pid': os.getpid(),
+            'nb_requetes_sql': mesure.nb_requetes if mesure is not None else None,
+            'db_ms': round(mesure.duree_db * 1000, 1) if mesure is not None else None,
+            'nb_appels': statistiques.total_calls,  # type: ignore[attr-defined]
+            'fonctions': [
+                {'fonction': _fonction(cle), 'appels': nc, 'propre_ms': round(tt * 1000, 2), 'cumul_ms': round(ct * 1000, 2)}
+                for cle, (_cc, nc, tt, ct, _appelants) in couteuses
+            ],
+        }
+        with open(chemin + '.json', 'w', encoding='utf-8') as fichier:
+            json.dump(meta, fichier, ensure_ascii=False)
+        Profilage._purger(dossier)
+        return identifiant
+
+    @staticmethod
+    def _purger(dossier: str) -> None:
+        metas = sorted(glob.glob(os.path.join(dossier, '*.json')), reverse=True)
+        for chemin in metas[Profilage._conserves:]:
+            for fichier in (chemin, chemin[:-len('.json')] + '.prof'):
+                with contextlib.suppress(OSError):
+                    os.remove(fichier)
+
+    @staticmethod
+    def lister(limite: int = 50) -> list[dict[str, Any]]:
+        """Métadonnées des profils les plus récents (le processus peut ne pas être l'auteur)."""
+        if not Profilage._dossier:
+            return []
+        profils = []
+        for chemin in sorted(glob.glob(os.path.join(Profilage._dossier, '*.json')), reverse=True)[:limite]:
+            try:
+                with open(chemin, encoding='utf-8') as fichier:
+                    profils.append(json.load(fichier))
+            except (OSError, ValueError):
+                continue
+        return profils
+
+    @staticmethod
+    def chemin_stats(identifiant: str) -> str | None:
+        """Chemin du fichier pstats, None si l'identifiant est invalide ou inconnu."""
+        if not Profilage._dossier or not _IDENTIFIANT.match(identifiant):
+            return None
+        chemin = os.path.join(Profilage._dossier, identifiant + '.prof')
+        return chemin if os.path.exists(chemin) else None
+
+    @staticmethod
+    def detail(identifiant: str, tri: str = 'cumulative', nombre: int = 60) -> dict[str, Any] | None:
+        """Métadonnées et rapport pstats texte d'un profil."""
+        chemin = Profilage.chemin_stats(identifiant)
+        if chemin is None:
+            return None
+        try:
+            with open(chemin[:-len('.prof')] + '.json', encoding='utf-8') as fichier:
+                meta = json.load(fichier)
+        except (OSError, ValueError):
+            meta = {'id': identifiant}
+        sortie = io.StringIO()
+        statistiques = pstats.Stats(chemin, stream=sortie)
+        statistiques.strip_dirs().sort_stats(tri if tri in ('cumulative', 'tottime', 'ncalls') else 'cumulative')
+        statistiques.print_stats(nombre)
+        return {**meta, 'rapport': sortie.getvalue()}
@@ -0,0 +1,55 @@
+"""Aides SQL partagées entre services (détection du dialecte, troncature de dates, upsert)."""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Table, func
+from sqlalchemy.engine import Connection
+
+from app.models import db
+
+
+def dialecte() -> str:
+    """Nom du dialecte de la connexion courante ('postgresql', 'sqlite', ...)."""
+    return db.session.get_bind().dialect.name
+
+
+def est_postgres() -> bool:
+    return dialecte() == 'postgresql'
+
+
+def tronquer_mois(colonne: Any) -> Any:
+    """Expression SQL du mois d'une date, au format texte 'YYYY-MM'."""
+    if est_postgres():
+        return func.to_char(func.date_trunc('month', colonne), 'YYYY-MM')
+    return func.strftime('%Y-%m', colonne)
+
+
+def upsert(connection: Connection, table: Table, lignes: list[dict[str, Any]], cles: list[str]) -> None:
+    """INSERT ... ON CONFLICT (cles) DO UPDATE en une instruction (PostgreSQL et SQLite)."""
+    if not lignes:
+        return
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    instruction = insert(table)
+    colonnes = [nom for nom in lignes[0] if nom not in cles]
+    instruction = instruction.on_conflict_do_update(
+        index_elements=cles, set_={nom: instruction.excluded[nom] for nom in colonnes}
+    )
+    connection.execute(instruction, lignes)
+
+
+def statistiques_pool() -> dict[str, Any]:
+    """État du pool de connexions du moteur (pour les endpoints de santé)."""
+    pool = db.engine.pool
+    stats: dict[str, Any] = {'classe': type(pool).__name__}
+    if hasattr(pool, 'checkedout'):
+        stats.update({
+            'taille': pool.size(),
+            'utilisees': pool.checkedout(),
+            'disponibles': pool.checkedin(),
+            'debordement': pool.overflow(),
+        })
+    return stats
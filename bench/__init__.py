@@ -0,0 +1 @@
+"""Contrôles de performance hors application (budgets de requêtes, mesures)."""
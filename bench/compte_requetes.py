@@ -0,0 +1,104 @@
+"""Régression du nombre de requêtes SQL par appel des agrégats analytiques.
+
+Crée une application 'testing' (SQLite en mémoire), insère un petit jeu de données
+puis compte les instructions émises par chaque appel (hors SAVEPOINT / RELEASE).
+Échoue (code 1) si un appel dépasse son budget.
+
+Usage : python -m bench.compte_requetes
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import event
+
+# appel -> nombre maximal d'instructions SQL
+BUDGETS: dict[str, int] = {
+    'statistiques_globales': 1,
+    'taux_couverture_cotation': 1,
+    'vue_ensemble': 1,
+    'version_donnees': 1,
+}
+
+
+@contextmanager
+def compter(engine: Any):
+    """Liste des instructions exécutées dans le bloc (hors gestion des savepoints)."""
+    instructions: list[str] = []
+
+    def avant(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if not statement.lstrip().upper().startswith(('SAVEPOINT', 'RELEASE', 'ROLLBACK TO')):
+            instructions.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', avant)
+    try:
+        yield instructions
+    finally:
+        event.remove(engine, 'before_cursor_execute', avant)
+
+
+def peupler(db: Any) -> int:
+    """Un thérapeute, une grille, trois patients, douze séances cotées sur deux mois."""
+    from app.models import Patient, Seance, User
+    from app.models.cotation import CotationSeance, GrilleEvaluation
+
+    user = User(email='bench@synchronie.local', nom='Bench')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.flush()
+    grille = GrilleEvaluation(nom='Bench', type_grille='personnalisee', user_id=user.id, active=True,
+                              domaines_config=[{'nom': 'D', 'indicateurs': [{'nom': 'I', 'min': 0, 'max': 5}]}])
+    db.session.add(grille)
+    db.session.flush()
+    maintenant = datetime.now()
+    for p in range(3):
+        patient = Patient(nom=f'Patient{p}', prenom='Bench', user_id=user.id)
+        db.session.add(patient)
+        db.session.flush()
+        for s in range(4):
+            seance = Seance(patient_id=patient.id, date_seance=maintenant - timedelta(days=15 * s + p))
+            db.session.add(seance)
+            db.session.flush()
+            db.session.add(CotationSeance(
+                seance_id=seance.id, grille_id=grille.id, patient_id=patient.id, therapeute_id=user.id,
+                scores_detailles={'D_I': float(s)}, score_global=float(s), score_max_possible=5.0,
+                pourcentage_reussite=20.0 * s,
+            ))
+    db.session.commit()
+    return user.id
+
+
+def main() -> int:
+    from app import create_app
+    from app.models import db
+    from app.services.analytics_service import AnalyticsService
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user_id = peupler(db)
+        appels: dict[str, Callable[[], Any]] = {
+            'statistiques_globales': lambda: AnalyticsService.statistiques_globales(user_id),
+            'taux_couverture_cotation': lambda: AnalyticsService.taux_couverture_cotation(user_id),
+            'vue_ensemble': lambda: AnalyticsService.vue_ensemble(user_id),
+            'version_donnees': lambda: AnalyticsService.version_donnees(user_id),
+        }
+        echecs = 0
+        for nom, appel in appels.items():
+            with compter(db.engine) as instructions:
+                appel()
+            ok = len(instructions) <= BUDGETS[nom]
+            echecs += not ok
+            print(f"{'OK ' if ok else 'KO '} {nom:28s} {len(instructions):3d} requête(s) (budget {BUDGETS[nom]})")
+            if not ok:
+                for instruction in instructions:
+                    print('     ' + ' '.join(instruction.split())[:160])
+    return 1 if echecs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Générateur de données synthétiques reproductibles pour les mesures de performance.
+
+N thérapeutes × M patients × K séances, cotées (taux configurable) avec les grilles
+standard de data/grilles_standard (synchronisées par ImportGrillesService). Les objets
+passent par l'ORM pour que les écouteurs (série des scores, cumuls mensuels) alimentent
+les tables dérivées comme en production.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+PRENOMS = ('Élise', 'Lucas', 'Chloé', 'Hugo', 'Inès', 'Noah', 'Léa', 'Jules', 'Manon', 'Adam', 'Zoé', 'Théo')
+NOMS = ('Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau',
+        'Simon', 'Laurent', 'Lefèvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux', 'Vincent', 'Fournier')
+PATHOLOGIES = ('TSA', 'Alzheimer', 'Polyhandicap', 'Dépression', 'Schizophrénie', 'AVC', 'Parkinson')
+MOTS = ('rythme', 'percussions', 'chant', 'improvisation', 'écoute', 'relaxation', 'guitare', 'voix', 'tambour',
+        'attention', 'regard', 'sourire', 'agitation', 'calme', 'imitation', 'tour de rôle', 'mélodie', 'piano',
+        'participation', 'initiative', 'émotion', 'fatigue', 'plaisir', 'échange', 'consignes', 'mouvement')
+MOT_DE_PASSE = 'bench'
+
+
+@dataclass
+class Volumes:
+    therapeutes: int = 3
+    patients: int = 30
+    seances: int = 12
+    taux_cotation: float = 0.7
+    graine: int = 42
+
+
+def _texte(alea: random.Random, nb_mots: int) -> str:
+    return ' '.join(alea.choice(MOTS) for _ in range(nb_mots)).capitalize() + '.'
+
+
+def _scores(alea: random.Random, grille: Any) -> dict[str, float]:
+    scores: dict[str, float] = {}
+    for domaine in grille.domaines_config or []:
+        for indicateur in domaine.get('indicateurs', []):
+            scores[f"{domaine['nom']}_{indicateur['nom']}"] = float(alea.randint(0, 5))
+    return scores
+
+
+def generer(db: Any, volumes: Volumes) -> dict[str, Any]:
+    """Peuple la base (schéma déjà créé) et renvoie les identifiants utiles aux scénarios."""
+    from app.models import Patient, Seance, User
+    from app.models.cotation import CotationSeance, GrilleEvaluation, PatientGrille
+    from app.services.import_grilles_service import ImportGrillesService
+
+    alea = random.Random(volumes.graine)
+    ImportGrillesService.synchroniser()
+    grilles = GrilleEvaluation.query.filter_by(type_grille='standard', active=True).order_by(GrilleEvaluation.id).all()
+    if not grilles:
+        raise RuntimeError("Aucune grille standard : data/grilles_standard introuvable ?")
+
+    maintenant = datetime.now()
+    users: list[int] = []
+    for t in range(volumes.therapeutes):
+        user = User(email=f'therapeute{t}@bench.local', nom=f'Thérapeute {t}')
+        user.set_password(MOT_DE_PASSE)
+        db.session.add(user)
+        db.session.flush()
+        users.append(user.id)
+        for _ in range(volumes.patients):
+            patient = Patient(nom=alea.choice(NOMS), prenom=alea.choice(PRENOMS), user_id=user.id,
+                              pathologie=alea.choice(PATHOLOGIES))
+            db.session.add(patient)
+            db.session.flush()
+            grilles_patient = alea.sample(grilles, k=min(2, len(grilles)))
+            for priorite, grille in enumerate(grilles_patient, start=1):
+                db.session.add(PatientGrille(patient_id=patient.id, grille_id=grille.id, priorite=priorite,
+                                             assignee_par=user.id))
+            for _ in range(volumes.seances):
+                seance = Seance(
+                    patient_id=patient.id,
+                    date_seance=maintenant - timedelta(days=alea.randint(0, 365), minutes=alea.randint(0, 600)),
+                    duree_minutes=alea.choice((30, 45, 60)),
+                    type_seance=alea.choice(('individuelle', 'groupe')),
+                    observations=_texte(alea, alea.randint(8, 40)),
+                    activites_realisees=_texte(alea, alea.randint(3, 10)),
+                )
+                db.session.add(seance)
+                if alea.random() < volumes.taux_cotation:
+                    db.session.flush()
+                    grille = grilles_patient[0]
+                    scores = _scores(alea, grille)
+                    total, maximum = sum(scores.values()), 5.0 * len(scores)
+                    db.session.add(CotationSeance(
+                        seance_id=seance.id, grille_id=grille.id, patient_id=patient.id, therapeute_id=user.id,
+                        scores_detailles=scores, score_global=total / len(scores) if scores else 0.0,
+                        score_max_possible=maximum, pourcentage_reussite=100 * total / maximum if maximum else 0.0,
+                        date_creation=seance.date_seance,
+                    ))
+        db.session.commit()
+
+    # Séance cotée du premier thérapeute (avec sa grille prioritaire) pour le scénario d'enregistrement
+    cible = db.session.query(CotationSeance).join(
+        PatientGrille, (PatientGrille.patient_id == CotationSeance.patient_id)
+        & (PatientGrille.grille_id == CotationSeance.grille_id) & (PatientGrille.priorite == 1)
+    ).filter(CotationSeance.therapeute_id == users[0]).order_by(CotationSeance.id).first()
+    return {
+        'user_id': users[0],
+        'email': 'therapeute0@bench.local',
+        'patient_id': cible.patient_id if cible else None,
+        'seance_cotee_id': cible.seance_id if cible else None,
+        'scores': sorted(cible.scores_detailles) if cible else [],
+    }
@@ -0,0 +1,224 @@
+"""Mesures des chemins critiques sur données synthétiques, comparées à une référence.
+
+Génère un jeu de données reproductible (bench.generateur), se connecte comme premier
+thérapeute puis chronomètre chaque scénario (tableau de bord, séances à coter, page des
+grilles, endpoints analytiques, enregistrement d'une cotation, recherches) : médiane,
+p95, moyenne et nombre d'instructions SQL par appel. Le cache analytique est désactivé
+pour mesurer le calcul réel.
+
+Résultats en JSON (--sortie). Avec --reference, chaque scénario est comparé à la
+référence : régression si la médiane dépasse la référence de plus de --tolerance
+(et de plus de 2 ms) ou si le nombre d'instructions SQL augmente ; code de sortie 1.
+
+Usage :
+    python -m bench.mesures                                   # SQLite temporaire
+    python -m bench.mesures --reference bench/reference_sqlite.json
+    python -m bench.mesures --db postgresql://localhost/synchronie_bench --reinitialiser
+    python -m bench.mesures --sortie bench/reference_sqlite.json   # nouvelle référence
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from bench.compte_requetes import compter
+from bench.generateur import MOT_DE_PASSE, Volumes, generer
+
+SEUIL_BRUIT_MS = 2.0
+
+
+def scenarios(client: Any, cibles: dict[str, Any]) -> dict[str, Callable[[], Any]]:
+    """Appels HTTP mesurés (client de test authentifié)."""
+    seance, patient = cibles['seance_cotee_id'], cibles['patient_id']
+    formulaire = {f'score_{i}': str(i % 6) for i in range(len(cibles['scores']) or 5)}
+    formulaire['observations'] = 'Mesure de performance'
+    return {
+        'dashboard': lambda: client.get('/dashboard'),
+        'seances_a_coter': lambda: client.get('/cotation/seances/a-coter'),
+        'grilles': lambda: client.get('/cotation/grilles'),
+        'analytics_overview': lambda: client.get('/cotation/analytics/overview'),
+        'analytics_scores_grilles': lambda: client.get('/cotation/analytics/scores-grilles'),
+        'analytics_patients_risque': lambda: client.get('/cotation/analytics/patients-risque'),
+        'analytics_rapport_mensuel': lambda: client.get(
+            f'/cotation/analytics/rapport-mensuel/{datetime.now().year}/{datetime.now().month}'
+        ),
+        'cotation_save': lambda: client.post(f'/seances/{seance}/cotation/save', data=formulaire),
+        'recherche_seances': lambda: client.get('/seances/recherche', query_string={'q': 'percussions calme'}),
+        'recherche_patients': lambda: client.get('/api/patients/search', query_string={'q': 'mar'}),
+        'patient_indicateurs': lambda: client.get(f'/cotation/analytics/patient/{patient}/indicateurs'),
+    }
+
+
+def mesurer(appel: Callable[[], Any], engine: Any, repetitions: int, echauffement: int) -> dict[str, Any]:
+    """Médiane, p95, moyenne, minimum et instructions SQL d'un scénario (sorties des vues masquées)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _mesurer(appel, engine, repetitions, echauffement)
+
+
+def _mesurer(appel: Callable[[], Any], engine: Any, repetitions: int, echauffement: int) -> dict[str, Any]:
+    statuts: set[int] = set()
+    for _ in range(echauffement):
+        statuts.add(appel().status_code)
+    durees: list[float] = []
+    nb_sql = 0
+    for _ in range(repetitions):
+        with compter(engine) as instructions:
+            debut = time.perf_counter()
+            reponse = appel()
+            durees.append((time.perf_counter() - debut) * 1000)
+        statuts.add(reponse.status_code)
+        nb_sql = max(nb_sql, len(instructions))
+    durees.sort()
+    return {
+        'mediane_ms': round(statistics.median(durees), 2),
+        'p95_ms': round(durees[min(len(durees) - 1, int(len(durees) * 0.95))], 2),
+        'moyenne_ms': round(statistics.fmean(durees), 2),
+        'min_ms': round(durees[0], 2),
+        'requetes_sql': nb_sql,
+        'statuts': sorted(statuts),
+    }
+
+
+def comparer(resultats: dict[str, Any], reference: dict[str, Any], tolerance: float) -> list[str]:
+    """Régressions de `resultats` par rapport à `reference` (même format)."""
+    regressions = []
+    for nom, mesure in resultats['scenarios'].items():
+        base = reference.get('scenarios', {}).get(nom)
+        if base is None:
+            continue
+        limite = base['mediane_ms'] * (1 + tolerance)
+        if mesure['mediane_ms'] > limite and mesure['mediane_ms'] - base['mediane_ms'] > SEUIL_BRUIT_MS:
+            regressions.append(
+                f"{nom}: médiane {mesure['mediane_ms']} ms > {base['mediane_ms']} ms (+{tolerance:.0%} toléré)"
+            )
+        if mesure['requetes_sql'] > base['requetes_sql']:
+            regressions.append(f"{nom}: {mesure['requetes_sql']} requêtes SQL au lieu de {base['requetes_sql']}")
+    return regressions
+
+
+def preparer_application(url: str, reinitialiser: bool) -> Any:
+    from config import TestingConfig, config, engine_options
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(url)
+        AUTO_CREATE_SCHEMA = False
+        WTF_CSRF_ENABLED = False
+        ANALYTICS_CACHE = 'aucun'
+        INSTRUMENTATION = False  # comptage SQL fait ici, sans le log par requête
+        METRICS_DIR = None
+
+    config['bench'] = BenchConfig
+    logging.getLogger('synchronie.requetes').setLevel(logging.WARNING)
+
+    from app import create_app
+    from app.models import db
+    from app.services.recherche_patients_service import RecherchePatientsService
+    from app.services.recherche_seances_service import RechercheSeancesService
+
+    app = create_app('bench')
+    with app.app_context():
+        if reinitialiser:
+            db.drop_all()
+        db.create_all()
+        with db.engine.begin() as connection:
+            RechercheSeancesService.installer_index(connection)
+            RecherchePatientsService.installer_index(connection)
+    return app
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help="URL SQLAlchemy (défaut : fichier SQLite temporaire)")
+    parser.add_argument('--reinitialiser', action='store_true',
+                        help="Supprime les tables existantes (obligatoire pour une base non temporaire)")
+    parser.add_argument('--therapeutes', type=int, default=Volumes.therapeutes)
+    parser.add_argument('--patients', type=int, default=Volumes.patients)
+    parser.add_argument('--seances', type=int, default=Volumes.seances)
+    parser.add_argument('--graine', type=int, default=Volumes.graine)
+    parser.add_argument('--repetitions', type=int, default=20)
+    parser.add_argument('--echauffement', type=int, default=3)
+    parser.add_argument('--scenario', action='append', help="Restreint aux scénarios nommés (répétable)")
+    parser.add_argument('--sortie', help="Fichier JSON des résultats")
+    parser.add_argument('--reference', help="Résultats de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Marge relative sur la médiane (0.25 = +25 %%)")
+    args = parser.parse_args()
+
+    dossier = None
+    url = args.db
+    if not url:
+        dossier = tempfile.mkdtemp(prefix='synchronie-bench-')
+        url = f"sqlite:///{os.path.join(dossier, 'bench.db')}"
+    elif not args.reinitialiser:
+        parser.error("--reinitialiser est requis avec --db : la base est vidée avant génération")
+
+    volumes = Volumes(args.therapeutes, args.patients, args.seances, graine=args.graine)
+    app = preparer_application(url, reinitialiser=bool(args.db))
+    from app.models import db
+
+    with app.app_context():
+        debut = time.perf_counter()
+        cibles = generer(db, volumes)
+        generation_s = time.perf_counter() - debut
+        dialecte = db.engine.dialect.name
+        engine = db.engine
+
+    client = app.test_client()
+    connexion = client.post('/login', data={'email': cibles['email'], 'password': MOT_DE_PASSE})
+    if connexion.status_code not in (200, 302):
+        print(f"Connexion impossible ({connexion.status_code})", file=sys.stderr)
+        return 2
+
+    resultats: dict[str, Any] = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'dialecte': dialecte,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'volumes': vars(volumes),
+            'repetitions': args.repetitions,
+            'generation_s': round(generation_s, 2),
+        },
+        'scenarios': {},
+    }
+    tous = scenarios(client, cibles)
+    for nom in args.scenario or tous:
+        if nom not in tous:
+            parser.error(f"Scénario inconnu : {nom} (disponibles : {', '.join(tous)})")
+        mesure = mesurer(tous[nom], engine, args.repetitions, args.echauffement)
+        resultats['scenarios'][nom] = mesure
+        print(f"{nom:28s} médiane {mesure['mediane_ms']:8.2f} ms  p95 {mesure['p95_ms']:8.2f} ms  "
+              f"{mesure['requetes_sql']:4d} SQL  statuts {mesure['statuts']}")
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+            fichier.write('\n')
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as fichier:
+            reference = json.load(fichier)
+        if reference.get('meta', {}).get('dialecte') != dialecte:
+            print(f"⚠️ Référence mesurée sur {reference.get('meta', {}).get('dialecte')}, exécution sur {dialecte}")
+        regressions = comparer(resultats, reference, args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            return 1
+        print("Aucune régression par rapport à la référence.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,65 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_int(nom: str, defaut: int) -> int:
+    valeur = os.environ.get(nom)
+    return int(valeur) if valeur not in (None, '') else defaut
+
+
+def _env_bool(nom: str, defaut: bool = False) -> bool:
+    valeur = os.environ.get(nom)
+    if valeur in (None, ''):
+        return defaut
+    return valeur.strip().lower() in ('1', 'true', 'yes', 'on', 'oui')
+
+
+def engine_options(uri: str, pool_size: int = 5, max_overflow: int = 5) -> dict:
+    """Options du moteur SQLAlchemy (SQLALCHEMY_ENGINE_OPTIONS) pour une URI donnée.
+
+    Variables d'environnement (prioritaires sur les valeurs par défaut) :
+        DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s),
+        DB_STATEMENT_TIMEOUT_MS, DB_APPLICATION_NAME, DB_PGBOUNCER.
+
+    Dimensionnement : workers gunicorn × (pool_size + max_overflow) doit rester
+    sous max_connections du serveur. Le proxy Render coupe les connexions inactives :
+    pre-ping + recyclage + keepalives TCP évitent les erreurs de connexion périmée.
+
+    Mode PgBouncer (DB_PGBOUNCER=1, pooling « transaction ») : pas de pool côté
+    application (NullPool), pas de paramètre de démarrage `options` (refusé par
+    PgBouncer) et pas d'instruction préparée côté serveur. psycopg2 n'en utilise
+    jamais ; avec psycopg 3 on désactive `prepare_threshold`. Le statement_timeout
+    se règle alors au niveau du rôle : ALTER ROLE ... SET statement_timeout = ...
+    """
+    if not uri.startswith('postgresql'):
+        return {}
+    connect_args: dict = {
+        'application_name': os.environ.get('DB_APPLICATION_NAME', 'synchronie'),
+        'connect_timeout': _env_int('DB_CONNECT_TIMEOUT', 10),
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10,
+        'keepalives_count': 5,
+    }
+    options: dict = {'pool_pre_ping': True, 'connect_args': connect_args}
+    if _env_bool('DB_PGBOUNCER'):
+        from sqlalchemy.pool import NullPool
+        options['poolclass'] = NullPool
+        if uri.startswith('postgresql+psycopg:'):
+            connect_args['prepare_threshold'] = None
+        return options
+    options.update({
+        'pool_size': _env_int('DB_POOL_SIZE', pool_size),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', max_overflow),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 280),
+    })
+    timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    if timeout_ms:
+        connect_args['options'] = f'-c statement_timeout={timeout_ms}'
+    return options
+
+
 class Config:
     """Configuration de base"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -18,6 +77,45 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'sqlite:///synchronie.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=2)
+
+    # Création du schéma au démarrage (sinon : `flask init-db` au déploiement)
+    AUTO_CREATE_SCHEMA = _env_bool('AUTO_CREATE_SCHEMA', False)
+
+    # Durée (s) de validité du principal de session avant revalidation en base
+    PRINCIPAL_TTL = _env_int('PRINCIPAL_TTL', 120)
+    # Délai (s) maximal avant qu'un worker voie une révocation (désactivation) faite ailleurs
+    PRINCIPAL_REVOCATIONS_INTERVALLE = _env_int('PRINCIPAL_REVOCATIONS_INTERVALLE', 10)
+
+    # Cache des résultats analytiques : 'memoire' (par processus), 'sqlite' (partagé
+    # entre workers, ANALYTICS_CACHE_CHEMIN) ou 'aucun'
+    ANALYTICS_CACHE = os.environ.get('ANALYTICS_CACHE', 'memoire')
+    ANALYTICS_CACHE_CHEMIN = os.environ.get('ANALYTICS_CACHE_CHEMIN')
+    ANALYTICS_CACHE_TTL = _env_int('ANALYTICS_CACHE_TTL', 300)
+
+    # Instrumentation par requête : log structuré, en-tête Server-Timing et alerte N+1
+    # (même instruction SQL répétée au moins INSTRUMENTATION_SEUIL_N_PLUS_1 fois)
+    INSTRUMENTATION = _env_bool('INSTRUMENTATION', True)
+    INSTRUMENTATION_SEUIL_N_PLUS_1 = _env_int('INSTRUMENTATION_SEUIL_N_PLUS_1', 10)
+    INSTRUMENTATION_REQUETES_LENTES = _env_int('INSTRUMENTATION_REQUETES_LENTES', 3)
+    INSTRUMENTATION_SERVER_TIMING = _env_bool('INSTRUMENTATION_SERVER_TIMING', True)
+
+    # Sonde de disponibilité (/api/health/ready) : délai maximal du SELECT 1
+    HEALTH_READY_TIMEOUT_MS = _env_int('HEALTH_READY_TIMEOUT_MS', 2000)
+
+    # Métriques /metrics : dossier d'instantanés partagé par les workers gunicorn
+    # (vide : processus courant seulement), jeton Bearer ; sans jeton, /metrics n'est
+    # servi que si METRICS_PUBLIC (vrai hors production)
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_PUBLIC = _env_bool('METRICS_PUBLIC', True)
+    METRICS_INTERVALLE = _env_int('METRICS_INTERVALLE', 5)
+
+    # Profilage à la demande (?_profil=1 ou en-tête X-Synchronie-Profil, utilisateur #1) :
+    # profils pstats dans PROFILAGE_DIR (défaut instance/profils), PROFILAGE_CONSERVES derniers gardés
+    PROFILAGE = _env_bool('PROFILAGE', True)
+    PROFILAGE_DIR = os.environ.get('PROFILAGE_DIR')
+    PROFILAGE_CONSERVES = _env_int('PROFILAGE_CONSERVES', 50)
     
     # OpenAI
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
@@ -31,17 +129,22 @@ class DevelopmentConfig(Config):
     """Configuration pour le développement"""
     DEBUG = True
     TESTING = False
+    AUTO_CREATE_SCHEMA = _env_bool('AUTO_CREATE_SCHEMA', True)
 
 class ProductionConfig(Config):
     """Configuration pour la production"""
     DEBUG = False
     TESTING = False
+    METRICS_PUBLIC = _env_bool('METRICS_PUBLIC', False)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=10)
 
 class TestingConfig(Config):
     """Configuration pour les tests"""
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS: dict = {}
+    AUTO_CREATE_SCHEMA = True
 
 # Dictionnaire des configurations
 config = {
@@ -0,0 +1 @@
+"""Tests de charge hors ligne : parcours scriptés et faux fournisseur IA (Whisper, Mistral)."""
@@ -0,0 +1,253 @@
+"""Test de charge : parcours scriptés d'utilisateurs virtuels contre une instance lancée.
+
+Chaque utilisateur virtuel (un thread, un compte de loadtest.preparer) se connecte
+puis enchaîne en boucle le parcours d'une séance :
+tableau de bord → création de séance → envoi de l'audio (Whisper + synthèse Mistral)
+→ cotation → rapport d'évolution (Mistral), avec un temps de réflexion aléatoire
+entre les étapes. À la fin : débit, erreurs et centiles de latence par étape (JSON
+avec --sortie), pour dimensionner les workers gunicorn.
+
+Déroulé type (trois terminaux) :
+    python -m loadtest.faux_fournisseur --echelle 1.0
+    OPENAI_API_KEY=factice OPENAI_BASE_URL=http://127.0.0.1:8099/v1 \\
+    MISTRAL_API_KEY=factice MISTRAL_BASE_URL=http://127.0.0.1:8099 \\
+        gunicorn -w 2 --threads 4 -b 127.0.0.1:8000 run:app
+    python -m loadtest.charge --url http://127.0.0.1:8000 --utilisateurs 10 --duree 120
+(après `python -m loadtest.preparer` sur la même base)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import httpx
+
+ETAPES = ('connexion', 'tableau_de_bord', 'creation_seance', 'envoi_audio', 'cotation', 'rapport')
+
+
+class EchecEtape(Exception):
+    """Réponse inattendue : le parcours en cours est abandonné."""
+
+
+@dataclass
+class Statistiques:
+    """Durées et erreurs par étape, partagées entre les utilisateurs virtuels."""
+
+    durees: dict[str, list[float]] = field(default_factory=lambda: {etape: [] for etape in ETAPES})
+    erreurs: Counter[str] = field(default_factory=Counter)
+    statuts: dict[str, Counter[str]] = field(default_factory=lambda: {etape: Counter() for etape in ETAPES})
+    parcours: int = 0
+    verrou: threading.Lock = field(default_factory=threading.Lock)
+
+    def noter(self, etape: str, duree: float, statut: str, succes: bool) -> None:
+        with self.verrou:
+            self.durees[etape].append(duree)
+            self.statuts[etape][statut] += 1
+            if not succes:
+                self.erreurs[etape] += 1
+
+    def resume(self, duree_totale: float) -> dict[str, Any]:
+        with self.verrou:
+            etapes = {}
+            for etape, durees in self.durees.items():
+                triees = sorted(durees)
+                etapes[etape] = {
+                    'requetes': len(triees),
+                    'erreurs': self.erreurs[etape],
+                    'p50_ms': _centile(triees, 0.50),
+                    'p95_ms': _centile(triees, 0.95),
+                    'p99_ms': _centile(triees, 0.99),
+                    'max_ms': round(triees[-1] * 1000, 1) if triees else None,
+                    'statuts': dict(self.statuts[etape]),
+                }
+            total = sum(etape['requetes'] for etape in etapes.values())
+            return {
+                'duree_s': round(duree_totale, 1),
+                'requetes': total,
+                'requetes_par_s': round(total / duree_totale, 2) if duree_totale else 0.0,
+                'parcours_termines': self.parcours,
+                'parcours_par_min': round(self.parcours * 60 / duree_totale, 2) if duree_totale else 0.0,
+                'erreurs': sum(self.erreurs.values()),
+                'etapes': etapes,
+            }
+
+
+def _centile(triees: list[float], q: float) -> float | None:
+    """Centile au rang le plus proche, en millisecondes."""
+    if not triees:
+        return None
+    rang = min(len(triees) - 1, max(0, int(round(q * len(triees) + 0.5)) - 1))
+    return round(triees[rang] * 1000, 1)
+
+
+class UtilisateurVirtuel:
+    """Une session (cookies) et un compte ; rejoue le parcours jusqu'à l'échéance."""
+
+    def __init__(self, numero: int, compte: dict[str, Any], args: argparse.Namespace, stats: Statistiques) -> None:
+        self.compte = compte
+        self.args = args
+        self.stats = stats
+        self.alea = random.Random(args.graine + numero)
+        self.client = httpx.Client(base_url=args.url, follow_redirects=False, timeout=args.delai)
+        self.connecte = False
+        # En-tête ID3 puis octets aléatoires : seules l'extension et la taille comptent côté application
+        self.audio = b'ID3\x03\x00\x00\x00\x00\x00\x00' + self.alea.randbytes(args.taille_audio * 1024)
+
+    def _etape(self, etape: str, appel: Callable[[], httpx.Response], controle: Callable[[httpx.Response], bool]) -> httpx.Response:
+        debut = time.perf_counter()
+        try:
+            reponse = appel()
+        except httpx.HTTPError as e:
+            self.stats.noter(etape, time.perf_counter() - debut, type(e).__name__, False)
+            raise EchecEtape(f'{etape}: {e}') from e
+        succes = controle(reponse)
+        self.stats.noter(etape, time.perf_counter() - debut, str(reponse.status_code), succes)
+        if not succes:
+            raise EchecEtape(f'{etape}: statut {reponse.status_code} {reponse.headers.get("location", "")}')
+        return reponse
+
+    def _reflechir(self) -> None:
+        if self.args.reflexion > 0:
+            time.sleep(self.alea.expovariate(1 / self.args.reflexion))
+
+    def connexion(self) -> None:
+        self._etape(
+            'connexion',
+            lambda: self.client.post('/login', data={'email': self.compte['email'],
+                                                     'password': self.compte['mot_de_passe']}),
+            lambda r: r.status_code == 302 and '/login' not in r.headers.get('location', ''),
+        )
+        self.connecte = True
+
+    def parcours(self) -> None:
+        patient_id = self.alea.choice(self.compte['patients'])
+        self._etape('tableau_de_bord', lambda: self.client.get('/dashboard'), lambda r: r.status_code == 200)
+        self._reflechir()
+
+        reponse = self._etape(
+            'creation_seance',
+            lambda: self.client.post(f'/seances/patient/{patient_id}/create', data={
+                'date_seance': datetime.now().strftime('%Y-%m-%dT%H:%M'),
+                'duree_minutes': str(self.alea.choice((30, 45, 60))),
+                'type_seance': 'individuelle',
+                'objectifs_seance': 'Test de charge',
+                'activites_realisees': 'Improvisation, percussions',
+            }),
+            lambda r: r.status_code == 302 and re.search(r'/seances/\d+/modifier', r.headers.get('location', '')) is not None,
+        )
+        seance_id = int(re.search(r'/seances/(\d+)/modifier', reponse.headers['location']).group(1))  # type: ignore[union-attr]
+        self._reflechir()
+
+        self._etape(
+            'envoi_audio',
+            lambda: self.client.post(f'/audio/upload/{seance_id}',
+                                     files={'audio_file': ('seance.mp3', self.audio, 'audio/mpeg')}),
+            lambda r: r.status_code == 302 and '/audio/upload' not in r.headers.get('location', ''),
+        )
+        self._reflechir()
+
+        scores = {f'score_Indicateur_{i}': str(self.alea.randint(0, 5)) for i in range(8)}
+        self._etape(
+            'cotation',
+            lambda: self.client.post(f'/seances/{seance_id}/cotation/save',
+                                     data={**scores, 'observations': 'Test de charge'}),
+            lambda r: r.status_code == 302 and '/patients/' in r.headers.get('location', ''),
+        )
+        self._reflechir()
+
+        self._etape(
+            'rapport',
+            lambda: self.client.post(f'/api/patients/{patient_id}/rapport', json={
+                'date_debut': (date.today() - timedelta(days=90)).isoformat(),
+                'date_fin': (date.today() + timedelta(days=1)).isoformat(),  # inclut la séance créée
+                'periodicite': 'personnalise',
+            }),
+            lambda r: r.status_code == 200,
+        )
+        with self.stats.verrou:
+            self.stats.parcours += 1
+        self._reflechir()
+
+    def executer(self, echeance: float) -> None:
+        try:
+            while time.monotonic() < echeance:
+                try:
+                    if not self.connecte:
+                        self.connexion()
+                    self.parcours()
+                except EchecEtape as e:
+                    self.connecte = False  # session peut-être perdue : reconnexion au parcours suivant
+                    if self.args.verbeux:
+                        print(f"  échec {e}", file=sys.stderr)
+                    time.sleep(min(1.0, max(0.0, echeance - time.monotonic())))
+        finally:
+            self.client.close()
+
+
+def afficher(resume: dict[str, Any]) -> None:
+    print(f"\n{resume['requetes']} requêtes en {resume['duree_s']} s : {resume['requetes_par_s']} req/s, "
+          f"{resume['parcours_termines']} parcours ({resume['parcours_par_min']}/min), {resume['erreurs']} erreurs")
+    print(f"{'étape':18s} {'req':>6s} {'err':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for etape, mesure in resume['etapes'].items():
+        valeurs = [f"{mesure[cle]:9.1f}" if mesure[cle] is not None else f"{'-':>9s}"
+                   for cle in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')]
+        print(f"{etape:18s} {mesure['requetes']:6d} {mesure['erreurs']:5d} {' '.join(valeurs)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--comptes', default='loadtest/comptes.json', help="Fichier écrit par loadtest.preparer")
+    parser.add_argument('--utilisateurs', type=int, default=10, help="Utilisateurs virtuels simultanés")
+    parser.add_argument('--duree', type=float, default=60, help="Secondes de charge (montée comprise)")
+    parser.add_argument('--montee', type=float, default=10, help="Secondes pour démarrer tous les utilisateurs")
+    parser.add_argument('--reflexion', type=float, default=2.0, help="Temps de réflexion moyen entre étapes (s)")
+    parser.add_argument('--taille-audio', type=int, default=512, help="Taille de l'enregistrement envoyé (Ko)")
+    parser.add_argument('--delai', type=float, default=120, help="Délai maximal d'une requête HTTP (s)")
+    parser.add_argument('--graine', type=int, default=42)
+    parser.add_argument('--sortie', help="Résumé JSON")
+    parser.add_argument('--verbeux', action='store_true', help="Affiche chaque parcours en échec")
+    args = parser.parse_args()
+
+    with open(args.comptes, encoding='utf-8') as fichier:
+        comptes = [compte for compte in json.load(fichier) if compte.get('patients')]
+    if not comptes:
+        parser.error(f"Aucun compte avec patients dans {args.comptes} (lancer python -m loadtest.preparer)")
+
+    stats = Statistiques()
+    debut = time.monotonic()
+    echeance = debut + args.duree
+    threads = []
+    for numero in range(args.utilisateurs):
+        utilisateur = UtilisateurVirtuel(numero, comptes[numero % len(comptes)], args, stats)
+        thread = threading.Thread(target=utilisateur.executer, args=(echeance,), name=f'uv-{numero}', daemon=True)
+        threads.append(thread)
+        thread.start()
+        if numero < args.utilisateurs - 1:
+            time.sleep(args.montee / args.utilisateurs)
+    print(f"{args.utilisateurs} utilisateurs virtuels sur {args.url} pendant {args.duree:.0f} s")
+    for thread in threads:
+        thread.join()
+
+    resume = stats.resume(time.monotonic() - debut)
+    resume['parametres'] = {cle: valeur for cle, valeur in vars(args).items() if cle not in ('comptes', 'sortie')}
+    afficher(resume)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(resume, fichier, indent=2, ensure_ascii=False)
+            fichier.write('\n')
+    return 1 if resume['parcours_termines'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
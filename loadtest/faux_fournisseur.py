@@ -0,0 +1,238 @@
+"""Faux fournisseur IA local : Whisper (OpenAI) et chat completions (Mistral).
+
+Reproduit les routes utilisées par l'application, avec des latences tirées de lois
+log-normales, pour mesurer débit et latence de queue sans appeler les vraies API :
+- POST /v1/audio/transcriptions : latence = médiane Whisper + coût par Mo du fichier ;
+- POST /v1/chat/completions : délai avant premier jeton puis débit en jetons/s,
+  en réponse complète ou en flux SSE (`"stream": true`, format OpenAI/Mistral).
+Un taux d'erreur optionnel renvoie des 429/500 comme les fournisseurs sous charge.
+
+Application à tester :
+    OPENAI_API_KEY=factice OPENAI_BASE_URL=http://127.0.0.1:8099/v1
+    MISTRAL_API_KEY=factice MISTRAL_BASE_URL=http://127.0.0.1:8099
+
+Usage : python -m loadtest.faux_fournisseur [--port 8099] [--echelle 1.0] [--taux-erreur 0.01]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+MOTS = ('le', 'patient', 'séance', 'rythme', 'écoute', 'participe', 'avec', 'attention', 'soutenue', 'pendant',
+        'improvisation', 'percussions', 'voix', 'sourire', 'regard', 'échange', 'calme', 'progressivement',
+        'initiative', 'musicale', 'relation', 'thérapeute', 'groupe', 'émotion', 'exprime', 'plaisir', 'mélodie')
+
+
+@dataclass
+class Profil:
+    """Paramètres de latence (secondes) ; `echelle` les multiplie tous (0 = instantané)."""
+
+    whisper_mediane: float = 2.5
+    whisper_par_mo: float = 1.0
+    whisper_sigma: float = 0.35
+    mistral_premier_jeton: float = 0.6
+    mistral_sigma: float = 0.5
+    mistral_jetons_par_s: float = 45.0
+    mistral_jetons: int = 350
+    taux_erreur: float = 0.0
+    echelle: float = 1.0
+
+
+class FauxFournisseur(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP ; le profil est porté par le serveur."""
+
+    protocol_version = 'HTTP/1.1'
+    server: Serveur
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbeux:
+            super().log_message(format, *args)
+
+    # -- aléas -------------------------------------------------------------------------
+    def _lognormale(self, mediane: float, sigma: float) -> float:
+        with self.server.verrou:
+            return mediane * math.exp(self.server.alea.gauss(0.0, sigma))
+
+    def _attendre(self, secondes: float) -> None:
+        if secondes > 0 and self.server.profil.echelle > 0:
+            time.sleep(secondes * self.server.profil.echelle)
+
+    def _texte(self, nb_mots: int) -> str:
+        with self.server.verrou:
+            mots = [self.server.alea.choice(MOTS) for _ in range(nb_mots)]
+        phrases = [' '.join(mots[i:i + 12]).capitalize() + '.' for i in range(0, len(mots), 12)]
+        return ' '.join(phrases)
+
+    def _erreur_simulee(self) -> bool:
+        profil = self.server.profil
+        with self.server.verrou:
+            tirage = self.server.alea.random()
+        if tirage >= profil.taux_erreur:
+            return False
+        statut = 429 if tirage < profil.taux_erreur / 2 else 500
+        self._json(statut, {'error': {'message': 'Erreur simulée', 'type': 'faux_fournisseur'}})
+        return True
+
+    # -- réponses ----------------------------------------------------------------------
+    def _json(self, statut: int, corps: dict[str, Any]) -> None:
+        donnees = json.dumps(corps, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def _texte_brut(self, texte: str) -> None:
+        donnees = texte.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def _lire_corps(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_GET(self) -> None:
+        if self.path.rstrip('/') in ('', '/health'):
+            self._json(200, {'status': 'ok'})
+        elif self.path.rstrip('/') == '/v1/models':
+            self._json(200, {'object': 'list', 'data': [{'id': 'whisper-1', 'object': 'model'},
+                                                        {'id': 'mistral-large-latest', 'object': 'model'}]})
+        else:
+            self._json(404, {'error': {'message': f'Route inconnue : {self.path}'}})
+
+    def do_POST(self) -> None:
+        corps = self._lire_corps()
+        chemin = self.path.split('?', 1)[0].rstrip('/')
+        if chemin.endswith('/audio/transcriptions'):
+            self._transcription(corps)
+        elif chemin.endswith('/chat/completions'):
+            self._chat(corps)
+        else:
+            self._json(404, {'error': {'message': f'Route inconnue : {self.path}'}})
+
+    def _transcription(self, corps: bytes) -> None:
+        profil = self.server.profil
+        if self._erreur_simulee():
+            return
+        taille_mo = len(corps) / (1024 * 1024)
+        self._attendre(self._lognormale(profil.whisper_mediane, profil.whisper_sigma) + taille_mo * profil.whisper_par_mo)
+        texte = self._texte(80 + int(taille_mo * 150))
+        # Champ multipart response_format : texte brut ou JSON comme l'API
+        if b'name="response_format"\r\n\r\ntext' in corps:
+            self._texte_brut(texte)
+        else:
+            self._json(200, {'text': texte})
+
+    def _chat(self, corps: bytes) -> None:
+        profil = self.server.profil
+        try:
+            requete = json.loads(corps or b'{}')
+        except ValueError:
+            self._json(400, {'error': {'message': 'JSON invalide'}})
+            return
+        if self._erreur_simulee():
+            return
+        nb_jetons = min(int(requete.get('max_tokens') or profil.mistral_jetons), profil.mistral_jetons)
+        modele = requete.get('model') or 'mistral-large-latest'
+        identifiant = uuid.uuid4().hex
+        jetons_entree = sum(len(str(m.get('content', '')).split()) for m in requete.get('messages', []))
+        usage = {'prompt_tokens': jetons_entree, 'completion_tokens': nb_jetons,
+                 'total_tokens': jetons_entree + nb_jetons}
+        mots = self._texte(nb_jetons).split(' ')
+        self._attendre(self._lognormale(profil.mistral_premier_jeton, profil.mistral_sigma))
+
+        if not requete.get('stream'):
+            self._attendre(nb_jetons / profil.mistral_jetons_par_s)
+            self._json(200, {
+                'id': identifiant, 'object': 'chat.completion', 'created': int(time.time()), 'model': modele,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ' '.join(mots)},
+                             'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def evenement(delta: dict[str, Any], fin: str | None = None, **extra: Any) -> None:
+            morceau = {'id': identifiant, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                       'model': modele, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': fin}], **extra}
+            self.wfile.write(b'data: ' + json.dumps(morceau, ensure_ascii=False).encode('utf-8') + b'\n\n')
+            self.wfile.flush()
+
+        try:
+            evenement({'role': 'assistant', 'content': ''})
+            for i, mot in enumerate(mots):
+                self._attendre(1 / profil.mistral_jetons_par_s)
+                evenement({'content': mot if i == 0 else ' ' + mot})
+            evenement({}, 'stop', usage=usage)
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client parti en cours de flux
+
+
+class Serveur(ThreadingHTTPServer):
+    """Serveur multi-thread (un thread par connexion, comme un fournisseur qui absorbe la charge)."""
+
+    daemon_threads = True
+
+    def __init__(self, adresse: tuple[str, int], profil: Profil, graine: int | None = None,
+                 verbeux: bool = False) -> None:
+        super().__init__(adresse, FauxFournisseur)
+        self.profil = profil
+        self.alea = random.Random(graine)
+        self.verrou = threading.Lock()
+        self.verbeux = verbeux
+
+
+def main() -> int:
+    defaut = Profil()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--echelle', type=float, default=defaut.echelle,
+                        help="Multiplicateur de toutes les latences (0 = réponses immédiates)")
+    parser.add_argument('--whisper-mediane', type=float, default=defaut.whisper_mediane, help="Secondes")
+    parser.add_argument('--whisper-par-mo', type=float, default=defaut.whisper_par_mo, help="Secondes par Mo d'audio")
+    parser.add_argument('--mistral-premier-jeton', type=float, default=defaut.mistral_premier_jeton, help="Secondes")
+    parser.add_argument('--mistral-jetons-par-s', type=float, default=defaut.mistral_jetons_par_s)
+    parser.add_argument('--mistral-jetons', type=int, default=defaut.mistral_jetons, help="Longueur des réponses")
+    parser.add_argument('--taux-erreur', type=float, default=defaut.taux_erreur, help="Part de réponses 429/500")
+    parser.add_argument('--graine', type=int)
+    parser.add_argument('--verbeux', action='store_true', help="Journalise chaque requête")
+    args = parser.parse_args()
+
+    profil = Profil(
+        whisper_mediane=args.whisper_mediane, whisper_par_mo=args.whisper_par_mo,
+        mistral_premier_jeton=args.mistral_premier_jeton, mistral_jetons_par_s=args.mistral_jetons_par_s,
+        mistral_jetons=args.mistral_jetons, taux_erreur=args.taux_erreur, echelle=args.echelle,
+    )
+    serveur = Serveur((args.hote, args.port), profil, graine=args.graine, verbeux=args.verbeux)
+    print(f"Faux fournisseur IA sur http://{args.hote}:{args.port} (échelle {args.echelle})")
+    print(f"  OPENAI_BASE_URL=http://{args.hote}:{args.port}/v1  MISTRAL_BASE_URL=http://{args.hote}:{args.port}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
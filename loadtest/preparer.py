@@ -0,0 +1,59 @@
+"""Comptes et données du test de charge dans la base de l'application à tester.
+
+Crée le schéma si besoin puis génère le jeu synthétique de bench.generateur
+(thérapeutes therapeute<N>@bench.local, mot de passe « bench », patients avec
+grilles assignées). Si les comptes existent déjà, la génération est sautée.
+Écrit la liste des comptes et de leurs patients (JSON) lue par loadtest.charge.
+
+Même configuration que l'application (FLASK_CONFIG, DATABASE_URL) :
+    FLASK_CONFIG=production DATABASE_URL=postgresql://... python -m loadtest.preparer --therapeutes 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+from bench.generateur import MOT_DE_PASSE, Volumes, generer
+
+DOMAINE = '@bench.local'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--therapeutes', type=int, default=10, help="Un thérapeute par utilisateur virtuel simultané")
+    parser.add_argument('--patients', type=int, default=10)
+    parser.add_argument('--seances', type=int, default=12)
+    parser.add_argument('--graine', type=int, default=Volumes.graine)
+    parser.add_argument('--sortie', default='loadtest/comptes.json')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.models import Patient, User, db
+
+    app = create_app(os.environ.get('FLASK_CONFIG', 'default'))
+    with app.app_context():
+        db.create_all()
+        if User.query.filter(User.email.like(f'%{DOMAINE}')).first() is None:
+            generer(db, Volumes(args.therapeutes, args.patients, args.seances, graine=args.graine))
+        else:
+            print("Comptes de charge déjà présents : génération sautée.", file=sys.stderr)
+        comptes = [
+            {
+                'email': user.email,
+                'mot_de_passe': MOT_DE_PASSE,
+                'patients': [pid for (pid,) in db.session.query(Patient.id).filter_by(user_id=user.id).order_by(Patient.id)],
+            }
+            for user in User.query.filter(User.email.like(f'%{DOMAINE}')).order_by(User.id)
+        ]
+
+    with open(args.sortie, 'w', encoding='utf-8') as fichier:
+        json.dump(comptes, fichier, indent=2)
+        fichier.write('\n')
+    print(f"{len(comptes)} comptes écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
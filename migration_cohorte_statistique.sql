@@ -0,0 +1,31 @@
+-- Migration statistiques de cohortes matérialisées (PostgreSQL)
+-- Applique: création de la table cohorte_statistique et de sa contrainte d'unicité.
+-- Remplissage: `flask cohortes-rebuild` (à planifier, ex. quotidiennement).
+-- Sûr en ré-exécution (IF NOT EXISTS).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS cohorte_statistique (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    mois VARCHAR(7) NOT NULL,
+    pathologie VARCHAR(200) NOT NULL DEFAULT '',
+    grille_id INTEGER NOT NULL REFERENCES grille_evaluation(id) ON DELETE CASCADE,
+    cohorte_mois VARCHAR(7) NOT NULL,
+    nb_patients INTEGER NOT NULL DEFAULT 0,
+    nb_cotations INTEGER NOT NULL DEFAULT 0,
+    moyenne DOUBLE PRECISION,
+    p25 DOUBLE PRECISION,
+    mediane DOUBLE PRECISION,
+    p75 DOUBLE PRECISION,
+    p90 DOUBLE PRECISION,
+    progression_moyenne DOUBLE PRECISION,
+    nb_objectifs_atteints INTEGER NOT NULL DEFAULT 0,
+    delai_objectif_moyen_jours DOUBLE PRECISION,
+    date_calcul TIMESTAMP NOT NULL DEFAULT now(),
+    CONSTRAINT uq_cohorte_statistique UNIQUE (user_id, mois, pathologie, grille_id, cohorte_mois)
+);
+
+COMMIT;
+
+-- Fin migration
@@ -0,0 +1,48 @@
+-- Migration table de faits cotation_score (PostgreSQL)
+-- Applique: création de la table, index composite (patient, indicateur, date),
+--           remplissage initial depuis cotation_seance.scores_detailles (JSONB).
+-- Pré-requis: migration_json_scores.sql.
+-- Sûr en ré-exécution (IF NOT EXISTS, remplissage limité aux cotations sans faits).
+
+BEGIN;
+
+-- 1. Table
+CREATE TABLE IF NOT EXISTS cotation_score (
+    id SERIAL PRIMARY KEY,
+    cotation_id INTEGER NOT NULL REFERENCES cotation_seance(id) ON DELETE CASCADE,
+    patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    grille_id INTEGER NOT NULL REFERENCES grille_evaluation(id),
+    grille_version INTEGER,
+    indicateur VARCHAR(255) NOT NULL,
+    valeur DOUBLE PRECISION NOT NULL,
+    date_seance TIMESTAMP NOT NULL
+);
+
+-- 2. Index
+CREATE INDEX IF NOT EXISTS ix_cotation_score_patient_indicateur_date
+    ON cotation_score (patient_id, indicateur, date_seance);
+CREATE INDEX IF NOT EXISTS ix_cotation_score_cotation_id
+    ON cotation_score (cotation_id);
+
+-- 3. Remplissage initial (valeurs numériques uniquement)
+INSERT INTO cotation_score (cotation_id, patient_id, grille_id, grille_version, indicateur, valeur, date_seance)
+SELECT c.id, s.patient_id, c.grille_id, v.version_num, LEFT(kv.key, 255), kv.value::double precision, s.date_seance
+  FROM cotation_seance c
+  JOIN seances s ON s.id = c.seance_id
+  LEFT JOIN LATERAL (
+        -- Version en vigueur à la création de la cotation (à défaut : la plus ancienne)
+        SELECT gv.version_num FROM grille_version gv
+         WHERE gv.grille_id = c.grille_id
+         ORDER BY (gv.date_creation <= c.date_creation) DESC,
+                  CASE WHEN gv.date_creation <= c.date_creation THEN gv.version_num ELSE -gv.version_num END DESC
+         LIMIT 1
+  ) v ON TRUE
+  CROSS JOIN LATERAL jsonb_each_text(
+        CASE WHEN jsonb_typeof(c.scores_detailles) = 'object' THEN c.scores_detailles ELSE '{}'::jsonb END
+  ) AS kv
+ WHERE kv.value ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$'
+   AND NOT EXISTS (SELECT 1 FROM cotation_score cs WHERE cs.cotation_id = c.id);
+
+COMMIT;
+
+-- Fin migration
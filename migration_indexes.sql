@@ -0,0 +1,38 @@
+-- Migration index composites des requêtes critiques (PostgreSQL)
+-- Applique: index (patient, date), (séance, grille), (patient, grille), (utilisateur, actif)...
+-- CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction :
+-- lancer ce fichier hors BEGIN/COMMIT (psql -f, sans --single-transaction).
+-- Sûr en ré-exécution (IF NOT EXISTS). Vérification: `flask check-index-usage`.
+
+-- 1. Séances d'un patient sur une plage de dates
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_seances_patient_date
+    ON seances (patient_id, date_seance);
+
+-- 2. Patients actifs d'un thérapeute
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patients_user_actif
+    ON patients (user_id, actif);
+
+-- 3. Cotations : par séance + grille, par patient + grille, récentes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cotation_seance_seance_grille
+    ON cotation_seance (seance_id, grille_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cotation_seance_patient_grille
+    ON cotation_seance (patient_id, grille_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cotation_seance_date_creation
+    ON cotation_seance (date_creation);
+
+-- 4. Grilles assignées (l'unicité (patient_id, grille_id) couvre déjà l'accès par patient)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patient_grille_grille
+    ON patient_grille (grille_id);
+
+-- 5. Objectifs d'un patient pour une grille
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_objectif_therapeutique_patient_grille
+    ON objectif_therapeutique (patient_id, grille_id, actif);
+
+-- 6. Statistiques du planificateur à jour pour les tables indexées
+ANALYZE seances;
+ANALYZE patients;
+ANALYZE cotation_seance;
+ANALYZE patient_grille;
+ANALYZE objectif_therapeutique;
+
+-- Fin migration
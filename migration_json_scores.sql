@@ -0,0 +1,73 @@
+-- Migration stockage JSON natif (PostgreSQL)
+-- Applique: conversion TEXT -> JSONB de cotation_seance.scores_detailles,
+--           grille_evaluation.domaines_config et grille_version.domaines_config,
+--           index GIN sur les scores.
+-- Sûr en ré-exécution (tests d'existence / de type).
+-- Les valeurs non décodables sont remplacées par un document vide ('{}' ou '[]').
+
+BEGIN;
+
+-- Conversion tolérante : renvoie le défaut si le texte n'est pas un JSON valide
+CREATE OR REPLACE FUNCTION pg_temp.synchronie_try_jsonb(valeur text, defaut jsonb) RETURNS jsonb AS $$
+BEGIN
+    IF valeur IS NULL OR btrim(valeur) = '' THEN
+        RETURN defaut;
+    END IF;
+    RETURN valeur::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN defaut;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- 1. cotation_seance.scores_detailles
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name='cotation_seance'
+           AND column_name='scores_detailles'
+           AND data_type IN ('text', 'character varying', 'json')
+    ) THEN
+        ALTER TABLE cotation_seance
+            ALTER COLUMN scores_detailles TYPE jsonb
+            USING pg_temp.synchronie_try_jsonb(scores_detailles::text, '{}'::jsonb);
+    END IF;
+END$$;
+
+-- 2. grille_evaluation.domaines_config
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name='grille_evaluation'
+           AND column_name='domaines_config'
+           AND data_type IN ('text', 'character varying', 'json')
+    ) THEN
+        ALTER TABLE grille_evaluation
+            ALTER COLUMN domaines_config TYPE jsonb
+            USING pg_temp.synchronie_try_jsonb(domaines_config::text, '[]'::jsonb);
+    END IF;
+END$$;
+
+-- 3. grille_version.domaines_config
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name='grille_version'
+           AND column_name='domaines_config'
+           AND data_type IN ('text', 'character varying', 'json')
+    ) THEN
+        ALTER TABLE grille_version
+            ALTER COLUMN domaines_config TYPE jsonb
+            USING pg_temp.synchronie_try_jsonb(domaines_config::text, '[]'::jsonb);
+    END IF;
+END$$;
+
+-- 4. Index GIN pour filtrer par indicateur (scores_detailles ? 'Domaine_Indicateur')
+CREATE INDEX IF NOT EXISTS ix_cotation_seance_scores_gin
+    ON cotation_seance USING gin (scores_detailles);
+
+COMMIT;
+
+-- Fin migration
@@ -0,0 +1,23 @@
+-- Migration cumuls d'activité mensuels (PostgreSQL)
+-- Applique: création de la table monthly_activity_rollup et de sa contrainte d'unicité.
+-- Remplissage initial: `flask rollups-rebuild` ; ensuite maintenue à chaque écriture.
+-- Sûr en ré-exécution (IF NOT EXISTS).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS monthly_activity_rollup (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    mois VARCHAR(7) NOT NULL,
+    nb_seances INTEGER NOT NULL DEFAULT 0,
+    nb_cotations INTEGER NOT NULL DEFAULT 0,
+    nb_patients_vus INTEGER NOT NULL DEFAULT 0,
+    somme_pourcentages DOUBLE PRECISION NOT NULL DEFAULT 0,
+    grilles JSONB NOT NULL DEFAULT '{}'::jsonb,
+    date_calcul TIMESTAMP NOT NULL DEFAULT now(),
+    CONSTRAINT uq_monthly_activity_rollup_user_mois UNIQUE (user_id, mois)
+);
+
+COMMIT;
+
+-- Fin migration
@@ -0,0 +1,15 @@
+-- Migration recherche prédictive des patients (PostgreSQL)
+-- Applique: extensions unaccent + pg_trgm, fonction IMMUTABLE synchronie_unaccent,
+-- index GIN trigramme sur le nom complet normalisé (prénom + nom, sans accents).
+-- Équivalent de `flask init-db` ; sûr en ré-exécution.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() n'est pas IMMUTABLE : enveloppe requise pour l'utiliser dans un index
+CREATE OR REPLACE FUNCTION synchronie_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+CREATE INDEX IF NOT EXISTS ix_patients_nom_complet_trgm ON patients
+    USING GIN (synchronie_unaccent(lower(prenom || ' ' || nom)) gin_trgm_ops);
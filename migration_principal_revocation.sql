@@ -0,0 +1,19 @@
+-- Migration révocations des principaux de session (PostgreSQL)
+-- Applique: création de la table principal_revocation (une ligne par utilisateur désactivé).
+-- Écrite par `flask deactivate-user`, relue par chaque worker toutes les
+-- PRINCIPAL_REVOCATIONS_INTERVALLE secondes. Sans cette table, les sessions
+-- d'un compte désactivé expirent au plus tard après PRINCIPAL_TTL.
+-- Sûr en ré-exécution (IF NOT EXISTS).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS principal_revocation (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    revoque_le TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_principal_revocation_revoque_le ON principal_revocation (revoque_le);
+
+COMMIT;
+
+-- Fin migration
@@ -0,0 +1,39 @@
+-- Migration recherche plein texte des séances (PostgreSQL)
+-- Applique: configuration synchronie_fr (unaccent + racinisation française),
+-- colonne seances.recherche (tsvector pondéré) tenue à jour par trigger, index GIN.
+-- Équivalent de `flask init-db` ; sûr en ré-exécution.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'synchronie_fr') THEN
+        CREATE TEXT SEARCH CONFIGURATION synchronie_fr (COPY = french);
+        ALTER TEXT SEARCH CONFIGURATION synchronie_fr
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+    END IF;
+END $$;
+
+ALTER TABLE seances ADD COLUMN IF NOT EXISTS recherche tsvector;
+
+-- Poids : A observations, B synthèse IA / objectifs / activités, C transcription
+CREATE OR REPLACE FUNCTION seances_recherche_maj() RETURNS trigger AS $$
+BEGIN
+    NEW.recherche :=
+        setweight(to_tsvector('synchronie_fr', coalesce(NEW.observations, '')), 'A')
+        || setweight(to_tsvector('synchronie_fr', coalesce(NEW.synthese_ia, '')), 'B')
+        || setweight(to_tsvector('synchronie_fr',
+               concat_ws(' ', NEW.type_seance, NEW.objectifs_seance, NEW.activites_realisees)), 'B')
+        || setweight(to_tsvector('synchronie_fr', coalesce(NEW.transcription_audio, '')), 'C');
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS seances_recherche_maj ON seances;
+CREATE TRIGGER seances_recherche_maj
+    BEFORE INSERT OR UPDATE OF type_seance, objectifs_seance, activites_realisees,
+                               observations, transcription_audio, synthese_ia
+    ON seances FOR EACH ROW EXECUTE FUNCTION seances_recherche_maj();
+
+-- Rattrapage des lignes existantes (le trigger calcule la colonne)
+UPDATE seances SET observations = observations WHERE recherche IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_seances_recherche ON seances USING GIN (recherche);
@@ -0,0 +1,59 @@
+"""Vérifie le budget d'import au démarrage d'un worker (python -X importtime).
+
+Échoue (code 1) si create_app importe un SDK lourd (openai, mistralai, mutagen)
+ou si l'import cumulé du paquet `app` dépasse le budget.
+
+Usage : python scripts/check_import_time.py [--budget-ms 1500] [--config testing]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+INTERDITS = ('openai', 'mistralai', 'mutagen')
+
+
+def mesurer(config_name: str) -> dict[str, int]:
+    """Temps d'import cumulés (µs) par module pour un create_app dans un processus neuf."""
+    environnement = {k: v for k, v in os.environ.items() if k != 'FLASK_RUN_FROM_CLI'}
+    resultat = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"from app import create_app; create_app({config_name!r})"],
+        capture_output=True, text=True, cwd=RACINE, env=environnement, check=False
+    )
+    if resultat.returncode != 0:
+        sys.stderr.write(resultat.stderr[-2000:])
+        sys.exit(resultat.returncode)
+    cumuls: dict[str, int] = {}
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith('import time:') or 'cumulative' in ligne:
+            continue
+        _, cumul, module = (partie.strip() for partie in ligne[len('import time:'):].split('|'))
+        cumuls[module] = int(cumul)
+    return cumuls
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=1500.0)
+    parser.add_argument('--config', default='testing')
+    args = parser.parse_args()
+
+    cumuls = mesurer(args.config)
+    interdits = sorted(m for m in cumuls if m.split('.')[0] in INTERDITS)
+    total_ms = cumuls.get('app', 0) / 1000
+    print(f"Import de 'app' : {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    erreurs = 0
+    if interdits:
+        print(f"SDK importés au démarrage : {', '.join(interdits[:10])}")
+        erreurs += 1
+    if total_ms > args.budget_ms:
+        print("Budget d'import dépassé. Plus coûteux :")
+        for module, cumul in sorted(cumuls.items(), key=lambda item: -item[1])[:10]:
+            print(f"  {module:45s} {cumul / 1000:8.1f} ms")
+        erreurs += 1
+    return 1 if erreurs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
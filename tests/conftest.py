@@ -0,0 +1,29 @@
+"""Fixtures communes : application de test sur SQLite en mémoire."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from flask import Flask
+
+from app import create_app
+from app.models import User, db
+
+
+@pytest.fixture()
+def app() -> Iterator[Flask]:
+    application = create_app('testing')
+    with application.app_context():
+        db.create_all()
+        yield application
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def therapeute(app: Flask) -> User:
+    utilisateur = User(email='therapeute@test.local', nom='Test')
+    utilisateur.set_password('secret')
+    db.session.add(utilisateur)
+    db.session.commit()
+    return utilisateur
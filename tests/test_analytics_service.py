@@ -0,0 +1,25 @@
+"""Version des données analytiques (ETag) et invalidation du cache."""
+from __future__ import annotations
+
+from app.models import User, db
+from app.models.cotation import GrilleEvaluation
+from app.services.analytics_service import AnalyticsService
+from app.utils.cache import CacheAnalytics
+
+
+def test_grille_renommee_ou_desactivee_change_version_et_cache(therapeute: User):
+    grille = GrilleEvaluation(nom='G', type_grille='personnalisee', user_id=therapeute.id, domaines_config=[])
+    db.session.add(grille)
+    db.session.commit()
+    versions = [AnalyticsService.version_donnees(therapeute.id)]
+    generation = CacheAnalytics._backend.generation(therapeute.id)
+
+    grille.nom = 'Renommée'
+    db.session.commit()
+    versions.append(AnalyticsService.version_donnees(therapeute.id))
+    grille.active = False
+    db.session.commit()
+    versions.append(AnalyticsService.version_donnees(therapeute.id))
+
+    assert len(set(versions)) == 3
+    assert CacheAnalytics._backend.generation(therapeute.id) == generation + 2
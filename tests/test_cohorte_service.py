@@ -0,0 +1,96 @@
+"""Rafraîchissement incrémental des cohortes matérialisées."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import Patient, Seance, User, db
+from app.models.cotation import CohorteStatistique, CotationSeance, GrilleEvaluation
+from app.services.cohorte_service import CohorteService
+
+
+def _maintenant() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _mois_precedent(date: datetime) -> datetime:
+    return (date.replace(day=1) - timedelta(days=1)).replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture()
+def patient(therapeute: User) -> tuple[Patient, GrilleEvaluation]:
+    grille = GrilleEvaluation(nom='G', type_grille='standard', user_id=therapeute.id,
+                              domaines_config=[{'nom': 'D', 'indicateurs': [{'nom': 'I', 'min': 0, 'max': 5}]}])
+    patient = Patient(nom='Dupont', prenom='Élise', pathologie='TSA', user_id=therapeute.id)
+    db.session.add_all([grille, patient])
+    db.session.commit()
+    return patient, grille
+
+
+def _coter(patient: Patient, grille: GrilleEvaluation, date_seance: datetime, pourcentage: float,
+           saisie_le: datetime | None = None) -> None:
+    saisie_le = saisie_le or _maintenant()
+    seance = Seance(patient_id=patient.id, date_seance=date_seance, date_creation=saisie_le, date_modification=saisie_le)
+    db.session.add(seance)
+    db.session.flush()
+    db.session.add(CotationSeance(
+        seance_id=seance.id, grille_id=grille.id, patient_id=patient.id, therapeute_id=patient.user_id,
+        scores_detailles={'D_I': 2.0}, pourcentage_reussite=pourcentage,
+        date_creation=saisie_le, date_modification=saisie_le,
+    ))
+    db.session.commit()
+
+
+def _calcule_le(date: datetime) -> None:
+    CohorteStatistique.query.update({CohorteStatistique.date_calcul: date})
+    db.session.commit()
+
+
+def _cotations_par_mois(user_id: int) -> dict[str, int]:
+    return {ligne['mois']: ligne['nb_cotations'] for ligne in CohorteService.cohortes(user_id)}
+
+
+def test_changement_de_mois_recalcule_le_mois_du_dernier_calcul(patient):
+    patient, grille = patient
+    precedent = _mois_precedent(_maintenant())
+    _coter(patient, grille, precedent.replace(day=10), 40.0, saisie_le=precedent.replace(day=10))
+    CohorteService.reconstruire(patient.user_id)
+    _calcule_le(precedent.replace(day=15))
+
+    # Saisies après le calcul : fin du mois précédent et mois courant
+    _coter(patient, grille, precedent.replace(day=20), 60.0, saisie_le=precedent.replace(day=20))
+    _coter(patient, grille, _maintenant(), 80.0)
+    CohorteService.rafraichir_si_perime(patient.user_id)
+
+    assert _cotations_par_mois(patient.user_id) == {
+        precedent.strftime('%Y-%m'): 2,
+        _maintenant().strftime('%Y-%m'): 1,
+    }
+
+
+def test_cotation_saisie_dans_un_mois_ancien_est_prise_en_compte(patient):
+    patient, grille = patient
+    ancien = _mois_precedent(_mois_precedent(_mois_precedent(_maintenant())))
+    _coter(patient, grille, _maintenant() - timedelta(minutes=5), 50.0)
+    CohorteService.reconstruire(patient.user_id)
+    _calcule_le(_maintenant() - timedelta(hours=2))
+
+    _coter(patient, grille, ancien, 30.0)
+    CohorteService.rafraichir_si_perime(patient.user_id)
+
+    lignes = {ligne['mois']: ligne for ligne in CohorteService.cohortes(patient.user_id)}
+    assert lignes[ancien.strftime('%Y-%m')]['nb_cotations'] == 1
+    # La nouvelle première cotation devient la référence de progression du mois courant
+    assert lignes[_maintenant().strftime('%Y-%m')]['progression_moyenne'] == 20.0
+
+
+def test_calcul_recent_non_refait(patient):
+    patient, grille = patient
+    _coter(patient, grille, _maintenant() - timedelta(minutes=5), 50.0)
+    CohorteService.reconstruire(patient.user_id)
+
+    _coter(patient, grille, _maintenant(), 70.0)
+    CohorteService.rafraichir_si_perime(patient.user_id)
+
+    assert _cotations_par_mois(patient.user_id) == {_maintenant().strftime('%Y-%m'): 1}
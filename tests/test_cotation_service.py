@@ -0,0 +1,16 @@
+"""Catalogue des grilles prédéfinies."""
+from __future__ import annotations
+
+from app.services.catalogue_grilles import CatalogueGrilles
+from app.services.cotation_service import CotationService
+
+
+def test_grilles_predefinies_non_partagees(app):
+    contenu, etag = CatalogueGrilles.predefinies()
+    grilles = CotationService.get_grilles_predefinies()
+    grilles.clear()
+    CotationService.get_grilles_predefinies()['musicotherapie_active']['domaines'].clear()
+
+    assert CotationService.get_grilles_predefinies()['musicotherapie_active']['domaines']
+    CatalogueGrilles._predefinies = None
+    assert CatalogueGrilles.predefinies() == (contenu, etag)
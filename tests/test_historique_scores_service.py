@@ -0,0 +1,68 @@
+"""Version de grille portée par les faits cotation_score."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import Patient, Seance, User, db
+from app.models.cotation import CotationScore, CotationSeance, GrilleEvaluation, GrilleVersion
+from app.services.historique_scores_service import HistoriqueScoresService
+
+
+def _il_y_a(jours: int) -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=jours)
+
+
+@pytest.fixture()
+def grille(therapeute: User) -> GrilleEvaluation:
+    grille = GrilleEvaluation(nom='G', type_grille='personnalisee', user_id=therapeute.id, domaines_config=[])
+    db.session.add(grille)
+    db.session.flush()
+    for numero, jours in ((1, 30), (2, 10)):
+        db.session.add(GrilleVersion(grille_id=grille.id, version_num=numero, domaines_config=[],
+                                     date_creation=_il_y_a(jours), date_modification=_il_y_a(jours)))
+    db.session.commit()
+    return grille
+
+
+def _coter(grille: GrilleEvaluation, cree_le: datetime) -> CotationSeance:
+    patient = Patient(nom='Dupont', prenom='Élise', user_id=grille.user_id)
+    db.session.add(patient)
+    db.session.flush()
+    seance = Seance(patient_id=patient.id, date_seance=cree_le)
+    db.session.add(seance)
+    db.session.flush()
+    cotation = CotationSeance(seance_id=seance.id, grille_id=grille.id, patient_id=patient.id,
+                              therapeute_id=grille.user_id, scores_detailles={'D_I': 3.0},
+                              date_creation=cree_le, date_modification=cree_le)
+    db.session.add(cotation)
+    db.session.commit()
+    return cotation
+
+
+def _versions(cotation: CotationSeance) -> set[int | None]:
+    return {fait.grille_version for fait in CotationScore.query.filter_by(cotation_id=cotation.id)}
+
+
+def test_version_en_vigueur_a_la_creation(grille):
+    ancienne = _coter(grille, _il_y_a(20))
+    recente = _coter(grille, _il_y_a(1))
+    avant_toute_version = _coter(grille, _il_y_a(60))
+
+    assert _versions(ancienne) == {1}
+    assert _versions(recente) == {2}
+    assert _versions(avant_toute_version) == {1}
+
+
+def test_modification_et_backfill_conservent_la_version(grille):
+    cotation = _coter(grille, _il_y_a(20))
+    db.session.add(GrilleVersion(grille_id=grille.id, version_num=3, domaines_config=[]))
+    db.session.commit()
+
+    cotation.observations_cotation = 'Relue'
+    db.session.commit()
+    assert _versions(cotation) == {1}
+
+    HistoriqueScoresService.backfill()
+    assert _versions(cotation) == {1}
@@ -0,0 +1,24 @@
+"""Accès à /metrics."""
+from __future__ import annotations
+
+from config import ProductionConfig
+
+
+def test_metrics_sans_jeton_hors_production(app):
+    assert app.test_client().get('/metrics').status_code == 200
+
+
+def test_metrics_sans_jeton_ni_acces_public(app):
+    app.config.update(METRICS_TOKEN=None, METRICS_PUBLIC=False)
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_avec_jeton(app):
+    app.config.update(METRICS_TOKEN='secret', METRICS_PUBLIC=False)
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_production_ferme_par_defaut():
+    assert ProductionConfig.METRICS_PUBLIC is False
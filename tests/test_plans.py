@@ -0,0 +1,27 @@
+"""Contrôle des plans d'exécution des requêtes critiques."""
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.models import db
+from app.utils.plans import _sans_recherche_postgres, _sans_recherche_sqlite, verifier_plans
+
+
+def test_schema_complet_sans_parcours(app):
+    assert [r['requete'] for r in verifier_plans() if not r['ok']] == []
+
+
+def test_index_supprime_detecte(app):
+    db.session.execute(text('DROP INDEX ix_seances_patient_date'))
+    db.session.commit()
+    echecs = {r['requete'] for r in verifier_plans() if not r['ok']}
+    assert {'seances_patient_periode', 'seances_utilisateur_periode'} <= echecs
+
+
+def test_parcours_complet_d_index_refuse():
+    assert _sans_recherche_sqlite(['SCAN seances USING COVERING INDEX ix_seances_patient_date'], {'seances'}) == [
+        'SCAN seances USING COVERING INDEX ix_seances_patient_date', 'seances']
+    assert _sans_recherche_postgres({'Node Type': 'Index Only Scan', 'Relation Name': 'seances'}, {'seances'}) == ['seances']
+    bitmap = {'Node Type': 'Bitmap Heap Scan', 'Relation Name': 'seances', 'Recheck Cond': '(patient_id = 1)',
+              'Plans': [{'Node Type': 'Bitmap Index Scan', 'Index Cond': '(patient_id = 1)'}]}
+    assert _sans_recherche_postgres(bitmap, {'seances'}) == []